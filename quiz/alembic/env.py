@@ -16,6 +16,13 @@ if config.config_file_name is not None:
 target_metadata = Base.metadata
 
 
+def include_name(name, type_, parent_names):
+    """Секции quiz_question создаются вне миграций, поэтому автогенерация
+    их не учитывает."""
+    table_name = name if type_ == 'table' else parent_names.get('table_name')
+    return not (table_name or '').startswith('quiz_question_')
+
+
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
@@ -30,7 +37,8 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection):
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(connection=connection, target_metadata=target_metadata,
+                      include_name=include_name)
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,28 @@
+"""keyset indexes
+
+Revision ID: 5f8c2d9e7b13
+Revises: c41a8e5f02d7
+Create Date: 2026-10-18 15:02:47.381205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '5f8c2d9e7b13'
+down_revision: Union[str, None] = 'c41a8e5f02d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_question_add_date_question_id', 'question',
+                    ['add_date', 'question_id'], unique=False)
+    op.create_index('ix_quiz_add_date_quiz_id', 'quiz',
+                    ['add_date', 'quiz_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_quiz_add_date_quiz_id', table_name='quiz')
+    op.drop_index('ix_question_add_date_question_id', table_name='question')
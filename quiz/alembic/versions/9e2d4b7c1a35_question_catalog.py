@@ -0,0 +1,91 @@
+"""question catalog
+
+Revision ID: 9e2d4b7c1a35
+Revises: 3b1f9c2a6e04
+Create Date: 2026-10-18 11:02:17.540912
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '9e2d4b7c1a35'
+down_revision: Union[str, None] = '3b1f9c2a6e04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('quiz',
+    sa.Column('quiz_id', sa.UUID(), nullable=False),
+    sa.Column('add_date', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('quiz_id')
+    )
+    op.create_table('quiz_question',
+    sa.Column('quiz_id', sa.UUID(), nullable=False),
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('answer', sa.String(length=255), nullable=True),
+    sa.ForeignKeyConstraint(['question_id'], ['question.question_id'], ),
+    sa.ForeignKeyConstraint(['quiz_id'], ['quiz.quiz_id'],
+                            ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('quiz_id', 'question_id')
+    )
+    # Перенос данных: каждая викторина получает запись в quiz, а её
+    # вопросы - записи в quiz_question с порядковым номером.
+    op.execute(
+        'INSERT INTO quiz (quiz_id, add_date) '
+        'SELECT quiz_id, min(add_date) FROM question GROUP BY quiz_id'
+    )
+    op.execute(
+        'INSERT INTO quiz_question (quiz_id, question_id, position, answer) '
+        'SELECT quiz_id, question_id, '
+        'row_number() OVER (PARTITION BY quiz_id ORDER BY question_id) - 1, '
+        'answer FROM question'
+    )
+    op.drop_column('question', 'answer')
+    op.drop_column('question', 'quiz_id')
+    # Банк вопросов становится частью каталога.
+    op.execute(
+        'INSERT INTO question (question_id, question, correct_answer, '
+        'add_date) SELECT question_id, question, correct_answer, add_date '
+        'FROM questionbank ON CONFLICT (question_id) DO NOTHING'
+    )
+    op.drop_table('questionbank')
+
+
+def downgrade() -> None:
+    op.create_table('questionbank',
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('question', sa.String(length=255), nullable=False),
+    sa.Column('correct_answer', sa.String(length=255), nullable=False),
+    sa.Column('add_date', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('question_id')
+    )
+    op.add_column('question',
+                  sa.Column('quiz_id', sa.UUID(), nullable=True))
+    op.add_column('question',
+                  sa.Column('answer', sa.String(length=255), nullable=True))
+    # В старой схеме вопрос принадлежит только одной викторине, поэтому
+    # для вопросов из нескольких викторин сохраняется самая поздняя.
+    op.execute(
+        'UPDATE question SET quiz_id = last.quiz_id, answer = last.answer '
+        'FROM (SELECT DISTINCT ON (qq.question_id) qq.question_id, '
+        'qq.quiz_id, qq.answer FROM quiz_question qq '
+        'JOIN quiz q ON q.quiz_id = qq.quiz_id '
+        'ORDER BY qq.question_id, q.add_date DESC) AS last '
+        'WHERE question.question_id = last.question_id'
+    )
+    # Вопросы, не выданные ни в одну викторину, возвращаются в банк.
+    op.execute(
+        'INSERT INTO questionbank (question_id, question, correct_answer, '
+        'add_date) SELECT question_id, question, correct_answer, add_date '
+        'FROM question WHERE quiz_id IS NULL'
+    )
+    op.execute('DELETE FROM question WHERE quiz_id IS NULL')
+    op.alter_column('question', 'quiz_id', nullable=False)
+    op.drop_table('quiz_question')
+    op.drop_table('quiz')
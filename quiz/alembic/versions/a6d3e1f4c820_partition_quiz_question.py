@@ -0,0 +1,91 @@
+"""partition quiz_question
+
+Revision ID: a6d3e1f4c820
+Revises: 5f8c2d9e7b13
+Create Date: 2026-10-18 16:41:09.527310
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d3e1f4c820'
+down_revision: Union[str, None] = '5f8c2d9e7b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def create_quiz_question(partitioned: bool) -> None:
+    op.create_table(
+        'quiz_question',
+        sa.Column('quiz_id', sa.UUID(), nullable=False),
+        sa.Column('question_id', sa.Integer(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('answer', sa.String(length=255), nullable=True),
+        *([sa.Column('add_date', sa.DateTime(), nullable=False)]
+          if partitioned else []),
+        sa.ForeignKeyConstraint(['question_id'], ['question.question_id'], ),
+        sa.ForeignKeyConstraint(['quiz_id'], ['quiz.quiz_id'],
+                                ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint(
+            'quiz_id', 'question_id',
+            *(['add_date'] if partitioned else [])),
+        **({'postgresql_partition_by': 'RANGE (add_date)'}
+           if partitioned else {}),
+    )
+    op.create_index(
+        'ix_quiz_question_quiz_id_position', 'quiz_question',
+        ['quiz_id', 'position', *(['add_date'] if partitioned else [])],
+        unique=True)
+
+
+def rename_old_quiz_question() -> None:
+    op.drop_index('ix_quiz_question_quiz_id_position',
+                  table_name='quiz_question')
+    op.rename_table('quiz_question', 'quiz_question_old')
+    op.execute('ALTER TABLE quiz_question_old '
+               'RENAME CONSTRAINT quiz_question_pkey '
+               'TO quiz_question_old_pkey')
+
+
+def upgrade() -> None:
+    rename_old_quiz_question()
+    create_quiz_question(partitioned=True)
+    op.execute('CREATE TABLE quiz_question_default '
+               'PARTITION OF quiz_question DEFAULT')
+    # Месячные секции для имеющихся викторин и на два месяца вперёд.
+    op.execute(
+        "DO $$ DECLARE month date; BEGIN "
+        "FOR month IN SELECT generate_series("
+        "coalesce(date_trunc('month', min(add_date)), "
+        "date_trunc('month', now())), "
+        "date_trunc('month', now()) + interval '2 months', "
+        "interval '1 month')::date FROM quiz LOOP "
+        "EXECUTE format('CREATE TABLE %I PARTITION OF quiz_question "
+        "FOR VALUES FROM (%L) TO (%L)', "
+        "'quiz_question_p' || to_char(month, 'YYYYMM'), "
+        "month, month + interval '1 month'); "
+        "END LOOP; END $$"
+    )
+    op.execute(
+        'INSERT INTO quiz_question '
+        '(quiz_id, question_id, position, answer, add_date) '
+        'SELECT old.quiz_id, old.question_id, old.position, old.answer, '
+        'quiz.add_date FROM quiz_question_old AS old '
+        'JOIN quiz ON quiz.quiz_id = old.quiz_id'
+    )
+    op.drop_table('quiz_question_old')
+
+
+def downgrade() -> None:
+    rename_old_quiz_question()
+    create_quiz_question(partitioned=False)
+    op.execute(
+        'INSERT INTO quiz_question (quiz_id, question_id, position, answer) '
+        'SELECT quiz_id, question_id, position, answer '
+        'FROM quiz_question_old'
+    )
+    op.drop_table('quiz_question_old')
@@ -0,0 +1,41 @@
+"""random sampling
+
+Revision ID: b7e4f2a91c3d
+Revises: a6d3e1f4c820
+Create Date: 2026-10-18 19:41:08.532917
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e4f2a91c3d'
+down_revision: Union[str, None] = 'a6d3e1f4c820'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Значение по умолчанию вычисляется для каждой существующей строки.
+    op.add_column('question', sa.Column('random_key', sa.Double(),
+                                        server_default=sa.text('random()'),
+                                        nullable=False))
+    op.create_index('ix_question_random_key', 'question', ['random_key'],
+                    unique=False)
+    op.add_column('quiz', sa.Column('user_id', sa.String(length=64),
+                                    nullable=True))
+    op.create_index('ix_quiz_user_id', 'quiz', ['user_id'], unique=False)
+    op.execute('ALTER TABLE IF EXISTS archive.quiz '
+               'ADD COLUMN IF NOT EXISTS user_id varchar(64)')
+
+
+def downgrade() -> None:
+    op.execute('ALTER TABLE IF EXISTS archive.quiz '
+               'DROP COLUMN IF EXISTS user_id')
+    op.drop_index('ix_quiz_user_id', table_name='quiz')
+    op.drop_column('quiz', 'user_id')
+    op.drop_index('ix_question_random_key', table_name='question')
+    op.drop_column('question', 'random_key')
@@ -0,0 +1,44 @@
+"""quiz cursor
+
+Revision ID: c41a8e5f02d7
+Revises: 9e2d4b7c1a35
+Create Date: 2026-10-18 12:20:33.104766
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41a8e5f02d7'
+down_revision: Union[str, None] = '9e2d4b7c1a35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('quiz', sa.Column('current_position', sa.Integer(),
+                                    nullable=False, server_default='0'))
+    op.add_column('quiz', sa.Column('total', sa.Integer(),
+                                    nullable=False, server_default='0'))
+    op.execute(
+        'UPDATE quiz SET total = stats.total, '
+        'current_position = coalesce(stats.first_open, stats.total) '
+        'FROM (SELECT quiz_id, count(*) AS total, '
+        'min(position) FILTER (WHERE answer IS NULL) AS first_open '
+        'FROM quiz_question GROUP BY quiz_id) AS stats '
+        'WHERE quiz.quiz_id = stats.quiz_id'
+    )
+    op.alter_column('quiz', 'current_position', server_default=None)
+    op.alter_column('quiz', 'total', server_default=None)
+    op.create_index('ix_quiz_question_quiz_id_position', 'quiz_question',
+                    ['quiz_id', 'position'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_quiz_question_quiz_id_position',
+                  table_name='quiz_question')
+    op.drop_column('quiz', 'total')
+    op.drop_column('quiz', 'current_position')
@@ -0,0 +1,74 @@
+"""normalized answer
+
+Revision ID: d2c7a9e4b816
+Revises: b7e4f2a91c3d
+Create Date: 2026-10-18 21:07:52.104318
+
+"""
+import html
+import re
+import unicodedata
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2c7a9e4b816'
+down_revision: Union[str, None] = 'b7e4f2a91c3d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 10000
+ARTICLES = frozenset(('a', 'an', 'the'))
+TAG = re.compile(r'<[^>]*>')
+APOSTROPHE = re.compile(r"['`\u2019]")
+NOT_WORD = re.compile(r'[\W_]+')
+
+
+def normalize_answer(answer: str) -> str:
+    """Копия `business_layer.grading.normalize_answer` на момент
+    миграции: миграция не должна меняться вместе с кодом приложения."""
+    text = html.unescape(TAG.sub(' ', answer)).casefold()
+    text = ''.join(char for char in unicodedata.normalize('NFKD', text)
+                   if not unicodedata.combining(char))
+    words = NOT_WORD.sub(' ', APOSTROPHE.sub('', text)).split()
+    return ' '.join([word for word in words if word not in ARTICLES]
+                    or words)
+
+
+def upgrade() -> None:
+    op.add_column('question', sa.Column('normalized_answer',
+                                        sa.String(length=255),
+                                        nullable=True))
+    # Нормализация выполняется в Python, как при сохранении вопросов,
+    # поэтому существующие вопросы заполняются пачками по id.
+    connection = op.get_bind()
+    question = sa.table('question',
+                        sa.column('question_id', sa.Integer),
+                        sa.column('correct_answer', sa.String),
+                        sa.column('normalized_answer', sa.String))
+    last_id = None
+    while True:
+        query = (sa.select(question.c.question_id, question.c.correct_answer)
+                 .order_by(question.c.question_id)
+                 .limit(BATCH_SIZE))
+        if last_id is not None:
+            query = query.where(question.c.question_id > last_id)
+        rows = connection.execute(query).all()
+        if not rows:
+            break
+        connection.execute(
+            question.update()
+            .where(question.c.question_id == sa.bindparam('id'))
+            .values(normalized_answer=sa.bindparam('normalized')),
+            [{'id': row.question_id,
+              'normalized': normalize_answer(row.correct_answer)}
+             for row in rows])
+        last_id = rows[-1].question_id
+    op.alter_column('question', 'normalized_answer', nullable=False)
+
+
+def downgrade() -> None:
+    op.drop_column('question', 'normalized_answer')
@@ -0,0 +1,38 @@
+"""question used
+
+Revision ID: e5b8d3f1a7c2
+Revises: f3a1c6d8e925
+Create Date: 2026-10-19 10:12:47.305118
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b8d3f1a7c2'
+down_revision: Union[str, None] = 'f3a1c6d8e925'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('question', sa.Column('used', sa.Boolean(),
+                                        server_default=sa.false(),
+                                        nullable=False))
+    # Вопросы архивных викторин не отмечаются: прежний подсчёт запаса
+    # банка их тоже не учитывал.
+    op.execute('UPDATE question SET used = true '
+               'FROM (SELECT DISTINCT question_id FROM quiz_question) '
+               'AS used_ids '
+               'WHERE question.question_id = used_ids.question_id')
+    op.create_index('ix_question_unused', 'question', ['question_id'],
+                    unique=False, postgresql_where=sa.text('NOT used'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_question_unused', table_name='question',
+                  postgresql_where=sa.text('NOT used'))
+    op.drop_column('question', 'used')
@@ -0,0 +1,159 @@
+"""quiz counters
+
+Revision ID: f3a1c6d8e925
+Revises: d2c7a9e4b816
+Create Date: 2026-10-18 22:14:36.481205
+
+"""
+import html
+import re
+import unicodedata
+from collections import Counter
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a1c6d8e925'
+down_revision: Union[str, None] = 'd2c7a9e4b816'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 10000
+# Настройки проверки ответов по умолчанию на момент миграции.
+MAX_EDIT_DISTANCE = 1
+FUZZY_MIN_LENGTH = 5
+ARTICLES = frozenset(('a', 'an', 'the'))
+TAG = re.compile(r'<[^>]*>')
+APOSTROPHE = re.compile(r"['`\u2019]")
+NOT_WORD = re.compile(r'[\W_]+')
+
+
+def normalize_answer(answer: str) -> str:
+    """Копия `business_layer.grading.normalize_answer` на момент
+    миграции."""
+    text = html.unescape(TAG.sub(' ', answer)).casefold()
+    text = ''.join(char for char in unicodedata.normalize('NFKD', text)
+                   if not unicodedata.combining(char))
+    words = NOT_WORD.sub(' ', APOSTROPHE.sub('', text)).split()
+    return ' '.join([word for word in words if word not in ARTICLES]
+                    or words)
+
+
+def within_edit_distance(first: str, second: str, limit: int) -> bool:
+    """Копия `business_layer.grading.within_edit_distance` на момент
+    миграции."""
+    if len(first) > len(second):
+        first, second = second, first
+    if len(second) - len(first) > limit:
+        return False
+    if first == second:
+        return True
+    start = 0
+    while start < len(first) and first[start] == second[start]:
+        start += 1
+    end = 0
+    while (end < len(first) - start
+           and first[-1 - end] == second[-1 - end]):
+        end += 1
+    first = first[start:len(first) - end]
+    second = second[start:len(second) - end]
+    if not first:
+        return len(second) <= limit
+    over = limit + 1
+    previous = [min(position, over) for position in range(len(second) + 1)]
+    for row, char in enumerate(first, 1):
+        low, high = max(1, row - limit), min(len(second), row + limit)
+        current = [over] * (len(second) + 1)
+        current[0] = min(row, over)
+        for column in range(low, high + 1):
+            current[column] = min(
+                previous[column - 1] + (char != second[column - 1]),
+                previous[column] + 1,
+                current[column - 1] + 1,
+                over)
+        if min(current[low - 1:high + 1]) > limit:
+            return False
+        previous = current
+    return previous[-1] <= limit
+
+
+def grade_answer(answer: str, normalized_correct: str) -> bool:
+    """Копия `business_layer.grading.grade_answer` на момент миграции, с
+    настройками проверки по умолчанию. Миграция не должна меняться вместе
+    с кодом и настройками приложения."""
+    normalized = normalize_answer(answer)
+    if not normalized:
+        return False
+    if normalized == normalized_correct:
+        return True
+    if len(normalized_correct) < FUZZY_MIN_LENGTH:
+        return False
+    return within_edit_distance(normalized, normalized_correct,
+                                MAX_EDIT_DISTANCE)
+
+
+def upgrade() -> None:
+    op.add_column('quiz', sa.Column('answered', sa.Integer(),
+                                    server_default='0', nullable=False))
+    op.add_column('quiz', sa.Column('correct', sa.Integer(),
+                                    server_default='0', nullable=False))
+    # Архивные викторины получают нулевые счётчики: их вопросы лежат в
+    # отсоединённых секциях и не пересчитываются.
+    op.execute('ALTER TABLE IF EXISTS archive.quiz '
+               'ADD COLUMN IF NOT EXISTS answered integer '
+               'NOT NULL DEFAULT 0, '
+               'ADD COLUMN IF NOT EXISTS correct integer NOT NULL DEFAULT 0')
+    # Ответы проверяются в Python, как при записи ответа, поэтому
+    # засчитанные ответы считаются по строкам с ответами, которые
+    # читаются пачками по (quiz_id, question_id). Серверный курсор
+    # asyncpg не закрывается до конца транзакции и мешал бы следующим
+    # миграциям менять таблицы.
+    connection = op.get_bind()
+    answered, correct = Counter(), Counter()
+    last, parameters = None, {'limit': BATCH_SIZE}
+    while True:
+        after = ''
+        if last is not None:
+            after = ('AND (quiz_question.quiz_id, quiz_question.question_id)'
+                     ' > (:quiz_id, :question_id) ')
+            parameters.update(quiz_id=last.quiz_id,
+                              question_id=last.question_id)
+        rows = connection.execute(sa.text(
+            'SELECT quiz_question.quiz_id, quiz_question.question_id, '
+            'quiz_question.answer, question.normalized_answer '
+            'FROM quiz_question JOIN question USING (question_id) '
+            f'WHERE quiz_question.answer IS NOT NULL {after}'
+            'ORDER BY quiz_question.quiz_id, quiz_question.question_id '
+            'LIMIT :limit'), parameters).all()
+        if not rows:
+            break
+        for row in rows:
+            answered[row.quiz_id] += 1
+            correct[row.quiz_id] += grade_answer(row.answer,
+                                                 row.normalized_answer)
+        last = rows[-1]
+    quiz = sa.table('quiz',
+                    sa.column('quiz_id', sa.Uuid),
+                    sa.column('answered', sa.Integer),
+                    sa.column('correct', sa.Integer))
+    counters = [{'id': quiz_id, 'answered': number,
+                 'correct': correct[quiz_id]}
+                for quiz_id, number in answered.items()]
+    for start in range(0, len(counters), BATCH_SIZE):
+        connection.execute(
+            quiz.update()
+            .where(quiz.c.quiz_id == sa.bindparam('id'))
+            .values(answered=sa.bindparam('answered'),
+                    correct=sa.bindparam('correct')),
+            counters[start:start + BATCH_SIZE])
+
+
+def downgrade() -> None:
+    op.execute('ALTER TABLE IF EXISTS archive.quiz '
+               'DROP COLUMN IF EXISTS correct, '
+               'DROP COLUMN IF EXISTS answered')
+    op.drop_column('quiz', 'correct')
+    op.drop_column('quiz', 'answered')
@@ -0,0 +1,137 @@
+"""Микробенчмарк проверки ответов участников викторины.
+
+Сравнивает пропускную способность проверки пакета ответов:
+
+- `normalize_both` - правильный ответ нормализуется при каждой проверке,
+  как без поля `normalized_answer`;
+- `full_distance` - ответ сравнивается с сохранённым нормализованным
+  правильным ответом, опечатки считаются полным расчётом расстояния
+  Левенштейна;
+- `stored` - `grade_answers` с сохранённым нормализованным ответом и
+  расчётом расстояния в полосе;
+- `stored_exact` - то же без допуска опечаток
+  (`grading_max_edit_distance=0`).
+
+Ответы участников - смесь точных ответов в другом регистре и с тегами,
+ответов с опечаткой и неверных ответов. БД не нужна. Запуск из папки
+`quiz`:
+
+    python -m benchmarks.answer_grading --answers 10000
+"""
+import argparse
+import json
+import random
+import string
+import time
+from unittest import mock
+
+from business_layer.grading import (allowed_edits, grade_answer,
+                                    grade_answers, normalize_answer)
+from config import settings
+
+
+def edit_distance(first: str, second: str) -> int:
+    previous = list(range(len(second) + 1))
+    for row, char in enumerate(first, 1):
+        current = [row]
+        for column, other in enumerate(second, 1):
+            current.append(min(previous[column - 1] + (char != other),
+                               previous[column] + 1, current[-1] + 1))
+        previous = current
+    return previous[-1]
+
+
+def sample_answers(number: int, seed: int) -> list[tuple[str, str, str]]:
+    """Тройки (ответ участника, правильный ответ, нормализованный
+    правильный ответ)."""
+    generator = random.Random(seed)
+
+    def words(count):
+        return ' '.join(
+            ''.join(generator.choices(string.ascii_lowercase,
+                                      k=generator.randint(3, 9)))
+            for _ in range(count))
+
+    answers = []
+    for _ in range(number):
+        correct = f'<i>The</i> {words(generator.randint(1, 4)).title()}'
+        normalized = normalize_answer(correct)
+        kind = generator.random()
+        if kind < 0.4:
+            answer = f'the {normalized.upper()}'
+        elif kind < 0.7:
+            position = generator.randrange(len(normalized))
+            answer = normalized[:position] + normalized[position + 1:]
+        else:
+            answer = words(generator.randint(1, 4))
+        answers.append((answer, correct, normalized))
+    return answers
+
+
+def normalize_both(answers):
+    return [grade_answer(answer, normalize_answer(correct))
+            for answer, correct, _ in answers]
+
+
+def full_distance(answers):
+    results = []
+    for answer, _, normalized_correct in answers:
+        normalized = normalize_answer(answer)
+        results.append(bool(normalized) and (
+            normalized == normalized_correct
+            or edit_distance(normalized, normalized_correct)
+            <= allowed_edits(normalized_correct)))
+    return results
+
+
+def stored(answers):
+    return grade_answers((answer, normalized_correct)
+                         for answer, _, normalized_correct in answers)
+
+
+VARIANTS = {
+    'normalize_both': (normalize_both, None),
+    'full_distance': (full_distance, None),
+    'stored': (stored, None),
+    'stored_exact': (stored, 0),
+}
+
+
+def run_variant(name: str, answers: list, repeats: int) -> tuple:
+    """Результаты проверки и кол-во проверенных ответов в секунду."""
+    variant, max_edit_distance = VARIANTS[name]
+    if max_edit_distance is None:
+        max_edit_distance = settings.grading_max_edit_distance
+    with mock.patch.object(settings, 'grading_max_edit_distance',
+                           max_edit_distance):
+        grades = variant(answers)
+        started = time.process_time()
+        for _ in range(repeats):
+            variant(answers)
+        elapsed = time.process_time() - started
+    return grades, len(answers) * repeats / elapsed
+
+
+def main(args: argparse.Namespace):
+    answers = sample_answers(args.answers, args.seed)
+    results = {}
+    expected = None
+    for name in VARIANTS:
+        grades, throughput = run_variant(name, answers, args.repeats)
+        if name != 'stored_exact':
+            expected = expected or grades
+            assert grades == expected, name
+        results[name] = {
+            'answers_per_second': round(throughput),
+            'correct_share': round(sum(grades) / len(grades), 3),
+        }
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--answers', type=int, default=10000,
+                        help='Кол-во ответов в пакете')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    main(parser.parse_args())
@@ -0,0 +1,132 @@
+"""Бенчмарк отправки ответа на вопрос викторины.
+
+Сравнивает прежний путь (`update_question` + `get_next_quiz_question`)
+с `answer_question`, который записывает ответ и получает следующий вопрос
+одним запросом. Для каждого пути считаются обращения к БД (BEGIN,
+запросы, COMMIT/ROLLBACK) и задержка одного ответа.
+
+Запуск из папки `quiz` на пустой БД с применёнными миграциями:
+
+    python -m benchmarks.answer_roundtrips --quizzes 200 --questions 10
+
+Созданные бенчмарком данные удаляются после завершения.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime
+from uuid import uuid4
+
+from sqlalchemy import delete, event
+
+from business_layer import schemas
+from config import settings
+from db_layer.crud import question_crud, quiz_crud
+from db_layer.db_engine import sessionmanager
+from db_layer.models import Question, Quiz
+
+FIRST_QUESTION_ID = 900_000_000
+
+
+class RoundTripCounter:
+    """Считает обращения к БД через события движка Алхимии."""
+
+    def __init__(self, engine):
+        self.count = 0
+        for name in ('begin', 'commit', 'rollback', 'before_cursor_execute'):
+            event.listen(engine, name, self._increment)
+
+    def _increment(self, *args, **kwargs):
+        self.count += 1
+
+
+async def legacy_answer(data, session):
+    question = await question_crud.update_question(data, session)
+    await question_crud.get_next_quiz_question(data.quiz_id, session)
+    return question
+
+
+async def single_statement_answer(data, session):
+    return await question_crud.answer_question(data, session)
+
+
+async def prepare(quizzes: int, questions: int) -> list[list[tuple]]:
+    """Создаёт каталог вопросов и викторины. Возвращает для каждой
+    викторины список пар (quiz_id, question_id) в порядке вопросов."""
+    catalog = [
+        schemas.Question(
+            question_id=FIRST_QUESTION_ID + number,
+            question=f'Benchmark question {number}',
+            correct_answer=f'Benchmark answer {number}',
+            add_date=datetime.now(),
+        )
+        for number in range(questions)
+    ]
+    prepared = []
+    async with sessionmanager.session() as session:
+        await question_crud.create_all(catalog, session)
+        for _ in range(quizzes):
+            quiz_id = uuid4()
+            question_ids = [item.question_id for item in catalog]
+            await quiz_crud.create(quiz_id, question_ids, session)
+            prepared.append([(quiz_id, item) for item in question_ids])
+    return prepared
+
+
+async def cleanup(quiz_ids: list):
+    async with sessionmanager.session() as session:
+        await session.execute(delete(Quiz).where(Quiz.quiz_id.in_(quiz_ids)))
+        await session.execute(
+            delete(Question)
+            .where(Question.question_id >= FIRST_QUESTION_ID))
+        await session.commit()
+
+
+async def run_variant(answer, quizzes, counter) -> dict:
+    latencies = []
+    start_count = counter.count
+    for quiz in quizzes:
+        for quiz_id, question_id in quiz:
+            data = schemas.QuizAnswer(
+                quiz_id=quiz_id, question_id=question_id, answer='Ответ')
+            started = time.perf_counter()
+            async with sessionmanager.session() as session:
+                await answer(data, session)
+            latencies.append(time.perf_counter() - started)
+    answers = len(latencies)
+    return {
+        'answers': answers,
+        'round_trips_per_answer': (counter.count - start_count) / answers,
+        'latency_mean_ms': statistics.fmean(latencies) * 1000,
+        'latency_p50_ms': statistics.median(latencies) * 1000,
+        'latency_p95_ms': (
+            statistics.quantiles(latencies, n=20)[-1] * 1000),
+    }
+
+
+async def main(quizzes: int, questions: int):
+    sessionmanager.init(settings.database_url)
+    counter = RoundTripCounter(sessionmanager._engine.sync_engine)
+    legacy_quizzes = await prepare(quizzes, questions)
+    new_quizzes = await prepare(quizzes, questions)
+    try:
+        results = {
+            'before': await run_variant(legacy_answer, legacy_quizzes,
+                                        counter),
+            'after': await run_variant(single_statement_answer,
+                                       new_quizzes, counter),
+        }
+    finally:
+        await cleanup([quiz[0][0] for quiz in legacy_quizzes + new_quizzes])
+        await sessionmanager.close()
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--quizzes', type=int, default=200)
+    parser.add_argument('--questions', type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.quizzes, args.questions))
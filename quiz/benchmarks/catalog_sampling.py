@@ -0,0 +1,157 @@
+"""Бенчмарк выборки случайных вопросов из каталога.
+
+Сравнивает задержку выборки `--questions` вопросов на каталоге заданных
+размеров:
+
+- `order_by_random` - `ORDER BY random() LIMIT N`, сортировка всей
+  таблицы;
+- `id_range` - прежняя выборка диапазона первичного ключа от случайного
+  `question_id`: дробная граница приводит `question_id` к double
+  precision, и индекс просматривается с фильтром от начала;
+- `random_key` - `QuestionCRUD.sample` по индексу `random_key`;
+- `random_key_unseen` - то же с исключением вопросов `--seen-quizzes`
+  прошлых викторин участника.
+
+Каталог дополняется строками на стороне сервера до каждого размера из
+`--rows`. Запуск из папки `quiz` на отдельной БД с применёнными
+миграциями:
+
+    python -m benchmarks.catalog_sampling --rows 1000000 10000000
+
+Созданные бенчмарком данные удаляются после завершения.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from uuid import uuid4
+
+from sqlalchemy import delete, text
+
+from config import settings
+from db_layer.crud import question_crud, quiz_crud
+from db_layer.db_engine import sessionmanager
+from db_layer.models import Question, Quiz
+
+FIRST_QUESTION_ID = 600_000_000
+USER_ID = 'catalog-sampling-benchmark'
+ORDER_BY_RANDOM = text(
+    'SELECT * FROM question ORDER BY random() LIMIT :number')
+ID_RANGE = text(
+    'WITH start AS (SELECT min(question_id) + (max(question_id) '
+    '- min(question_id)) * random() AS id FROM question) '
+    '(SELECT * FROM question WHERE question_id >= (SELECT id FROM start) '
+    'ORDER BY question_id LIMIT :number) UNION ALL '
+    '(SELECT * FROM question WHERE question_id < (SELECT id FROM start) '
+    'ORDER BY question_id LIMIT :number) LIMIT :number')
+
+
+async def grow_catalog(stored: int, rows: int):
+    """Дополняет каталог строками с id от `FIRST_QUESTION_ID + stored`
+    до `rows` строк бенчмарка."""
+    async with sessionmanager.session() as session:
+        await session.execute(text(
+            'INSERT INTO question (question_id, question, correct_answer, '
+            'normalized_answer, add_date) SELECT id, :prefix || id, '
+            ':prefix || id, lower(:prefix) || id, now() '
+            'FROM generate_series(CAST(:first AS integer), '
+            'CAST(:last AS integer)) AS id'),
+            {'prefix': 'Benchmark ', 'first': FIRST_QUESTION_ID + stored,
+             'last': FIRST_QUESTION_ID + rows - 1})
+        await session.commit()
+        await session.execute(text('ANALYZE question'))
+
+
+async def create_seen_quizzes(quizzes: int, questions: int):
+    async with sessionmanager.session() as session:
+        for _ in range(quizzes):
+            sampled = await question_crud.sample(questions, session)
+            await quiz_crud.create(
+                uuid4(), [item.question_id for item in sampled], session,
+                user_id=USER_ID)
+
+
+async def measure(sample, repeats: int) -> dict:
+    latencies = []
+    for _ in range(repeats):
+        async with sessionmanager.session() as session:
+            started = time.perf_counter()
+            await sample(session)
+            latencies.append(time.perf_counter() - started)
+    return {
+        'latency_mean_ms': statistics.fmean(latencies) * 1000,
+        'latency_p95_ms': (statistics.quantiles(latencies, n=20)[-1]
+                           * 1000 if repeats > 1 else latencies[0] * 1000),
+    }
+
+
+async def run_size(args: argparse.Namespace) -> dict:
+    number = args.questions
+
+    async def order_by_random(session):
+        await session.execute(ORDER_BY_RANDOM, {'number': number})
+
+    async def id_range(session):
+        await session.execute(ID_RANGE, {'number': number})
+
+    async def random_key(session):
+        await question_crud.sample(number, session)
+
+    async def random_key_unseen(session):
+        await question_crud.sample(number, session, USER_ID)
+
+    variants = {
+        'order_by_random': (order_by_random, args.slow_repeats),
+        'id_range': (id_range, args.slow_repeats),
+        'random_key': (random_key, args.repeats),
+        'random_key_unseen': (random_key_unseen, args.repeats),
+    }
+    return {name: await measure(sample, repeats)
+            for name, (sample, repeats) in variants.items()}
+
+
+async def cleanup():
+    async with sessionmanager.session() as session:
+        await session.execute(delete(Quiz).where(Quiz.user_id == USER_ID))
+        await session.execute(
+            delete(Question)
+            .where(Question.question_id >= FIRST_QUESTION_ID))
+        await session.commit()
+
+
+async def main(args: argparse.Namespace):
+    sessionmanager.init(settings.database_url)
+    results = {}
+    stored = 0
+    try:
+        for rows in sorted(args.rows):
+            started = time.perf_counter()
+            await grow_catalog(stored, rows)
+            stored = rows
+            if not results:
+                await create_seen_quizzes(args.seen_quizzes, args.questions)
+            results[rows] = {
+                'seed_s': round(time.perf_counter() - started, 1),
+                **await run_size(args),
+            }
+            print(json.dumps({rows: results[rows]}, indent=4), flush=True)
+    finally:
+        await cleanup()
+        await sessionmanager.close()
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+',
+                        default=[1_000_000, 10_000_000],
+                        help='Размеры каталога')
+    parser.add_argument('--questions', type=int, default=100,
+                        help='Кол-во вопросов в выборке')
+    parser.add_argument('--seen-quizzes', type=int, default=50,
+                        help='Кол-во прошлых викторин участника')
+    parser.add_argument('--repeats', type=int, default=200)
+    parser.add_argument('--slow-repeats', type=int, default=5,
+                        help='Кол-во повторов для медленных запросов')
+    asyncio.run(main(parser.parse_args()))
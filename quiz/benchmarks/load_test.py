@@ -0,0 +1,272 @@
+"""Нагрузочный бенчмарк эндпойнтов викторины.
+
+Виртуальные участники параллельно проходят викторины: стартуют
+викторину, отвечают на все её вопросы и время от времени запрашивают
+следующий вопрос. Для каждого эндпойнта считаются пропускная способность
+и задержки p50/p95/p99. Результат сохраняется в JSON вместе с хешем
+коммита, а с параметром `--baseline` сравнивается с прошлым прогоном.
+
+По умолчанию приложение запускается в том же процессе (httpx +
+ASGITransport) на БД из настроек, а внешний API вопросов заменяется
+генератором вопросов с заданной задержкой. С параметром `--url` нагрузка
+подаётся на запущенный сервер; тогда внешний API не подменяется, поэтому
+каталог должен вмещать вопросы всех викторин (`--catalog`).
+
+Запуск из папки `quiz` на БД с применёнными миграциями:
+
+    python -m benchmarks.load_test --users 20 --quizzes 5 --questions 10 \\
+        --output load_test.json --baseline previous.json
+
+Созданные бенчмарком данные удаляются после завершения.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+from uuid import UUID
+
+import httpx
+from sqlalchemy import delete
+
+from business_layer import schemas
+from business_layer.http_client import question_api_client
+from config import settings
+from db_layer.crud import question_crud
+from db_layer.db_engine import sessionmanager
+from db_layer.models import Question, Quiz
+from main import init_app
+
+FIRST_QUESTION_ID = 800_000_000
+START_QUIZ = 'POST /api/v1/quiz'
+ANSWER = 'POST /api/v1/quiz/answer'
+NEXT_QUESTION = 'GET /api/v1/quiz/next_question/{quiz_id}'
+
+
+class FakeQuestionSource:
+    """Замена `QuestionAPIClient.get_json`: отвечает вопросами из
+    диапазона `size` id с задержкой `latency` секунд."""
+
+    def __init__(self, size: int, latency: float):
+        self.size = size
+        self.latency = latency
+        self.calls = 0
+
+    async def __call__(self, url: str) -> list[dict]:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        count = int(parse_qs(urlparse(url).query).get('count', ['1'])[0])
+        return [
+            {'id': question_id,
+             'question': f'Load test question {question_id}',
+             'answer': f'Load test answer {question_id}'}
+            for question_id in (
+                FIRST_QUESTION_ID + random.randrange(self.size)
+                for _ in range(count))
+        ]
+
+
+class LatencyRecorder:
+    """Собирает задержки и ошибки запросов по эндпойнтам."""
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+
+    async def timed(self, endpoint: str, request) -> httpx.Response | None:
+        started = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError:
+            response = None
+        self.latencies[endpoint].append(time.perf_counter() - started)
+        if response is None or response.status_code >= 400:
+            self.errors[endpoint] += 1
+            return None
+        return response
+
+    @staticmethod
+    def describe(latencies: list[float], errors: int,
+                 elapsed: float) -> dict:
+        percentiles = (statistics.quantiles(latencies, n=100)
+                       if len(latencies) > 1 else latencies * 99)
+        return {
+            'requests': len(latencies),
+            'errors': errors,
+            'throughput_rps': len(latencies) / elapsed,
+            'latency_mean_ms': statistics.fmean(latencies) * 1000,
+            'latency_p50_ms': percentiles[49] * 1000,
+            'latency_p95_ms': percentiles[94] * 1000,
+            'latency_p99_ms': percentiles[98] * 1000,
+        }
+
+    def summary(self, elapsed: float) -> dict:
+        endpoints = {
+            endpoint: self.describe(latencies, self.errors[endpoint],
+                                    elapsed)
+            for endpoint, latencies in sorted(self.latencies.items())
+        }
+        all_latencies = [item for latencies in self.latencies.values()
+                         for item in latencies]
+        total = self.describe(all_latencies, sum(self.errors.values()),
+                              elapsed) if all_latencies else {}
+        return {'endpoints': endpoints, 'total': total}
+
+
+async def run_user(
+    client: httpx.AsyncClient,
+    recorder: LatencyRecorder,
+    args: argparse.Namespace,
+    quiz_ids: list[str],
+):
+    """Сценарий одного участника: `--quizzes` викторин по `--questions`
+    вопросов, ответ на каждый вопрос, запрос следующего вопроса с
+    вероятностью `--next-question-ratio`."""
+    for _ in range(args.quizzes):
+        response = await recorder.timed(START_QUIZ, client.post(
+            '/api/v1/quiz/', json={'questions_num': args.questions}))
+        if response is None:
+            continue
+        data = response.json()
+        quiz_id = data['quiz_id']
+        quiz_ids.append(quiz_id)
+        question_id = data.get('question_id')
+        while question_id is not None:
+            if random.random() < args.next_question_ratio:
+                await recorder.timed(NEXT_QUESTION, client.get(
+                    f'/api/v1/quiz/next_question/{quiz_id}'))
+            response = await recorder.timed(ANSWER, client.post(
+                '/api/v1/quiz/answer',
+                json={'quiz_id': quiz_id, 'question_id': question_id,
+                      'answer': 'Load test answer'}))
+            if response is None:
+                break
+            question_id = response.json().get('question_id')
+
+
+async def seed_catalog(size: int):
+    catalog = [
+        schemas.Question(
+            question_id=FIRST_QUESTION_ID + number,
+            question=f'Load test question {number}',
+            correct_answer=f'Load test answer {number}',
+            add_date=datetime.now(),
+        )
+        for number in range(size)
+    ]
+    async with sessionmanager.session() as session:
+        for start in range(0, size, 1000):
+            await question_crud.create_all(catalog[start:start + 1000],
+                                           session)
+
+
+async def cleanup(quiz_ids: list[str]):
+    async with sessionmanager.session() as session:
+        for start in range(0, len(quiz_ids), 1000):
+            chunk = [UUID(item) for item in quiz_ids[start:start + 1000]]
+            await session.execute(delete(Quiz).where(Quiz.quiz_id.in_(chunk)))
+        await session.execute(
+            delete(Question)
+            .where(Question.question_id >= FIRST_QUESTION_ID))
+        await session.commit()
+
+
+def current_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+            text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict) -> dict:
+    """Изменение метрик относительно прошлого прогона в процентах."""
+    changes = {}
+    for endpoint, metrics in results['endpoints'].items():
+        previous = baseline['endpoints'].get(endpoint)
+        if not previous:
+            continue
+        changes[endpoint] = {
+            name: round((value - previous[name]) / previous[name] * 100, 1)
+            for name, value in metrics.items()
+            if name.startswith(('latency', 'throughput')) and previous[name]
+        }
+    return changes
+
+
+async def run_load(args: argparse.Namespace, recorder: LatencyRecorder,
+                   quiz_ids: list[str]) -> float:
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60)
+    else:
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=init_app(init_db=False)),
+            base_url='http://load-test', timeout=60)
+    started = time.perf_counter()
+    async with client:
+        await asyncio.gather(*(run_user(client, recorder, args, quiz_ids)
+                               for _ in range(args.users)))
+    return time.perf_counter() - started
+
+
+async def main(args: argparse.Namespace):
+    sessionmanager.init(settings.database_url,
+                        **settings.database_engine_options)
+    source = FakeQuestionSource(args.source_size, args.source_latency)
+    recorder = LatencyRecorder()
+    quiz_ids: list[str] = []
+    try:
+        await seed_catalog(args.catalog)
+        with mock.patch.object(question_api_client, 'get_json', source):
+            elapsed = await run_load(args, recorder, quiz_ids)
+    finally:
+        await cleanup(quiz_ids)
+        await sessionmanager.close()
+    results = {
+        'commit': current_commit(),
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'parameters': {name: value for name, value in vars(args).items()
+                       if name not in ('output', 'baseline')},
+        'elapsed_s': elapsed,
+        'upstream_calls': source.calls,
+        **recorder.summary(elapsed),
+    }
+    if args.baseline:
+        with open(args.baseline) as file:
+            results['change_vs_baseline_pct'] = compare(results,
+                                                        json.load(file))
+    output = json.dumps(results, indent=4)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output)
+    print(output)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=20,
+                        help='Кол-во одновременных участников')
+    parser.add_argument('--quizzes', type=int, default=5,
+                        help='Кол-во викторин на участника')
+    parser.add_argument('--questions', type=int, default=10,
+                        help='Кол-во вопросов в викторине')
+    parser.add_argument('--next-question-ratio', type=float, default=0.2,
+                        help='Вероятность запроса следующего вопроса '
+                             'перед ответом')
+    parser.add_argument('--catalog', type=int, default=200,
+                        help='Кол-во вопросов в каталоге перед запуском')
+    parser.add_argument('--source-size', type=int, default=100_000,
+                        help='Кол-во разных вопросов во внешнем API')
+    parser.add_argument('--source-latency', type=float, default=0.05,
+                        help='Задержка ответа внешнего API, сек.')
+    parser.add_argument('--url', help='Адрес запущенного сервера')
+    parser.add_argument('--output', help='Файл для сохранения результата')
+    parser.add_argument('--baseline', help='Результат прошлого прогона')
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,129 @@
+"""Микробенчмарк сериализации ответов эндпойнтов викторины.
+
+Сравнивает процессорное время на формирование тела ответа:
+
+- `validated` - модель Pydantic из данных БД, её повторная проверка по
+  `response_model` маршрута (`fastapi.routing.serialize_response`) и
+  `JSONResponse`, как при `fast_json_responses=False`;
+- `fast` - словарь из тех же данных, сериализованный orjson
+  (`entrypoints.quiz.quiz_response` при `fast_json_responses=True`).
+
+Для проверки берутся поля ответа настоящих маршрутов приложения. БД не
+нужна. Запуск из папки `quiz`:
+
+    python -m benchmarks.response_serialization --iterations 20000
+"""
+import argparse
+import asyncio
+import json
+import time
+from unittest import mock
+from uuid import uuid4
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+
+from business_layer import schemas
+from config import settings
+from entrypoints.quiz import quiz_response
+from main import init_app
+
+
+def route_fields() -> dict:
+    """Поля ответа маршрутов викторины по модели ответа."""
+    return {
+        route.response_model: route.response_field
+        for route in init_app(init_db=False).routes
+        if isinstance(route, APIRoute) and route.response_model is not None
+    }
+
+
+def sample_responses(questions: int) -> dict:
+    """Данные ответов в том виде, в каком их возвращают CRUD-классы:
+    схема ответа и поля для неё."""
+    quiz_id = uuid4()
+    items = [{'question_id': 100_000 + number,
+              'question': f'Benchmark question number {number}?'}
+             for number in range(questions)]
+    return {
+        'answer': (schemas.QuizResponseFull, {
+            'quiz_id': quiz_id,
+            'previous_question_correct_answer': 'Benchmark answer',
+            'question_id': items[0]['question_id'],
+            'question': items[0]['question'],
+        }),
+        'next_question': (schemas.QuizResponseNoAnswer, {
+            'quiz_id': quiz_id,
+            'question_id': items[0]['question_id'],
+            'question': items[0]['question'],
+            'previous_question_correct_answer': None,
+        }),
+        'questions': (schemas.QuizQuestions, {
+            'quiz_id': quiz_id,
+            'questions': items,
+        }),
+        'answers': (schemas.QuizBatchResponse, {
+            'quiz_id': quiz_id,
+            'answered': [{'question_id': item['question_id'],
+                          'correct_answer': 'Benchmark answer'}
+                         for item in items],
+            'rejected': [],
+            'question_id': None,
+            'question': None,
+        }),
+    }
+
+
+async def validated_response(schema, fields, response_field) -> bytes:
+    content = quiz_response(schema, **fields)
+    content = await serialize_response(
+        field=response_field, response_content=content, exclude_none=True)
+    return JSONResponse(content).body
+
+
+async def fast_response(schema, fields, response_field) -> bytes:
+    return quiz_response(schema, **fields).body
+
+
+VARIANTS = {
+    'validated': (validated_response, False),
+    'fast': (fast_response, True),
+}
+
+
+async def run_variant(name: str, args, iterations: int) -> tuple:
+    """Тело ответа и процессорное время одного вызова в мкс."""
+    variant, fast = VARIANTS[name]
+    with mock.patch.object(settings, 'fast_json_responses', fast):
+        body = await variant(*args)
+        started = time.process_time()
+        for _ in range(iterations):
+            await variant(*args)
+        elapsed = time.process_time() - started
+    return body, elapsed / iterations * 1_000_000
+
+
+async def main(iterations: int, questions: int):
+    fields_by_model = route_fields()
+    results = {}
+    for name, (schema, fields) in sample_responses(questions).items():
+        args = (schema, fields, fields_by_model[schema])
+        validated, before = await run_variant('validated', args, iterations)
+        fast, after = await run_variant('fast', args, iterations)
+        assert json.loads(validated) == json.loads(fast), name
+        results[name] = {
+            'validated_cpu_us': round(before, 2),
+            'fast_cpu_us': round(after, 2),
+            'saved_cpu_us': round(before - after, 2),
+            'speedup': round(before / after, 2),
+        }
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=20000)
+    parser.add_argument('--questions', type=int, default=10,
+                        help='Кол-во вопросов в ответах со списками')
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.questions))
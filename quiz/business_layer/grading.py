@@ -0,0 +1,106 @@
+"""Проверка ответов участников викторины.
+
+Правильный ответ нормализуется один раз, при сохранении вопроса в
+каталог, и хранится в поле `normalized_answer`. При проверке
+нормализуется только ответ участника и сравнивается с сохранённым
+значением. Если строки не совпали, ответ засчитывается при расстоянии
+Левенштейна не больше `grading_max_edit_distance`, но только для
+правильных ответов не короче `grading_fuzzy_min_length` символов.
+Расстояние считается после отбрасывания общих начала и конца строк, в
+полосе шириной `2 * limit + 1` вокруг диагонали, поэтому проверка
+занимает O(limit * n), а не O(n * m).
+"""
+import html
+import re
+import unicodedata
+from typing import Iterable
+
+from config import settings
+
+ARTICLES = frozenset(('a', 'an', 'the'))
+TAG = re.compile(r'<[^>]*>')
+APOSTROPHE = re.compile(r"['`\u2019]")
+NOT_WORD = re.compile(r'[\W_]+')
+
+
+def normalize_answer(answer: str) -> str:
+    """Приводит ответ к виду для сравнения: без тегов HTML и сущностей,
+    без регистра, диакритики, апострофов, знаков препинания и артиклей,
+    с одиночными пробелами между словами. Ответ из одних артиклей
+    сохраняется."""
+    text = html.unescape(TAG.sub(' ', answer)).casefold()
+    text = ''.join(char for char in unicodedata.normalize('NFKD', text)
+                   if not unicodedata.combining(char))
+    words = NOT_WORD.sub(' ', APOSTROPHE.sub('', text)).split()
+    return ' '.join([word for word in words if word not in ARTICLES]
+                    or words)
+
+
+def within_edit_distance(first: str, second: str, limit: int) -> bool:
+    """Проверяет, что расстояние Левенштейна между строками не больше
+    `limit`. Ячейки вне полосы и значения больше `limit` не вычисляются,
+    проверка прекращается, как только вся строка полосы превысила
+    `limit`."""
+    if len(first) > len(second):
+        first, second = second, first
+    if len(second) - len(first) > limit:
+        return False
+    if first == second:
+        return True
+    # Общие начало и конец не меняют расстояние, а у ответа с опечаткой
+    # после их отбрасывания остаётся несколько символов.
+    start = 0
+    while start < len(first) and first[start] == second[start]:
+        start += 1
+    end = 0
+    while (end < len(first) - start
+           and first[-1 - end] == second[-1 - end]):
+        end += 1
+    first = first[start:len(first) - end]
+    second = second[start:len(second) - end]
+    if not first:
+        return len(second) <= limit
+    over = limit + 1
+    previous = [min(position, over) for position in range(len(second) + 1)]
+    for row, char in enumerate(first, 1):
+        low, high = max(1, row - limit), min(len(second), row + limit)
+        current = [over] * (len(second) + 1)
+        current[0] = min(row, over)
+        for column in range(low, high + 1):
+            current[column] = min(
+                previous[column - 1] + (char != second[column - 1]),
+                previous[column] + 1,
+                current[column - 1] + 1,
+                over)
+        if min(current[low - 1:high + 1]) > limit:
+            return False
+        previous = current
+    return previous[-1] <= limit
+
+
+def allowed_edits(normalized_correct: str) -> int:
+    """Допустимое кол-во опечаток для нормализованного правильного
+    ответа."""
+    if len(normalized_correct) < settings.grading_fuzzy_min_length:
+        return 0
+    return settings.grading_max_edit_distance
+
+
+def grade_answer(answer: str, normalized_correct: str) -> bool:
+    """Проверяет ответ участника по нормализованному правильному
+    ответу."""
+    normalized = normalize_answer(answer)
+    if not normalized:
+        return False
+    if normalized == normalized_correct:
+        return True
+    limit = allowed_edits(normalized_correct)
+    return limit > 0 and within_edit_distance(normalized,
+                                              normalized_correct, limit)
+
+
+def grade_answers(answers: Iterable[tuple[str, str]]) -> list[bool]:
+    """Проверяет пакет пар (ответ участника, нормализованный правильный
+    ответ)."""
+    return [grade_answer(answer, normalized_correct)
+            for answer, normalized_correct in answers]
@@ -0,0 +1,71 @@
+"""Общий для приложения HTTP-клиент внешнего API с вопросами."""
+import asyncio
+import logging
+import random
+from typing import Any
+
+import aiohttp
+
+from config import settings
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class QuestionAPIError(Exception):
+    """Внешнее API с вопросами недоступно или вернуло ошибку."""
+
+
+class QuestionAPIClient:
+    """Клиент с общим пулом соединений к внешнему API. Создаётся при
+    старте приложения и закрывается при его остановке."""
+
+    def __init__(self):
+        self._session: aiohttp.ClientSession | None = None
+
+    def init(self):
+        connector = aiohttp.TCPConnector(
+            limit=settings.quiz_api_connection_limit,
+            keepalive_timeout=settings.quiz_api_keepalive_timeout,
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=settings.quiz_api_timeout,
+            connect=settings.quiz_api_connect_timeout,
+        )
+        self._session = aiohttp.ClientSession(connector=connector,
+                                              timeout=timeout)
+
+    async def close(self):
+        if self._session is None:
+            raise Exception("QuestionAPIClient is not initialized")
+        await self._session.close()
+        self._session = None
+
+    async def get_json(self, url: str) -> Any:
+        """Метод выполняет GET-запрос и возвращает тело ответа в JSON.
+        Таймауты, сетевые ошибки и ответы 429/5xx повторяются не более
+        `quiz_api_retries` раз с экспоненциальной задержкой и случайным
+        разбросом. Если ответ так и не получен, выбрасывается
+        QuestionAPIError."""
+        if self._session is None:
+            raise Exception("QuestionAPIClient is not initialized")
+        attempts = settings.quiz_api_retries + 1
+        for attempt in range(attempts):
+            try:
+                async with self._session.get(url) as resp:
+                    if resp.status == 200:
+                        return await resp.json()
+                    error = QuestionAPIError(
+                        f'Внешнее API вернуло статус {resp.status}')
+                    if resp.status not in RETRY_STATUSES:
+                        raise error
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = QuestionAPIError(
+                    f'Ошибка обращения к внешнему API: {e!r}')
+            if attempt + 1 < attempts:
+                logging.warning('%s, повтор запроса', error)
+                await asyncio.sleep(random.uniform(
+                    0, settings.quiz_api_retry_backoff * 2 ** attempt))
+        raise error
+
+
+question_api_client = QuestionAPIClient()
@@ -0,0 +1,43 @@
+"""Фоновое пополнение локального банка (каталога) вопросов."""
+import asyncio
+import logging
+
+from business_layer.question_retrieval import get_questions
+from config import settings
+from db_layer import db_engine as db
+from db_layer.crud import question_crud
+
+
+async def refill_question_bank(session: db.AsyncSession) -> int:
+    """Функция пополняет каталог вопросов до `question_bank_size`
+    неиспользованных вопросов, если их меньше
+    `question_bank_low_water_mark`. Викторины выбирают вопросы из
+    каталога, не удаляя их, поэтому учитываются только вопросы, которые
+    ещё не попали ни в одну викторину. Возвращает кол-во добавленных в
+    каталог вопросов."""
+    unused = await question_crud.count_unused(session)
+    if unused >= settings.question_bank_low_water_mark:
+        return 0
+    added = 0
+    missing = settings.question_bank_size - unused
+    while missing > 0:
+        number = min(missing, settings.quiz_api_max_count)
+        questions = await get_questions(number)
+        if not questions:
+            break
+        added += len(await question_crud.create_all(questions, session))
+        missing -= number
+    return added
+
+
+async def run_question_bank_refiller():
+    """Бесконечный цикл фоновой задачи: периодически проверяет запас
+    неиспользованных вопросов каталога и пополняет его. Ошибки
+    логируются и не прерывают работу задачи."""
+    while True:
+        try:
+            async with db.sessionmanager.session() as session:
+                await refill_question_bank(session)
+        except Exception as e:
+            logging.exception(e)
+        await asyncio.sleep(settings.question_bank_refill_interval)
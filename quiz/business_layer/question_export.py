@@ -0,0 +1,110 @@
+"""Потоковая выгрузка каталога вопросов в NDJSON или CSV.
+
+Вопросы читаются серверным курсором и записываются пачками по
+`export_chunk_size` строк, поэтому расход памяти не зависит от размера
+таблицы. Выгрузка доступна через эндпойнт администратора и из командной
+строки (из папки `quiz`):
+
+    python -m business_layer.question_export --format csv \\
+        --date-from 2024-01-01 --date-to 2024-02-01 --output questions.csv
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import sys
+from datetime import datetime
+from typing import AsyncIterator, Sequence
+
+from sqlalchemy import Row
+
+from config import settings
+from db_layer.crud import question_crud
+from db_layer.db_engine import sessionmanager
+
+EXPORT_FIELDS = ('question_id', 'question', 'correct_answer', 'add_date')
+EXPORT_MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def _rows_to_ndjson(rows: Sequence[Row]) -> str:
+    return ''.join(
+        json.dumps({'question_id': row.question_id,
+                    'question': row.question,
+                    'correct_answer': row.correct_answer,
+                    'add_date': row.add_date.isoformat()},
+                   ensure_ascii=False) + '\n'
+        for row in rows
+    )
+
+
+def _rows_to_csv(rows: Sequence[Row], header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    writer.writerows(
+        (row.question_id, row.question, row.correct_answer,
+         row.add_date.isoformat())
+        for row in rows
+    )
+    return buffer.getvalue()
+
+
+async def export_questions(
+    export_format: str = 'ndjson',
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    chunk_size: int | None = None,
+) -> AsyncIterator[bytes]:
+    """Генератор выгрузки каталога вопросов. Каждая пачка строк отдаётся
+    одним куском байтов в UTF-8. Сессия БД открывается на время
+    выгрузки и не зависит от сессии запроса."""
+    if export_format not in EXPORT_MEDIA_TYPES:
+        raise ValueError(f'Неизвестный формат выгрузки: {export_format}')
+    chunk_size = chunk_size or settings.export_chunk_size
+    header = export_format == 'csv'
+    async with sessionmanager.session() as session:
+        async with session.begin():
+            async for rows in question_crud.stream_chunks(
+                    session, chunk_size, date_from, date_to):
+                if export_format == 'csv':
+                    chunk = _rows_to_csv(rows, header=header)
+                    header = False
+                else:
+                    chunk = _rows_to_ndjson(rows)
+                yield chunk.encode()
+    if header:
+        yield _rows_to_csv([], header=True).encode()
+
+
+async def main(args: argparse.Namespace) -> None:
+    sessionmanager.init(settings.database_url,
+                        **settings.database_engine_options)
+    output = (open(args.output, 'wb') if args.output
+              else sys.stdout.buffer)
+    try:
+        async for chunk in export_questions(args.format, args.date_from,
+                                            args.date_to, args.chunk_size):
+            output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
+        await sessionmanager.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--format', choices=sorted(EXPORT_MEDIA_TYPES),
+                        default='ndjson')
+    parser.add_argument('--date-from', type=datetime.fromisoformat,
+                        help='Начало интервала add_date (включительно)')
+    parser.add_argument('--date-to', type=datetime.fromisoformat,
+                        help='Конец интервала add_date (не включительно)')
+    parser.add_argument('--chunk-size', type=int,
+                        default=settings.export_chunk_size)
+    parser.add_argument('--output', help='Файл выгрузки, по умолчанию stdout')
+    asyncio.run(main(parser.parse_args()))
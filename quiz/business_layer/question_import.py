@@ -0,0 +1,133 @@
+"""Массовая загрузка вопросов в каталог из файла JSONL или CSV.
+
+Файл читается построчно, строки проверяются пачками по
+`import_batch_size` и загружаются командой COPY через временную таблицу.
+Вопросы, уже имеющиеся в каталоге, пропускаются. Формат файла совпадает
+с форматом выгрузки `business_layer.question_export`; если в строке нет
+`add_date`, используется время запуска загрузки.
+
+Запуск из папки `quiz`:
+
+    python -m business_layer.question_import questions.jsonl
+"""
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+from pydantic import TypeAdapter, ValidationError
+
+from business_layer import schemas
+from config import settings
+from db_layer import db_engine as db
+from db_layer.crud import question_crud
+from db_layer.db_engine import sessionmanager
+
+question_batch = TypeAdapter(list[schemas.Question])
+
+
+@dataclass
+class ImportReport:
+    """Итоги загрузки: прочитано строк, отклонено при проверке,
+    добавлено в каталог и пропущено как уже имеющиеся."""
+    read: int = 0
+    rejected: int = 0
+    imported: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.read / self.seconds if self.seconds else 0.0
+
+
+def read_rows(path: Path, import_format: str | None = None) -> Iterator[dict]:
+    """Построчно читает файл JSONL или CSV. Формат определяется по
+    расширению файла, если не задан явно."""
+    import_format = import_format or (
+        'csv' if path.suffix.lower() == '.csv' else 'jsonl')
+    with path.open(encoding='utf-8', newline='') as file:
+        if import_format == 'csv':
+            yield from csv.DictReader(file)
+            return
+        for line in file:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # Пустая строка не пройдёт проверку и будет отклонена.
+                yield {}
+
+
+def validate_batch(rows: list[dict],
+                   default_date: datetime) -> tuple[list[tuple], int]:
+    """Проверяет пачку строк одним вызовом валидатора. Возвращает записи
+    для загрузки и кол-во отклонённых строк. Строки JSONL, которые не
+    являются объектом (массив, число, строка), отклоняются."""
+    # Пустая строка не пройдёт проверку и будет отклонена.
+    rows = [row if isinstance(row, dict) else {} for row in rows]
+    for row in rows:
+        if not row.get('add_date'):
+            row['add_date'] = default_date
+    try:
+        questions = question_batch.validate_python(rows)
+    except ValidationError as e:
+        invalid = {error['loc'][0] for error in e.errors()}
+        questions = question_batch.validate_python(
+            [row for number, row in enumerate(rows) if number not in invalid])
+    records = [(item.question_id, item.question, item.correct_answer,
+                item.add_date) for item in questions]
+    return records, len(rows) - len(records)
+
+
+async def import_questions(
+    rows: Iterator[dict],
+    session: db.AsyncSession,
+    batch_size: int | None = None,
+) -> ImportReport:
+    """Загружает строки в каталог вопросов пачками по `batch_size`.
+    Каждая пачка фиксируется отдельной транзакцией."""
+    batch_size = batch_size or settings.import_batch_size
+    report = ImportReport()
+    started = time.perf_counter()
+    default_date = datetime.now()
+    while batch := list(itertools.islice(rows, batch_size)):
+        records, rejected = validate_batch(batch, default_date)
+        imported = await question_crud.import_batch(records, session)
+        report.read += len(batch)
+        report.rejected += rejected
+        report.imported += imported
+        report.skipped += len(records) - imported
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+async def main(args: argparse.Namespace) -> None:
+    sessionmanager.init(settings.database_url,
+                        **settings.database_engine_options)
+    try:
+        async with sessionmanager.session() as session:
+            report = await import_questions(
+                read_rows(args.path, args.format), session, args.batch_size)
+    finally:
+        await sessionmanager.close()
+    print(json.dumps({**asdict(report),
+                      'rows_per_second': round(report.rows_per_second)},
+                     indent=4))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path', type=Path, help='Файл JSONL или CSV')
+    parser.add_argument('--format', choices=['jsonl', 'csv'],
+                        help='Формат файла, по умолчанию по расширению')
+    parser.add_argument('--batch-size', type=int,
+                        default=settings.import_batch_size)
+    asyncio.run(main(parser.parse_args()))
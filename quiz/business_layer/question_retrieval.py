@@ -1,48 +1,221 @@
-from datetime import datetime
+import asyncio
+import itertools
+import logging
+import math
+import random
+import time
 from uuid import UUID, uuid4
 
-import aiohttp
-
+import metrics
+from business_layer.http_client import QuestionAPIError
+from business_layer.question_sources import question_source
 from business_layer.schemas import Question
 from config import settings
 from db_layer import db_engine as db
-from db_layer import models
-from db_layer.crud import question_crud
-
-
-async def get_questions(number: int, quiz_id: UUID) -> list[Question]:
-    """Функция для обращения к внешнему API с вопросами викторины и
-    валидации полученных данных через схему Questions."""
-    url: str = settings.quiz_api_url.format(number)
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as resp:
-            data = await resp.json()
-    questions = []
-    for item in data:
-        question = Question(
-            question_id=item['id'],
-            question=item['question'],
-            correct_answer=item['answer'],
-            quiz_id=quiz_id,
-            add_date=datetime.now(),
-        )
-        questions.append(question)
-    return questions[:number]
+from db_layer.cache import QuizState, quiz_state_cache
+from db_layer.crud import question_crud, quiz_crud
+
+# Фоновые задачи, которые набирают вопросы викторин в этом процессе.
+_quiz_fillers: dict[UUID, asyncio.Task] = {}
+
+
+class DuplicateRate:
+    """Скользящая оценка доли повторов в ответах внешнего API по всем
+    наборам вопросов процесса. Каждое наблюдение сдвигает оценку на
+    долю `quiz_api_duplicate_rate_weight`."""
+
+    def __init__(self):
+        self.value = 0.0
+
+    def update(self, received: int, duplicates: int) -> None:
+        if received:
+            weight = settings.quiz_api_duplicate_rate_weight
+            self.value += weight * (duplicates / received - self.value)
+
+    def reset(self) -> None:
+        self.value = 0.0
+
+
+upstream_duplicate_rate = DuplicateRate()
+
+
+async def get_questions(number: int) -> list[Question]:
+    """Функция получает `number` случайных вопросов из источника,
+    выбранного настройкой `question_source`."""
+    started = time.perf_counter()
+    try:
+        return await question_source.get_questions(number)
+    except QuestionAPIError:
+        metrics.UPSTREAM_ERRORS.inc()
+        raise
+    finally:
+        metrics.UPSTREAM_LATENCY.observe(time.perf_counter() - started)
+
+
+async def fetch_unique_questions(
+    number: int,
+    exclude_ids: set[int],
+) -> list[Question]:
+    """Функция набирает во внешнем API `number` вопросов, id которых нет
+    в `exclude_ids` и которые не повторяются между собой. Запросы в
+    каждом раунде отправляются параллельно, их количество рассчитывается
+    по доле повторов: в первом раунде - по скользящей оценке процесса
+    `upstream_duplicate_rate`, в следующих - по повторам этого набора.
+    Каждый раунд обновляет оценку процесса. Дубликаты отбрасываются в
+    памяти.
+    Если за `quiz_api_max_rounds` раундов вопросов не хватило,
+    выбрасывается QuestionAPIError."""
+    seen_ids = set(exclude_ids)
+    found: list[Question] = []
+    received = duplicates = rounds = 0
+    for _ in range(settings.quiz_api_max_rounds):
+        missing = number - len(found)
+        if missing <= 0:
+            break
+        rounds += 1
+        per_request = min(missing, settings.quiz_api_max_count)
+        duplicate_rate = (duplicates / received if received
+                          else upstream_duplicate_rate.value)
+        expected_unique = max(per_request * (1 - duplicate_rate), 1)
+        requests = min(math.ceil(missing / expected_unique),
+                       settings.quiz_api_max_parallel_requests)
+        batches = await asyncio.gather(
+            *(get_questions(per_request) for _ in range(requests)))
+        round_start = received, duplicates
+        for question in itertools.chain.from_iterable(batches):
+            received += 1
+            if question.question_id in seen_ids:
+                duplicates += 1
+                continue
+            seen_ids.add(question.question_id)
+            if len(found) < number:
+                found.append(question)
+        upstream_duplicate_rate.update(received - round_start[0],
+                                       duplicates - round_start[1])
+    metrics.UPSTREAM_FETCH_ROUNDS.observe(rounds)
+    metrics.UPSTREAM_DUPLICATES.inc(duplicates)
+    if len(found) < number:
+        raise QuestionAPIError(
+            f'Не удалось получить {number} уникальных вопросов за '
+            f'{settings.quiz_api_max_rounds} раундов запросов')
+    return found
+
+
+async def save_to_catalog(
+    questions: list[Question],
+    session: db.AsyncSession,
+) -> None:
+    """Функция сохраняет в каталог вопросы, которых в нём ещё нет."""
+    existing_ids = await question_crud.get_existing_ids(
+        [question.question_id for question in questions], session)
+    await question_crud.create_all(
+        [question for question in questions
+         if question.question_id not in existing_ids],
+        session)
 
 
 async def get_and_save_questions(
     question_number: int,
-    session: db.AsyncSession
-) -> list[models.Question]:
-    """Функция инициирует отправку запросов к внешнему API для получения
-    нужного количества вопросов викторины и сохраняет вопросы в базу.
-    Возвращает список ORM-объектов."""
-    question_list = []
+    session: db.AsyncSession,
+    user_id: str | None = None,
+) -> tuple[UUID, list[Question]]:
+    """Функция создаёт викторину из `question_number` вопросов и
+    сохраняет её в базу. Вопросы выбираются одним запросом из локального
+    каталога, к внешнему API функция обращается, только если в каталоге
+    меньше `quiz_first_batch_size` вопросов. Если вопросов каталога не
+    хватает на всю викторину, остальные вопросы набираются во внешнем
+    API фоновой задачей `fill_quiz`, поэтому время ответа не зависит от
+    размера викторины. Если передан `user_id`, в викторину не попадают
+    вопросы прошлых викторин участника. Возвращает id викторины и список
+    сохранённых вопросов в порядке их следования в викторине."""
     quiz_id = uuid4()
-    while question_number > len(question_list):
-        questions = await get_questions(
-            number=question_number - len(question_list),
-            quiz_id=quiz_id)
-        saved_questions = await question_crud.create_all(questions, session)
-        question_list.extend(saved_questions)
-    return question_list
+    sampled = await question_crud.sample(question_number, session, user_id)
+    question_list = [Question.model_validate(item) for item in sampled]
+    exclude_ids = {question.question_id for question in question_list}
+    if question_number > len(question_list) and user_id is not None:
+        exclude_ids |= await quiz_crud.get_seen_question_ids(user_id,
+                                                             session)
+    first_batch = min(question_number, settings.quiz_first_batch_size)
+    if first_batch > len(question_list):
+        fetched = await fetch_unique_questions(
+            first_batch - len(question_list), exclude_ids)
+        await save_to_catalog(fetched, session)
+        question_list.extend(fetched)
+        exclude_ids |= {question.question_id for question in fetched}
+    random.shuffle(question_list)
+    await quiz_crud.create(
+        quiz_id,
+        [question.question_id for question in question_list],
+        session,
+        total=question_number,
+        user_id=user_id)
+    state = QuizState.from_questions(question_list, total=question_number)
+    if state.is_complete:
+        await quiz_state_cache.set(quiz_id, state)
+    else:
+        _quiz_fillers[quiz_id] = asyncio.create_task(fill_quiz(
+            quiz_id, question_number - len(question_list), exclude_ids))
+    return quiz_id, question_list
+
+
+async def fill_quiz(quiz_id: UUID, number: int, exclude_ids: set[int]):
+    """Фоновая задача: набирает во внешнем API `number` недостающих
+    вопросов викторины и добавляет их в её конец. Если набрать вопросы
+    не удалось, викторина сокращается до уже сохранённых вопросов."""
+    try:
+        fetched = await fetch_unique_questions(number, exclude_ids)
+        async with db.sessionmanager.session() as session:
+            await save_to_catalog(fetched, session)
+            await quiz_crud.add_questions(
+                quiz_id, [question.question_id for question in fetched],
+                session)
+    except (Exception, asyncio.CancelledError) as e:
+        logging.error('Викторина %s сокращена: %r', quiz_id, e)
+        async with db.sessionmanager.session() as session:
+            await quiz_crud.truncate(quiz_id, session)
+        if isinstance(e, asyncio.CancelledError):
+            raise
+    finally:
+        _quiz_fillers.pop(quiz_id, None)
+        await quiz_state_cache.invalidate(quiz_id)
+
+
+async def wait_for_questions(
+    quiz_id: UUID,
+    session: db.AsyncSession,
+) -> QuizState | None:
+    """Функция возвращает состояние викторины. Если участник ответил на
+    все сохранённые вопросы, а остальные ещё набираются, функция ждёт их
+    не дольше `quiz_fill_wait` секунд: задачу этого процесса - до её
+    завершения, задачу другого воркера - опрашивая БД. Перед ожиданием
+    транзакция сессии завершается, и соединение возвращается в пул.
+    Возвращает None, если викторина не найдена."""
+    deadline = time.monotonic() + settings.quiz_fill_wait
+    state = await quiz_crud.get_quiz_state(quiz_id, session)
+    while state is not None and state.is_waiting():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        # Ожидание не держит соединение пула в открытой транзакции.
+        await session.commit()
+        filler = _quiz_fillers.get(quiz_id)
+        if filler is not None:
+            await asyncio.wait([filler], timeout=remaining)
+        else:
+            await asyncio.sleep(min(settings.quiz_fill_poll_interval,
+                                    remaining))
+        state = await quiz_crud.get_quiz_state(quiz_id, session)
+    return state
+
+
+async def stop_quiz_fillers():
+    """Дожидается фоновых задач набора вопросов при остановке приложения,
+    но не дольше `quiz_fill_wait` секунд. Незавершённые задачи
+    отменяются, а их викторины сокращаются."""
+    tasks = list(_quiz_fillers.values())
+    if not tasks:
+        return
+    _, pending = await asyncio.wait(tasks, timeout=settings.quiz_fill_wait)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
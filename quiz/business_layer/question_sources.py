@@ -0,0 +1,190 @@
+"""Источники вопросов для каталога и викторин.
+
+Источник подключается через интерфейс QuestionSource. Есть две
+реализации: внешнее API с вопросами (`http`) и локальный файл JSONL
+(`jsonl`), с которым сервис работает без сети. Реализация выбирается
+настройкой `question_source`.
+"""
+import abc
+import asyncio
+import json
+import logging
+import mmap
+import os
+import random
+import struct
+from datetime import datetime
+
+from pydantic import ValidationError
+
+from business_layer.http_client import QuestionAPIError, question_api_client
+from business_layer.schemas import Question
+from config import settings
+
+
+class QuestionSource(abc.ABC):
+    """Интерфейс источника случайных вопросов."""
+
+    async def init(self) -> None:
+        """Подготавливает источник при старте приложения."""
+
+    async def close(self) -> None:
+        """Освобождает ресурсы источника при остановке приложения."""
+
+    @abc.abstractmethod
+    async def get_questions(self, number: int) -> list[Question]:
+        """Возвращает до `number` случайных вопросов. Если источник
+        недоступен, выбрасывает QuestionAPIError."""
+
+
+class HTTPQuestionSource(QuestionSource):
+    """Вопросы из внешнего API по адресу `quiz_api_url`."""
+
+    async def init(self) -> None:
+        question_api_client.init()
+
+    async def close(self) -> None:
+        await question_api_client.close()
+
+    async def get_questions(self, number: int) -> list[Question]:
+        data = await question_api_client.get_json(
+            settings.quiz_api_url.format(number))
+        questions = []
+        for item in data:
+            question = Question(
+                question_id=item['id'],
+                question=item['question'],
+                correct_answer=item['answer'],
+                add_date=datetime.now(),
+            )
+            questions.append(question)
+        return questions[:number]
+
+
+class JSONLQuestionSource(QuestionSource):
+    """Вопросы из файла JSONL: по объекту вопроса в строке, в формате
+    выгрузки каталога (`question_id`, `question`, `correct_answer`) или
+    внешнего API (`id`, `question`, `answer`).
+
+    Файл отображается в память и не читается целиком. Смещения начала
+    строк хранятся в индексе рядом с файлом: заголовок с размером и
+    временем изменения файла и массив смещений uint64. Индекс строится
+    одним проходом по файлу, только если его нет или файл изменился, и
+    тоже отображается в память. Случайные вопросы читаются по случайным
+    номерам строк, поэтому время запуска и выборки не зависит от размера
+    файла."""
+
+    INDEX_MAGIC = b'QUIZIDX1'
+    INDEX_HEADER = struct.Struct('<8sQQ')
+    OFFSET = struct.Struct('<Q')
+
+    def __init__(self, path: str, index_path: str | None = None):
+        self.path = path
+        self.index_path = index_path or f'{path}.idx'
+        self._file = self._index_file = None
+        self._data: mmap.mmap | None = None
+        self._index: mmap.mmap | None = None
+        self.lines = 0
+
+    async def init(self) -> None:
+        await asyncio.to_thread(self.open)
+
+    async def close(self) -> None:
+        for resource in (self._index, self._index_file, self._data,
+                         self._file):
+            if resource is not None:
+                resource.close()
+        self._file = self._index_file = self._data = self._index = None
+        self.lines = 0
+
+    def open(self) -> None:
+        """Отображает в память файл вопросов и его индекс, при
+        необходимости перестраивая индекс."""
+        self._file = open(self.path, 'rb')
+        stat = os.fstat(self._file.fileno())
+        if stat.st_size == 0:
+            raise QuestionAPIError(f'Файл вопросов {self.path} пуст')
+        self._data = mmap.mmap(self._file.fileno(), 0,
+                               access=mmap.ACCESS_READ)
+        header = self.INDEX_HEADER.pack(self.INDEX_MAGIC, stat.st_size,
+                                        stat.st_mtime_ns)
+        if not self._index_matches(header):
+            self.build_index(header)
+        self._index_file = open(self.index_path, 'rb')
+        self._index = mmap.mmap(self._index_file.fileno(), 0,
+                                access=mmap.ACCESS_READ)
+        self.lines = ((len(self._index) - self.INDEX_HEADER.size)
+                      // self.OFFSET.size)
+
+    def _index_matches(self, header: bytes) -> bool:
+        try:
+            with open(self.index_path, 'rb') as file:
+                return file.read(len(header)) == header
+        except FileNotFoundError:
+            return False
+
+    def build_index(self, header: bytes) -> None:
+        """Записывает смещения непустых строк файла. Индекс пишется во
+        временный файл и заменяет старый атомарно."""
+        data, position, size = self._data, 0, len(self._data)
+        temporary_path = f'{self.index_path}.tmp'
+        with open(temporary_path, 'wb') as file:
+            file.write(header)
+            while position < size:
+                end = data.find(b'\n', position)
+                if end == -1:
+                    end = size
+                if end > position:
+                    file.write(self.OFFSET.pack(position))
+                position = end + 1
+        os.replace(temporary_path, self.index_path)
+
+    def read_line(self, number: int) -> bytes:
+        """Возвращает строку файла с порядковым номером `number` в
+        индексе."""
+        offset, = self.OFFSET.unpack_from(
+            self._index, self.INDEX_HEADER.size + number * self.OFFSET.size)
+        end = self._data.find(b'\n', offset)
+        return self._data[offset:end if end != -1 else len(self._data)]
+
+    def parse(self, line: bytes) -> Question | None:
+        try:
+            item = json.loads(line)
+            return Question(
+                question_id=item.get('question_id', item.get('id')),
+                question=item['question'],
+                correct_answer=item.get('correct_answer',
+                                        item.get('answer')),
+                add_date=datetime.now(),
+            )
+        except (ValueError, KeyError, TypeError, AttributeError,
+                ValidationError):
+            logging.warning('Пропущена неверная строка файла вопросов: %r',
+                            line[:200])
+            return None
+
+    def sample(self, number: int) -> list[Question]:
+        """Читает `number` случайных строк файла. Неверные строки
+        пропускаются, поэтому вопросов может оказаться меньше."""
+        if self._index is None:
+            raise Exception('JSONLQuestionSource is not initialized')
+        numbers = random.sample(range(self.lines), min(number, self.lines))
+        questions = (self.parse(self.read_line(item)) for item in numbers)
+        return [question for question in questions if question is not None]
+
+    async def get_questions(self, number: int) -> list[Question]:
+        return await asyncio.to_thread(self.sample, number)
+
+
+def create_question_source() -> QuestionSource:
+    """Создаёт источник, выбранный настройкой `question_source`."""
+    if settings.question_source == 'http':
+        return HTTPQuestionSource()
+    if settings.question_source == 'jsonl':
+        return JSONLQuestionSource(settings.question_source_path,
+                                   settings.question_source_index_path or None)
+    raise ValueError(
+        f'Неизвестный источник вопросов: {settings.question_source}')
+
+
+question_source = create_question_source()
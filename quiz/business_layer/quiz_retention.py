@@ -0,0 +1,93 @@
+"""Обслуживание секций таблицы quiz_question.
+
+Заранее создаёт месячные секции на `quiz_partition_months_ahead` месяцев
+вперёд и переносит в архив секции, все викторины которых старше
+`quiz_retention_days` дней; пустые устаревшие секции удаляются.
+Обслуживание выполняется фоновой задачей приложения, его можно запустить
+и вручную (из папки `quiz`):
+
+    python -m business_layer.quiz_retention
+"""
+import asyncio
+import json
+import logging
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+
+from config import settings
+from db_layer import db_engine as db
+from db_layer import partitions
+
+
+@dataclass
+class MaintenanceReport:
+    """Имена созданных, перенесённых в архив и удалённых пустых
+    секций."""
+    created: list[str] = field(default_factory=list)
+    archived: list[str] = field(default_factory=list)
+    dropped: list[str] = field(default_factory=list)
+
+
+async def maintain_partitions(
+    session: db.AsyncSession,
+    now: datetime | None = None,
+) -> MaintenanceReport:
+    """Создаёт недостающие секции и архивирует устаревшие одной
+    транзакцией. Если секции в это время обслуживает другой процесс,
+    ничего не делает."""
+    now = now or datetime.now()
+    report = MaintenanceReport()
+    async with session.begin():
+        if not await partitions.lock_maintenance(session):
+            return report
+        existing = {item.name for item in
+                    await partitions.get_partitions(session)}
+        current = partitions.month_start(now)
+        months = set(await partitions.get_default_partition_months(session))
+        months.update(partitions.add_months(current, number)
+                      for number in range(
+                          settings.quiz_partition_months_ahead + 1))
+        for month in sorted(months):
+            partition = partitions.month_partition(month)
+            if partition.name not in existing:
+                await partitions.create_partition(session, partition)
+                report.created.append(partition.name)
+        retention_start = now - timedelta(days=settings.quiz_retention_days)
+        for partition in await partitions.get_partitions(session):
+            if partition.upper > retention_start.date():
+                continue
+            if await partitions.drop_partition_if_empty(session, partition):
+                report.dropped.append(partition.name)
+            else:
+                await partitions.archive_partition(session, partition)
+                report.archived.append(partition.name)
+    return report
+
+
+async def run_quiz_retention():
+    """Бесконечный цикл фоновой задачи обслуживания секций. Ошибки
+    логируются и не прерывают работу задачи."""
+    while True:
+        try:
+            async with db.sessionmanager.session() as session:
+                report = await maintain_partitions(session)
+            if report.created or report.archived or report.dropped:
+                logging.info('Секции quiz_question: %s', asdict(report))
+        except Exception as e:
+            logging.exception(e)
+        await asyncio.sleep(settings.quiz_retention_interval)
+
+
+async def main() -> None:
+    db.sessionmanager.init(settings.database_url,
+                           **settings.database_engine_options)
+    try:
+        async with db.sessionmanager.session() as session:
+            report = await maintain_partitions(session)
+    finally:
+        await db.sessionmanager.close()
+    print(json.dumps(asdict(report), indent=4))
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
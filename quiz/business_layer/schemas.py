@@ -5,7 +5,7 @@ from pydantic import BaseModel, Field
 
 
 class Question(BaseModel):
-    """Схема, используемая при создании вопроса"""
+    """Схема, используемая при добавлении вопроса в каталог вопросов"""
 
     question_id: int = Field(
         gt=0,
@@ -14,11 +14,6 @@ class Question(BaseModel):
     correct_answer: str = Field(
         description='Правильный ответ',
         max_length=255)
-    answer: str | None = Field(
-        default=None,
-        description='Текст вопроса',
-        max_length=255)
-    quiz_id: UUID
     add_date: dt.datetime
 
     class Config:
@@ -32,13 +27,23 @@ class InitiateQuiz(BaseModel):
         gt=0,
         le=100,
         description='Количество вопросов, должно быть больше 0')
+    user_id: str | None = Field(
+        default=None,
+        min_length=1,
+        max_length=64,
+        description=('Идентификатор участника: вопросы его прошлых '
+                     'викторин не повторяются'))
 
     model_config = {
         'json_schema_extra': {
             'examples': [
                 {
                     'questions_num': 5,
-                }
+                },
+                {
+                    'questions_num': 5,
+                    'user_id': 'player-42',
+                },
             ]
         }
     }
@@ -79,6 +84,9 @@ class QuizResponseFull(QuizResponseNoAnswer):
         default=None,
         description='Правильный ответ на предыдущий вопрос',
         max_length=255)
+    previous_question_correct: bool | None = Field(
+        default=None,
+        description='Засчитан ли ответ на предыдущий вопрос')
 
     model_config = {
         'json_schema_extra': {
@@ -87,6 +95,7 @@ class QuizResponseFull(QuizResponseNoAnswer):
                     'quiz_id': 'a038f339-2c66-4565-90e8-8507da656fa0',
                     'previous_question_correct_answer': (
                         'Правильный ответ на предыдущий вопрос'),
+                    'previous_question_correct': True,
                     'question_id': 2345,
                     'question': 'Текст следующего вопроса',
                 }
@@ -119,7 +128,208 @@ class QuizAnswer(BaseModel):
     }
 
 
+class QuizQuestionItem(BaseModel):
+    """Схема вопроса викторины без правильного ответа."""
+
+    question_id: int = Field(
+        gt=0,
+        description='ID вопроса, должен быть больше 0')
+    question: str = Field(
+        description='Текст вопроса',
+        max_length=255)
+
+
+class QuizQuestions(BaseModel):
+    """Схема для отправки всех вопросов викторины одним ответом."""
+
+    quiz_id: UUID = Field(description='Номер (UUID) викторины')
+    questions: list[QuizQuestionItem] = Field(
+        description='Вопросы викторины в порядке следования')
+
+    model_config = {
+        'json_schema_extra': {
+            'examples': [
+                {
+                    'quiz_id': 'a038f339-2c66-4565-90e8-8507da656fa0',
+                    'questions': [
+                        {'question_id': 12458, 'question': 'Первый вопрос'},
+                        {'question_id': 2345, 'question': 'Второй вопрос'},
+                    ],
+                }
+            ]
+        }
+    }
+
+
+class QuizAnswerItem(BaseModel):
+    """Схема ответа на один вопрос в пакете ответов."""
+
+    question_id: int = Field(
+        gt=0,
+        description='ID вопроса, должен быть больше 0')
+    answer: str = Field(
+        description='Ответ на вопрос',
+        max_length=255)
+
+
+class QuizAnswerBatch(BaseModel):
+    """Схема для отправки участником викторины пакета ответов
+    на вопросы одной викторины."""
+
+    quiz_id: UUID = Field(description='Номер (UUID) викторины')
+    answers: list[QuizAnswerItem] = Field(
+        min_length=1,
+        max_length=100,
+        description='Ответы на вопросы, от 1 до 100')
+
+    model_config = {
+        'json_schema_extra': {
+            'examples': [
+                {
+                    'quiz_id': 'a038f339-2c66-4565-90e8-8507da656fa0',
+                    'answers': [
+                        {'question_id': 12458, 'answer': 'Ответ'},
+                        {'question_id': 2345, 'answer': 'Другой ответ'},
+                    ],
+                }
+            ]
+        }
+    }
+
+
+class AnsweredQuestion(BaseModel):
+    """Схема правильного ответа на принятый вопрос из пакета."""
+
+    question_id: int = Field(
+        gt=0,
+        description='ID вопроса, должен быть больше 0')
+    correct_answer: str = Field(
+        description='Правильный ответ на вопрос',
+        max_length=255)
+    correct: bool = Field(description='Засчитан ли ответ')
+
+
+class QuizBatchResponse(QuizResponseNoAnswer):
+    """Схема для отправки результата обработки пакета ответов и
+    следующего вопроса участнику викторины."""
+
+    answered: list[AnsweredQuestion] = Field(
+        default=[],
+        description='Принятые ответы с правильными ответами')
+    rejected: list[int] = Field(
+        default=[],
+        description=('ID вопросов, ответы на которые не приняты: вопрос '
+                     'не из этой викторины, ответ уже был дан или вопрос '
+                     'повторяется в пакете'))
+
+    model_config = {
+        'json_schema_extra': {
+            'examples': [
+                {
+                    'quiz_id': 'a038f339-2c66-4565-90e8-8507da656fa0',
+                    'answered': [
+                        {'question_id': 12458,
+                         'correct_answer': 'Правильный ответ',
+                         'correct': False},
+                    ],
+                    'rejected': [2345],
+                    'question_id': 777,
+                    'question': 'Текст следующего вопроса',
+                }
+            ]
+        }
+    }
+
+
+class QuizResult(BaseModel):
+    """Схема для отправки результата и прогресса викторины."""
+
+    quiz_id: UUID = Field(description='Номер (UUID) викторины')
+    total: int = Field(description='Количество вопросов в викторине')
+    answered: int = Field(description='Количество принятых ответов')
+    correct: int = Field(description='Количество засчитанных ответов')
+    finished: bool = Field(description='Даны ли ответы на все вопросы')
+
+    model_config = {
+        'json_schema_extra': {
+            'examples': [
+                {
+                    'quiz_id': 'a038f339-2c66-4565-90e8-8507da656fa0',
+                    'total': 10,
+                    'answered': 4,
+                    'correct': 3,
+                    'finished': False,
+                }
+            ]
+        }
+    }
+
+
+class QuestionPage(BaseModel):
+    """Схема страницы каталога вопросов."""
+
+    items: list[Question] = Field(description='Вопросы каталога')
+    next_cursor: str | None = Field(
+        default=None,
+        description='Курсор следующей страницы; нет у последней страницы')
+
+
+class QuizSummary(BaseModel):
+    """Схема краткой информации о викторине."""
+
+    quiz_id: UUID = Field(description='Номер (UUID) викторины')
+    add_date: dt.datetime
+    current_position: int = Field(
+        description='Порядковый номер первого вопроса без ответа')
+    total: int = Field(description='Количество вопросов в викторине')
+
+    model_config = {'from_attributes': True}
+
+
+class QuizPage(BaseModel):
+    """Схема страницы списка викторин."""
+
+    items: list[QuizSummary] = Field(description='Викторины')
+    next_cursor: str | None = Field(
+        default=None,
+        description='Курсор следующей страницы; нет у последней страницы')
+
+
+class ProfileInfo(BaseModel):
+    """Схема описания сохранённого профиля запроса."""
+
+    profile_id: int = Field(description='Номер профиля')
+    method: str = Field(description='HTTP-метод запроса')
+    path: str = Field(description='Путь запроса')
+    status: int = Field(description='Статус-код ответа')
+    started_at: dt.datetime
+    duration: float = Field(description='Время обработки запроса, сек.')
+    summary: dict[str, float] = Field(
+        description=('Время запроса, процессорное время, время в CRUD, '
+                     'в aiohttp и в цикле событий, сек.'))
+
+    model_config = {'from_attributes': True}
+
+
+class BadRequest(BaseModel):
+    """Схема ответа при неверных параметрах запроса."""
+
+    detail: str = 'Неверный курсор.'
+
+
 class NotFound(BaseModel):
     """Схема для сообщения об остутствии данных в БД."""
 
     detail: str = 'Запрошенные данные не найдены.'
+
+
+class ServiceUnavailable(BaseModel):
+    """Схема для сообщения о недоступности внешнего API с вопросами."""
+
+    detail: str = 'Источник вопросов временно недоступен.'
+
+
+class QuizNotReady(BaseModel):
+    """Схема для сообщения о том, что вопросы викторины ещё набираются."""
+
+    detail: str = 'Вопросы викторины ещё загружаются.'
@@ -13,12 +13,82 @@ class Settings(BaseSettings):
     db_hostname: str = os.getenv('DB_HOST', 'localhost')
     db_port: str = os.getenv('DB_PORT', '5432')
     db_name: str = os.getenv('DB_NAME', 'postgres')
+    db_pool_size: int = 5
+    db_max_overflow: int = 5
+    db_pool_timeout: float = 10.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 100
+    db_statement_timeout: int = 30000
+    db_max_connections: int = 50
+    db_reserved_connections: int = 10
+    question_source: str = 'http'
+    question_source_path: str = ''
+    question_source_index_path: str = ''
     quiz_api_url: str = 'https://jservice.io/api/random?count={}'
+    quiz_api_max_count: int = 100
+    quiz_api_connection_limit: int = 20
+    quiz_api_keepalive_timeout: float = 30.0
+    quiz_api_connect_timeout: float = 2.0
+    quiz_api_timeout: float = 5.0
+    quiz_api_retries: int = 2
+    quiz_api_retry_backoff: float = 0.2
+    quiz_api_max_parallel_requests: int = 4
+    quiz_api_max_rounds: int = 5
+    quiz_api_duplicate_rate_weight: float = 0.2
+    question_bank_size: int = 500
+    question_bank_low_water_mark: int = 100
+    question_bank_refill_interval: float = 5.0
+    quiz_cache_backend: str = 'memory'
+    quiz_cache_redis_url: str = 'redis://localhost:6379/0'
+    quiz_cache_size: int = 10000
+    quiz_cache_ttl: float = 3600.0
+    quiz_first_batch_size: int = 5
+    quiz_fill_wait: float = 2.0
+    quiz_fill_poll_interval: float = 0.05
+    grading_max_edit_distance: int = 1
+    grading_fuzzy_min_length: int = 5
+    admin_token: str = ''
+    export_chunk_size: int = 1000
+    import_batch_size: int = 10000
+    quiz_retention_days: int = 180
+    quiz_partition_months_ahead: int = 2
+    quiz_retention_interval: float = 3600.0
+    profiling_enabled: bool = False
+    profiling_sample_rate: float = 0.0
+    profiling_secret: str = ''
+    profiling_buffer_size: int = 20
+    fast_json_responses: bool = True
+    server_host: str = '0.0.0.0'
+    server_port: int = 8000
+    server_workers: int = 1
+    server_loop: str = 'uvloop'
+    server_http: str = 'httptools'
+    server_graceful_timeout: float = 30.0
 
     @property
     def database_url(self) -> str:
         return (f'postgresql+asyncpg://{self.db_user}:{self.db_pass}'
                 f'@{self.db_hostname}:{self.db_port}/{self.db_name}')
 
+    @property
+    def database_engine_options(self) -> dict:
+        """Параметры пула соединений и драйвера asyncpg для
+        `create_async_engine`. Таймаут запроса задаётся в мс."""
+        return {
+            'pool_size': self.db_pool_size,
+            'max_overflow': self.db_max_overflow,
+            'pool_timeout': self.db_pool_timeout,
+            'pool_recycle': self.db_pool_recycle,
+            'pool_pre_ping': self.db_pool_pre_ping,
+            'connect_args': {
+                'prepared_statement_cache_size': (
+                    self.db_statement_cache_size),
+                'server_settings': {
+                    'statement_timeout': str(self.db_statement_timeout),
+                },
+            },
+        }
+
 
 settings = Settings()
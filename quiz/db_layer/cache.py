@@ -0,0 +1,279 @@
+"""Кэш состояния активных викторин.
+
+Кэш подключается через интерфейс QuizStateCache. Есть две реализации:
+в памяти процесса (`memory`) и общая для всех воркеров на сервере с
+протоколом Redis (`redis`). Реализация выбирается настройкой
+`quiz_cache_backend`.
+"""
+import abc
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import NamedTuple
+from uuid import UUID
+
+from redis import asyncio as aioredis
+
+from config import settings
+
+
+class QuizStateQuestion(NamedTuple):
+    """Вопрос викторины из кэша."""
+    question_id: int
+    question: str
+    correct_answer: str
+
+
+@dataclass
+class QuizState:
+    """Состояние викторины: вопросы в порядке следования, признаки
+    ответа на них и курсор - позиция первого вопроса без ответа.
+    Пока остальные вопросы викторины набираются в фоне, `total` больше
+    числа сохранённых вопросов. В кэш попадают только полные
+    состояния."""
+    questions: list[QuizStateQuestion]
+    answered: list[bool]
+    current_position: int = field(default=0)
+    total: int | None = None
+
+    def __post_init__(self):
+        if self.total is None:
+            self.total = len(self.questions)
+
+    @classmethod
+    def from_questions(cls, questions, answered=None,
+                       total=None) -> 'QuizState':
+        """Создаёт состояние из объектов с полями `question_id`,
+        `question`, `correct_answer`."""
+        state = cls(
+            questions=[
+                QuizStateQuestion(item.question_id, item.question,
+                                  item.correct_answer)
+                for item in questions
+            ],
+            answered=(list(answered) if answered is not None
+                      else [False] * len(questions)),
+            total=total,
+        )
+        state.current_position = state._first_open(0)
+        return state
+
+    @property
+    def is_complete(self) -> bool:
+        """Все вопросы викторины сохранены."""
+        return len(self.questions) >= self.total
+
+    def is_waiting(self) -> bool:
+        """Участник ответил на все сохранённые вопросы, а остальные ещё
+        набираются."""
+        return (self.current_position >= len(self.questions)
+                and not self.is_complete)
+
+    def _first_open(self, start: int) -> int:
+        for position in range(start, len(self.answered)):
+            if not self.answered[position]:
+                return position
+        return len(self.answered)
+
+    def next_question(self) -> QuizStateQuestion | None:
+        """Возвращает вопрос под курсором или None, если на все вопросы
+        уже дан ответ."""
+        if self.current_position >= len(self.questions):
+            return None
+        return self.questions[self.current_position]
+
+    def mark_answered(self, *question_ids: int) -> None:
+        """Отмечает ответы на вопросы и сдвигает курсор так же, как это
+        делает `QuestionCRUD.update_question`."""
+        question_ids = set(question_ids)
+        for position, question in enumerate(self.questions):
+            if question.question_id in question_ids:
+                self.answered[position] = True
+        self.current_position = self._first_open(self.current_position)
+
+
+class QuizStateCache(abc.ABC):
+    """Интерфейс кэша состояний викторин. Считает попадания и промахи
+    в рамках процесса."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @abc.abstractmethod
+    async def get(self, quiz_id: UUID | str) -> QuizState | None:
+        """Возвращает состояние викторины или None при промахе."""
+
+    @abc.abstractmethod
+    async def set(self, quiz_id: UUID | str, state: QuizState) -> None:
+        """Сохраняет состояние викторины."""
+
+    @abc.abstractmethod
+    async def mark_answered(
+        self,
+        quiz_id: UUID | str,
+        *question_ids: int,
+    ) -> None:
+        """Сквозная запись ответов на вопросы викторины."""
+
+    @abc.abstractmethod
+    async def invalidate(self, quiz_id: UUID | str) -> None:
+        """Удаляет состояние викторины из кэша."""
+
+    @abc.abstractmethod
+    async def clear(self) -> None:
+        """Очищает кэш и счётчики."""
+
+    async def close(self) -> None:
+        """Освобождает ресурсы кэша при остановке приложения."""
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+class MemoryQuizStateCache(QuizStateCache):
+    """LRU-кэш состояний викторин в памяти процесса с ограничением по
+    размеру и времени жизни записи."""
+
+    def __init__(self, max_size: int, ttl: float):
+        super().__init__(ttl)
+        self.max_size = max_size
+        self._states: OrderedDict[str, tuple[float, QuizState]] = (
+            OrderedDict())
+
+    async def get(self, quiz_id: UUID | str) -> QuizState | None:
+        key = str(quiz_id)
+        entry = self._states.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._states[key]
+            self.misses += 1
+            return None
+        self._states.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    async def set(self, quiz_id: UUID | str, state: QuizState) -> None:
+        key = str(quiz_id)
+        self._states[key] = (time.monotonic() + self.ttl, state)
+        self._states.move_to_end(key)
+        while len(self._states) > self.max_size:
+            self._states.popitem(last=False)
+
+    async def mark_answered(
+        self,
+        quiz_id: UUID | str,
+        *question_ids: int,
+    ) -> None:
+        entry = self._states.get(str(quiz_id))
+        if entry is not None:
+            entry[1].mark_answered(*question_ids)
+
+    async def invalidate(self, quiz_id: UUID | str) -> None:
+        self._states.pop(str(quiz_id), None)
+
+    async def clear(self) -> None:
+        self._states.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        return {'size': len(self._states), **super().stats()}
+
+
+class RedisQuizStateCache(QuizStateCache):
+    """Общий для воркеров кэш на сервере с протоколом Redis.
+
+    Состояние викторины хранится одним хешем: поле `questions` - список
+    вопросов в JSON, остальные поля - id отвеченных вопросов. Ответы на
+    вопросы только добавляются, поэтому запись ответа - атомарный HSET
+    своего поля, и воркеры не могут затереть ответы друг друга, даже
+    если один из них одновременно загружает состояние из БД. Вопросы и
+    ответы истекают и вытесняются при нехватке памяти только вместе, так
+    что состояние не может потерять ответы. Хеш без поля `questions`
+    считается промахом."""
+
+    QUESTIONS_FIELD = 'questions'
+
+    def __init__(self, client: aioredis.Redis, ttl: float,
+                 prefix: str = 'quiz'):
+        super().__init__(ttl)
+        self._client = client
+        self._prefix = prefix
+
+    def _key(self, quiz_id: UUID | str) -> str:
+        return f'{self._prefix}:{quiz_id}'
+
+    async def get(self, quiz_id: UUID | str) -> QuizState | None:
+        fields = await self._client.hgetall(self._key(quiz_id))
+        raw_questions = fields.pop(self.QUESTIONS_FIELD.encode(), None)
+        if raw_questions is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        questions = [QuizStateQuestion(*item)
+                     for item in json.loads(raw_questions)]
+        answered_ids = {int(item) for item in fields}
+        return QuizState.from_questions(
+            questions,
+            answered=[item.question_id in answered_ids
+                      for item in questions])
+
+    async def set(self, quiz_id: UUID | str, state: QuizState) -> None:
+        key = self._key(quiz_id)
+        answered_ids = {
+            question.question_id: 1
+            for question, answered in zip(state.questions, state.answered)
+            if answered
+        }
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={
+                self.QUESTIONS_FIELD: json.dumps(state.questions),
+                **answered_ids})
+            pipe.expire(key, int(self.ttl))
+            await pipe.execute()
+
+    async def mark_answered(
+        self,
+        quiz_id: UUID | str,
+        *question_ids: int,
+    ) -> None:
+        if not question_ids:
+            return
+        key = self._key(quiz_id)
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=dict.fromkeys(question_ids, 1))
+            pipe.expire(key, int(self.ttl))
+            await pipe.execute()
+
+    async def invalidate(self, quiz_id: UUID | str) -> None:
+        await self._client.delete(self._key(quiz_id))
+
+    async def clear(self) -> None:
+        keys = [key async for key in
+                self._client.scan_iter(match=f'{self._prefix}:*')]
+        if keys:
+            await self._client.delete(*keys)
+        self.hits = 0
+        self.misses = 0
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def create_quiz_state_cache() -> QuizStateCache:
+    """Создаёт кэш, выбранный настройкой `quiz_cache_backend`."""
+    if settings.quiz_cache_backend == 'redis':
+        return RedisQuizStateCache(
+            aioredis.from_url(settings.quiz_cache_redis_url),
+            settings.quiz_cache_ttl)
+    if settings.quiz_cache_backend == 'memory':
+        return MemoryQuizStateCache(settings.quiz_cache_size,
+                                    settings.quiz_cache_ttl)
+    raise ValueError(
+        f'Неизвестный кэш викторин: {settings.quiz_cache_backend}')
+
+
+quiz_state_cache = create_quiz_state_cache()
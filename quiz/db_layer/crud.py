@@ -1,9 +1,164 @@
-from sqlalchemy import null, select, update
+import base64
+import json
+import random
+from datetime import datetime
+from typing import AsyncIterator, NamedTuple, Sequence
+from uuid import UUID
+
+from sqlalchemy import (Double, Integer, Row, String, and_, case, column,
+                        func, null, select, text, tuple_, union_all, update,
+                        values)
 from sqlalchemy.dialects.postgresql import insert as postgres_upsert
+from sqlalchemy.orm import aliased
 
 from business_layer import schemas
+from business_layer.grading import (grade_answer, grade_answers,
+                                    normalize_answer)
 from db_layer import db_engine
-from db_layer.models import Question
+from db_layer.cache import QuizState, QuizStateQuestion, quiz_state_cache
+from db_layer.models import Question, Quiz, QuizQuestion
+
+
+def encode_page_cursor(add_date: datetime, key: int | UUID) -> str:
+    """Кодирует ключ последней записи страницы в непрозрачный курсор."""
+    raw = json.dumps([add_date.isoformat(), str(key)])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_page_cursor(cursor: str, key_type: type = str) -> tuple:
+    """Раскодирует курсор страницы в пару (add_date, ключ) и приводит
+    ключ к типу `key_type`. При неверном курсоре, в том числе с ключом
+    другого типа JSON, вызывает ValueError."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        add_date, key = json.loads(raw)
+        return datetime.fromisoformat(add_date), key_type(key)
+    except (AttributeError, TypeError, ValueError) as e:
+        raise ValueError('Неверный курсор страницы') from e
+
+
+async def get_keyset_page(
+    model,
+    key_column,
+    limit: int,
+    cursor: str | None,
+    session: db_engine.AsyncSession,
+) -> tuple[list, str | None]:
+    """Возвращает страницу записей модели в порядке (add_date, ключ) и
+    курсор следующей страницы (None для последней страницы). Страница
+    начинается сразу после записи из курсора, поэтому запрос идёт по
+    индексу (add_date, ключ), и время чтения не зависит от номера
+    страницы."""
+    query = (select(model)
+             .order_by(model.add_date, key_column)
+             .limit(limit + 1))
+    if cursor is not None:
+        add_date, key = decode_page_cursor(cursor,
+                                           key_column.type.python_type)
+        query = query.where(
+            tuple_(model.add_date, key_column) > tuple_(add_date, key))
+    objects = (await session.scalars(query)).all()
+    if len(objects) <= limit:
+        return objects, None
+    objects = objects[:limit]
+    last = objects[-1]
+    return objects, encode_page_cursor(last.add_date,
+                                       getattr(last, key_column.key))
+
+
+def quiz_add_date(quiz_id: UUID):
+    """Подзапрос даты создания викторины. Все вопросы викторины лежат в
+    секции quiz_question по этой дате, поэтому условие по ней позволяет
+    БД при выполнении запроса отбросить остальные секции."""
+    return (select(Quiz.add_date)
+            .where(Quiz.quiz_id == quiz_id)
+            .scalar_subquery())
+
+
+def next_open_position(quiz_question, quiz_id: UUID, open_condition):
+    """Подзапрос новой позиции курсора викторины: наименьшая позиция
+    вопроса без ответа, удовлетворяющего `open_condition`. Если таких
+    вопросов нет, курсор встаёт за последним сохранённым вопросом - на
+    `total`, если викторина сохранена целиком, или на позицию, которую
+    займёт следующий вопрос, набираемый в фоне."""
+    first_open = func.min(quiz_question.position).filter(
+        quiz_question.answer == null(), open_condition)
+    after_last = func.max(quiz_question.position) + 1
+    return (select(func.coalesce(first_open, after_last))
+            .where(quiz_question.quiz_id == quiz_id,
+                   quiz_question.add_date == quiz_add_date(quiz_id))
+            .scalar_subquery())
+
+
+class AnswerResult(NamedTuple):
+    """Проверенный ответ на вопрос викторины и следующий вопрос без
+    ответа (пустой, если таких вопросов не осталось)."""
+    correct_answer: str
+    correct: bool
+    next_question_id: int | None
+    next_question: str | None
+
+
+class GradedAnswer(NamedTuple):
+    """Проверенный ответ из пакета ответов."""
+    question_id: int
+    correct_answer: str
+    correct: bool
+
+
+def seen_question_ids(user_id: str):
+    """Подзапрос id вопросов всех викторин участника `user_id`."""
+    return (select(QuizQuestion.question_id)
+            .join(Quiz, and_(Quiz.quiz_id == QuizQuestion.quiz_id,
+                             Quiz.add_date == QuizQuestion.add_date))
+            .where(Quiz.user_id == user_id))
+
+
+async def _lock_quiz(quiz_id: UUID, session: db_engine.AsyncSession):
+    """Блокирует строку викторины до конца транзакции отдельным запросом
+    до записи ответа. Ответы на вопросы одной викторины записываются по
+    очереди, и запрос записи ответа видит все ранее записанные ответы,
+    поэтому курсор викторины считается по ним."""
+    await session.execute(
+        select(Quiz.quiz_id)
+        .where(Quiz.quiz_id == quiz_id)
+        .with_for_update())
+
+
+async def _mark_used(question_ids: list[int],
+                     session: db_engine.AsyncSession):
+    """Отмечает вопросы каталога, попавшие в викторину. Строки
+    блокируются в порядке id, чтобы одновременно создаваемые викторины с
+    общими вопросами не блокировали друг друга взаимно."""
+    fresh = (select(Question.question_id)
+             .where(Question.question_id.in_(question_ids),
+                    ~Question.used)
+             .order_by(Question.question_id)
+             .with_for_update())
+    await session.execute(
+        update(Question)
+        .where(Question.question_id.in_(fresh))
+        .values(used=True))
+
+
+IMPORT_TABLE = 'question_import'
+IMPORT_COLUMNS = ('question_id', 'question', 'correct_answer', 'add_date',
+                  'normalized_answer')
+
+
+async def _copy_records(driver_connection, table: str, columns: tuple,
+                        records: list[tuple]) -> None:
+    """Загружает записи в таблицу командой COPY средствами драйвера:
+    asyncpg в приложении или psycopg в тестах."""
+    if hasattr(driver_connection, 'copy_records_to_table'):
+        await driver_connection.copy_records_to_table(
+            table, records=records, columns=columns)
+        return
+    async with driver_connection.cursor() as cursor:
+        async with cursor.copy(
+                f'COPY {table} ({", ".join(columns)}) FROM STDIN') as copy:
+            for record in records:
+                await copy.write_row(record)
 
 
 class QuestionCRUD():
@@ -26,25 +181,183 @@ class QuestionCRUD():
         objects = await session.scalars(select(Question))
         return objects.all()
 
+    async def get_page(
+        self,
+        limit: int,
+        cursor: str | None,
+        session: db_engine.AsyncSession,
+    ) -> tuple[list[Question], str | None]:
+        """Метод получает страницу вопросов каталога в порядке
+        (add_date, question_id) и курсор следующей страницы."""
+        return await get_keyset_page(Question, Question.question_id, limit,
+                                     cursor, session)
+
+    async def stream_chunks(
+        self,
+        session: db_engine.AsyncSession,
+        chunk_size: int,
+        date_from: datetime | None = None,
+        date_to: datetime | None = None,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Метод читает вопросы каталога серверным курсором и отдаёт их
+        пачками по `chunk_size` строк, не загружая таблицу в память.
+        Интервал `add_date` полуоткрытый: [date_from, date_to).
+        Порядок (add_date, question_id) совпадает с индексом
+        `ix_question_add_date_question_id`, поэтому интервал читается
+        отрезком индекса без сортировки. Строки возвращаются без
+        ORM-объектов, поэтому identity map сессии не растёт."""
+        query = (select(Question.question_id,
+                        Question.question,
+                        Question.correct_answer,
+                        Question.add_date)
+                 .order_by(Question.add_date, Question.question_id)
+                 .execution_options(yield_per=chunk_size))
+        if date_from is not None:
+            query = query.where(Question.add_date >= date_from)
+        if date_to is not None:
+            query = query.where(Question.add_date < date_to)
+        # Выгрузка длится дольше обычного запроса API.
+        await session.execute(text('SET LOCAL statement_timeout = 0'))
+        result = await session.stream(query)
+        try:
+            async for chunk in result.partitions(chunk_size):
+                yield chunk
+        finally:
+            await result.close()
+
     async def get_next_quiz_question(
         self,
         quiz_id: str,
         session: db_engine.AsyncSession,
-    ) -> Question | None:
-        """Метод возвращает следующий вопрос в рамках данного uuid викторины,
-        на который участник ещё не давал ответ."""
-        query = (select(Question)
-                 .where(Question.quiz_id == quiz_id)
-                 .where(Question.answer == null()))
-        return await session.scalar(query.limit(1))
+    ) -> QuizStateQuestion | None:
+        """Метод возвращает следующий по порядку вопрос в рамках данного
+        uuid викторины, на который участник ещё не давал ответ. Вопрос
+        берётся из кэша состояния викторины, при промахе состояние
+        загружается из БД одним запросом и кэшируется."""
+        state = await quiz_crud.get_quiz_state(quiz_id, session)
+        if state is None:
+            return None
+        return state.next_question()
+
+    async def count(
+        self,
+        session: db_engine.AsyncSession,
+    ) -> int:
+        """Метод возвращает количество вопросов в каталоге."""
+        return await session.scalar(
+            select(func.count()).select_from(Question))
+
+    async def count_unused(
+        self,
+        session: db_engine.AsyncSession,
+    ) -> int:
+        """Метод возвращает количество вопросов каталога, которые ещё не
+        попали ни в одну викторину. Подсчёт идёт по частичному индексу
+        `ix_question_unused`, поэтому читается только запас банка, а не
+        весь каталог."""
+        return await session.scalar(
+            select(func.count())
+            .select_from(Question)
+            .where(~Question.used))
+
+    async def sample(
+        self,
+        number: int,
+        session: db_engine.AsyncSession,
+        user_id: str | None = None,
+    ) -> list[Question]:
+        """Метод выбирает из каталога до `number` случайных вопросов. Для
+        каждого вопроса берётся своя случайная точка из [0, 1) и первый
+        вопрос с `random_key` не меньше неё (первый вопрос индекса, если
+        таких нет). Все точки ищутся одним запросом по индексу
+        `random_key` без сортировки таблицы, поэтому время выборки не
+        зависит от размера каталога, а вопросы выбираются независимо, а не
+        подряд идущим отрезком индекса. Если несколько точек попали на
+        один вопрос, недостающие вопросы добираются вторым запросом -
+        отрезком индекса после случайной точки. Если передан `user_id`,
+        вопросы викторин этого участника пропускаются."""
+        if number <= 0:
+            return []
+        seen = seen_question_ids(user_id) if user_id is not None else None
+
+        def unseen(entity) -> list:
+            return [] if seen is None else [entity.question_id.not_in(seen)]
+
+        points = (values(column('key', Double), name='points')
+                  .data([(random.random(),) for _ in range(number)]))
+        after_point, first = aliased(Question), aliased(Question)
+        picked = func.coalesce(
+            select(after_point.question_id)
+            .where(after_point.random_key >= points.c.key,
+                   *unseen(after_point))
+            .order_by(after_point.random_key)
+            .limit(1)
+            .scalar_subquery(),
+            select(first.question_id)
+            .where(*unseen(first))
+            .order_by(first.random_key)
+            .limit(1)
+            .scalar_subquery())
+        # Без MATERIALIZED планировщик вычисляет поиск точки дважды.
+        picked_ids = (select(picked.label('question_id'))
+                      .select_from(points)
+                      .cte('picked')
+                      .prefix_with('MATERIALIZED'))
+        results = await session.scalars(
+            select(Question)
+            .where(Question.question_id.in_(
+                select(picked_ids.c.question_id))))
+        questions = list(results.all())
+        if len(questions) == number:
+            return questions
+        start = random.random()
+        conditions = [
+            Question.question_id.not_in(
+                [question.question_id for question in questions]),
+            *unseen(Question),
+        ]
+        upper = (select(Question)
+                 .where(Question.random_key >= start, *conditions)
+                 .order_by(Question.random_key)
+                 .limit(number))
+        lower = (select(Question)
+                 .where(Question.random_key < start, *conditions)
+                 .order_by(Question.random_key)
+                 .limit(number))
+        sampled = aliased(Question, union_all(upper, lower).subquery())
+        results = await session.scalars(
+            select(sampled).limit(number - len(questions)))
+        return questions + list(results.all())
+
+    async def get_existing_ids(
+        self,
+        question_ids: list[int],
+        session: db_engine.AsyncSession,
+    ) -> set[int]:
+        """Метод одним запросом возвращает те из переданных id,
+        которые уже есть в каталоге."""
+        if not question_ids:
+            return set()
+        results = await session.scalars(
+            select(Question.question_id)
+            .where(Question.question_id.in_(question_ids)))
+        return set(results.all())
 
     async def create_all(
         self,
         questions: list[schemas.Question],
         session: db_engine.AsyncSession,
     ) -> list[Question]:
-        """Метод создаёт в БД переданные записи вопросов."""
-        question_dicts = [item.dict() for item in questions]
+        """Метод создаёт в каталоге переданные записи вопросов вместе с
+        нормализованными правильными ответами. Вопросы, уже имеющиеся в
+        каталоге, пропускаются. Возвращает созданные записи."""
+        if not questions:
+            return []
+        question_dicts = [
+            {**item.dict(),
+             'normalized_answer': normalize_answer(item.correct_answer)}
+            for item in questions
+        ]
         query = (postgres_upsert(Question)
                  .values(question_dicts)
                  .on_conflict_do_nothing(index_elements=['question_id'])
@@ -56,28 +369,389 @@ class QuestionCRUD():
         await session.commit()
         return results.all()
 
+    async def import_batch(
+        self,
+        records: list[tuple],
+        session: db_engine.AsyncSession,
+    ) -> int:
+        """Метод загружает пачку записей (question_id, question,
+        correct_answer, add_date) с нормализованными правильными ответами
+        командой COPY во временную таблицу и переносит их в каталог,
+        пропуская уже имеющиеся вопросы и повторы внутри пачки. Временная
+        таблица очищается при COMMIT. Возвращает кол-во добавленных в
+        каталог вопросов."""
+        if not records:
+            return 0
+        records = [(*record, normalize_answer(record[2]))
+                   for record in records]
+        await session.execute(text(
+            f'CREATE TEMP TABLE IF NOT EXISTS {IMPORT_TABLE} '
+            f'ON COMMIT DELETE ROWS AS SELECT {", ".join(IMPORT_COLUMNS)} '
+            'FROM question WITH NO DATA'))
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await _copy_records(raw_connection.driver_connection, IMPORT_TABLE,
+                            IMPORT_COLUMNS, records)
+        result = await session.execute(text(
+            f'INSERT INTO question ({", ".join(IMPORT_COLUMNS)}) '
+            f'SELECT DISTINCT ON (question_id) {", ".join(IMPORT_COLUMNS)} '
+            f'FROM {IMPORT_TABLE} ORDER BY question_id '
+            'ON CONFLICT (question_id) DO NOTHING'))
+        await session.commit()
+        return result.rowcount
+
     async def update_question(
         self,
         data: schemas.QuizAnswer,
         session: db_engine.AsyncSession,
     ) -> Question | None:
-        """Метод обновляет в БД запись вопроса: записывает ответ на него.
-        Ответ записывается только если до этого поле было пустым. То есть
-        допускается только однократное сохранение ответа."""
-        stmt = (update(Question)
-                .where(Question.question_id == data.question_id)
-                .where(Question.quiz_id == data.quiz_id)
-                .where(Question.answer == null())
+        """Метод обновляет в БД запись вопроса викторины: записывает ответ
+        на него. Ответ записывается только если до этого поле было пустым.
+        То есть допускается только однократное сохранение ответа.
+        Ответ проверяется, и в той же транзакции увеличиваются счётчики
+        ответов викторины. Если ответ дан на вопрос под курсором, курсор
+        викторины переводится на следующий вопрос без ответа. Строка
+        викторины блокируется до записи ответа, чтобы одновременные
+        ответы не сдвинули курсор по устаревшим данным.
+        Возвращает запись вопроса из каталога."""
+        await _lock_quiz(data.quiz_id, session)
+        stmt = (update(QuizQuestion)
+                .where(QuizQuestion.question_id == data.question_id)
+                .where(QuizQuestion.quiz_id == data.quiz_id)
+                .where(QuizQuestion.add_date == quiz_add_date(data.quiz_id))
+                .where(QuizQuestion.answer == null())
                 .values(answer=data.answer)
-                .returning(Question))
-        results = await session.scalars(stmt)
+                .returning(QuizQuestion.question_id, QuizQuestion.position))
+        answered = (await session.execute(stmt)).first()
+        if answered is None:
+            await session.commit()
+            await quiz_state_cache.invalidate(data.quiz_id)
+            return None
+        normalized_answer = await session.scalar(
+            select(Question.normalized_answer)
+            .where(Question.question_id == answered.question_id))
+        correct = grade_answer(data.answer, normalized_answer)
+        next_position = next_open_position(
+            QuizQuestion, data.quiz_id,
+            QuizQuestion.position > answered.position)
+        moved_cursor = case((Quiz.current_position == answered.position,
+                             next_position),
+                            else_=Quiz.current_position)
+        await session.execute(
+            update(Quiz)
+            .where(Quiz.quiz_id == data.quiz_id)
+            .values(current_position=moved_cursor,
+                    answered=Quiz.answered + 1,
+                    correct=Quiz.correct + int(correct)))
         await session.commit()
-        try:
-            result = next(results)
-            await session.refresh(result)
-            return result
-        except StopIteration:
+        await quiz_state_cache.mark_answered(data.quiz_id,
+                                             data.question_id)
+        return await session.get(Question, answered.question_id)
+
+    async def answer_question(
+        self,
+        data: schemas.QuizAnswer,
+        session: db_engine.AsyncSession,
+    ) -> AnswerResult | None:
+        """Метод одним запросом записывает ответ на вопрос викторины,
+        сдвигает курсор викторины, увеличивает счётчик ответов и
+        возвращает правильный ответ вместе со следующим вопросом без
+        ответа. Правила записи ответа те же, что в `update_question`,
+        строка викторины так же блокируется заранее. Засчитанный ответ
+        увеличивает счётчик викторины вторым запросом в той же
+        транзакции. Возвращает None, если ответ не записан."""
+        await _lock_quiz(data.quiz_id, session)
+        answered = (update(QuizQuestion)
+                    .where(QuizQuestion.question_id == data.question_id)
+                    .where(QuizQuestion.quiz_id == data.quiz_id)
+                    .where(QuizQuestion.add_date
+                           == quiz_add_date(data.quiz_id))
+                    .where(QuizQuestion.answer == null())
+                    .values(answer=data.answer)
+                    .returning(QuizQuestion.quiz_id,
+                               QuizQuestion.question_id,
+                               QuizQuestion.position)
+                    .cte('answered'))
+        # Подзапросы видят снимок данных до изменений, поэтому только что
+        # отвеченный вопрос исключается условием по позиции.
+        open_question = aliased(QuizQuestion)
+        next_position = next_open_position(
+            open_question, data.quiz_id,
+            open_question.position > answered.c.position)
+        moved_cursor = case((Quiz.current_position == answered.c.position,
+                             next_position),
+                            else_=Quiz.current_position)
+        moved = (update(Quiz)
+                 .where(Quiz.quiz_id == answered.c.quiz_id)
+                 .values(current_position=moved_cursor,
+                         answered=Quiz.answered + 1)
+                 .returning(Quiz.current_position)
+                 .cte('moved'))
+        cursor = func.coalesce(
+            select(moved.c.current_position).scalar_subquery(),
+            select(Quiz.current_position)
+            .where(Quiz.quiz_id == data.quiz_id)
+            .scalar_subquery())
+        next_quiz_question = aliased(QuizQuestion)
+        next_question = aliased(Question)
+        query = (select(Question.correct_answer,
+                        Question.normalized_answer,
+                        next_question.question_id.label('next_question_id'),
+                        next_question.question.label('next_question'))
+                 .select_from(answered)
+                 .join(Question,
+                       Question.question_id == answered.c.question_id)
+                 .outerjoin(next_quiz_question, and_(
+                     next_quiz_question.quiz_id == data.quiz_id,
+                     next_quiz_question.add_date
+                     == quiz_add_date(data.quiz_id),
+                     next_quiz_question.position == cursor))
+                 .outerjoin(next_question,
+                            next_question.question_id
+                            == next_quiz_question.question_id))
+        row = (await session.execute(query)).first()
+        if row is None:
+            await session.commit()
+            await quiz_state_cache.invalidate(data.quiz_id)
+            return None
+        correct = grade_answer(data.answer, row.normalized_answer)
+        if correct:
+            await session.execute(
+                update(Quiz)
+                .where(Quiz.quiz_id == data.quiz_id)
+                .values(correct=Quiz.correct + 1))
+        await session.commit()
+        await quiz_state_cache.mark_answered(data.quiz_id, data.question_id)
+        return AnswerResult(row.correct_answer, correct, row.next_question_id,
+                            row.next_question)
+
+    async def answer_questions(
+        self,
+        data: schemas.QuizAnswerBatch,
+        session: db_engine.AsyncSession,
+    ) -> list[GradedAnswer]:
+        """Метод одним UPDATE по набору значений записывает пакет ответов
+        на вопросы викторины, сдвигает курсор викторины и увеличивает
+        счётчик ответов. Правила записи каждого ответа те же, что в
+        `update_question`; если вопрос повторяется в пакете, учитывается
+        первый ответ. Засчитанные ответы увеличивают счётчик викторины
+        вторым запросом в той же транзакции. Возвращает проверенные
+        принятые ответы в порядке вопросов викторины."""
+        unique_answers = {}
+        for item in data.answers:
+            unique_answers.setdefault(item.question_id, item.answer)
+        await _lock_quiz(data.quiz_id, session)
+        batch = (values(column('question_id', Integer),
+                        column('answer', String),
+                        name='batch')
+                 .data(list(unique_answers.items())))
+        answered = (update(QuizQuestion)
+                    .where(QuizQuestion.quiz_id == data.quiz_id)
+                    .where(QuizQuestion.add_date
+                           == quiz_add_date(data.quiz_id))
+                    .where(QuizQuestion.question_id == batch.c.question_id)
+                    .where(QuizQuestion.answer == null())
+                    .values(answer=batch.c.answer)
+                    .returning(QuizQuestion.question_id,
+                               QuizQuestion.position,
+                               QuizQuestion.answer)
+                    .cte('answered'))
+        # Подзапросы видят снимок данных до изменений, поэтому только что
+        # отвеченные вопросы исключаются условием по позиции.
+        answered_positions = select(answered.c.position)
+        answered_count = (select(func.count())
+                          .select_from(answered)
+                          .scalar_subquery())
+        open_question = aliased(QuizQuestion)
+        next_position = next_open_position(
+            open_question, data.quiz_id,
+            open_question.position.not_in(answered_positions))
+        moved_cursor = case((Quiz.current_position.in_(answered_positions),
+                             next_position),
+                            else_=Quiz.current_position)
+        moved = (update(Quiz)
+                 .where(Quiz.quiz_id == data.quiz_id)
+                 .where(answered_count > 0)
+                 .values(current_position=moved_cursor,
+                         answered=Quiz.answered + answered_count)
+                 .cte('moved'))
+        query = (select(answered.c.question_id, answered.c.answer,
+                        Question.correct_answer, Question.normalized_answer)
+                 .join(Question,
+                       Question.question_id == answered.c.question_id)
+                 .order_by(answered.c.position)
+                 .add_cte(moved))
+        rows = (await session.execute(query)).all()
+        grades = grade_answers(
+            (row.answer, row.normalized_answer) for row in rows)
+        if any(grades):
+            await session.execute(
+                update(Quiz)
+                .where(Quiz.quiz_id == data.quiz_id)
+                .values(correct=Quiz.correct + sum(grades)))
+        await session.commit()
+        await quiz_state_cache.mark_answered(
+            data.quiz_id, *(row.question_id for row in rows))
+        return [GradedAnswer(row.question_id, row.correct_answer, correct)
+                for row, correct in zip(rows, grades)]
+
+
+class QuizCRUD():
+    """Класс с операциями CRUD для моделей Quiz и QuizQuestion."""
+
+    async def get(
+        self,
+        quiz_id: UUID,
+        session: db_engine.AsyncSession,
+    ) -> Quiz | None:
+        """Метод получает из БД запись викторины по первичному ключу:
+        `quiz_id`. Запись содержит счётчики ответов, поэтому результат
+        викторины читается без подсчёта её вопросов."""
+        return await session.get(Quiz, quiz_id)
+
+    async def get_quiz_question(
+        self,
+        quiz_id: UUID,
+        question_id: int,
+        session: db_engine.AsyncSession,
+    ) -> QuizQuestion | None:
+        """Метод получает из БД запись вопроса викторины
+        по первичному ключу: `quiz_id`, `question_id`."""
+        return await session.get(QuizQuestion, (quiz_id, question_id))
+
+    async def get_page(
+        self,
+        limit: int,
+        cursor: str | None,
+        session: db_engine.AsyncSession,
+    ) -> tuple[list[Quiz], str | None]:
+        """Метод получает страницу викторин в порядке (add_date, quiz_id)
+        и курсор следующей страницы."""
+        return await get_keyset_page(Quiz, Quiz.quiz_id, limit, cursor,
+                                     session)
+
+    async def get_quiz_questions(
+        self,
+        quiz_id: UUID,
+        session: db_engine.AsyncSession,
+    ) -> list[QuizQuestion]:
+        """Метод получает все вопросы викторины в порядке их следования."""
+        objects = await session.scalars(
+            select(QuizQuestion)
+            .where(QuizQuestion.quiz_id == quiz_id,
+                   QuizQuestion.add_date == quiz_add_date(quiz_id))
+            .order_by(QuizQuestion.position))
+        return objects.all()
+
+    async def get_quiz_state(
+        self,
+        quiz_id: UUID,
+        session: db_engine.AsyncSession,
+    ) -> QuizState | None:
+        """Метод возвращает состояние викторины из кэша. При промахе
+        состояние загружается из БД одним запросом и кэшируется, если
+        все вопросы викторины уже сохранены. Возвращает None, если
+        викторина не найдена."""
+        state = await quiz_state_cache.get(quiz_id)
+        if state is not None:
+            return state
+        rows = (await session.execute(
+            select(Question.question_id,
+                   Question.question,
+                   Question.correct_answer,
+                   QuizQuestion.answer.is_not(None).label('answered'),
+                   Quiz.total)
+            .join(QuizQuestion,
+                  QuizQuestion.question_id == Question.question_id)
+            .join(Quiz, and_(Quiz.quiz_id == QuizQuestion.quiz_id,
+                             Quiz.add_date == QuizQuestion.add_date))
+            .where(QuizQuestion.quiz_id == quiz_id,
+                   QuizQuestion.add_date == quiz_add_date(quiz_id))
+            .order_by(QuizQuestion.position))).all()
+        if not rows:
             return None
+        state = QuizState.from_questions(
+            rows, answered=[row.answered for row in rows],
+            total=rows[0].total)
+        if state.is_complete:
+            await quiz_state_cache.set(quiz_id, state)
+        return state
+
+    async def get_seen_question_ids(
+        self,
+        user_id: str,
+        session: db_engine.AsyncSession,
+    ) -> set[int]:
+        """Метод возвращает id вопросов всех викторин участника."""
+        results = await session.scalars(seen_question_ids(user_id))
+        return set(results.all())
+
+    async def create(
+        self,
+        quiz_id: UUID,
+        question_ids: list[int],
+        session: db_engine.AsyncSession,
+        total: int | None = None,
+        user_id: str | None = None,
+    ) -> Quiz:
+        """Метод создаёт в БД викторину с переданными вопросами каталога.
+        Порядок вопросов в викторине совпадает с порядком `question_ids`.
+        Если `total` больше числа вопросов, остальные вопросы добавляются
+        позже методом `add_questions`. Вопросы отмечаются в каталоге как
+        использованные."""
+        add_date = datetime.now()
+        quiz = Quiz(quiz_id=quiz_id, add_date=add_date, current_position=0,
+                    total=total or len(question_ids), user_id=user_id)
+        session.add(quiz)
+        session.add_all(
+            QuizQuestion(quiz_id=quiz_id, question_id=question_id,
+                         position=position, add_date=add_date)
+            for position, question_id in enumerate(question_ids)
+        )
+        await _mark_used(question_ids, session)
+        await session.commit()
+        return quiz
+
+    async def add_questions(
+        self,
+        quiz_id: UUID,
+        question_ids: list[int],
+        session: db_engine.AsyncSession,
+    ) -> None:
+        """Метод добавляет вопросы каталога в конец созданной викторины.
+        Строки получают дату создания викторины, чтобы попасть в её
+        секцию таблицы. Вопросы отмечаются в каталоге как
+        использованные."""
+        quiz = await session.get(Quiz, quiz_id)
+        if quiz is None:
+            return
+        saved = await session.scalar(
+            select(func.count())
+            .where(QuizQuestion.quiz_id == quiz_id,
+                   QuizQuestion.add_date == quiz.add_date))
+        session.add_all(
+            QuizQuestion(quiz_id=quiz_id, question_id=question_id,
+                         position=position, add_date=quiz.add_date)
+            for position, question_id in enumerate(question_ids, saved)
+        )
+        await _mark_used(question_ids, session)
+        await session.commit()
+
+    async def truncate(
+        self,
+        quiz_id: UUID,
+        session: db_engine.AsyncSession,
+    ) -> None:
+        """Метод сокращает викторину до уже сохранённых вопросов, если
+        остальные вопросы набрать не удалось."""
+        saved = (select(func.count())
+                 .where(QuizQuestion.quiz_id == quiz_id,
+                        QuizQuestion.add_date == quiz_add_date(quiz_id))
+                 .scalar_subquery())
+        await session.execute(
+            update(Quiz).where(Quiz.quiz_id == quiz_id).values(total=saved))
+        await session.commit()
 
 
 question_crud = QuestionCRUD()
+quiz_crud = QuizCRUD()
@@ -1,9 +1,14 @@
 import contextlib
+import time
 from typing import AsyncIterator
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (AsyncConnection, AsyncEngine, AsyncSession,
                                     async_sessionmaker, create_async_engine)
 from sqlalchemy.orm import declarative_base, declared_attr
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+import metrics
 
 
 class PreBase:
@@ -16,16 +21,70 @@ class PreBase:
 Base = declarative_base(cls=PreBase)
 
 
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Пул соединений, который учитывает время ожидания свободного
+    соединения (включая установку нового) при каждой выдаче соединения
+    из пула."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_time += waited
+            self.max_wait_time = max(self.max_wait_time, waited)
+
+
 class DatabaseSessionManager:
     def __init__(self):
         self._engine: AsyncEngine | None = None
         self._sessionmaker: async_sessionmaker | None = None
 
-    def init(self, host: str):
-        self._engine = create_async_engine(host)
+    def init(self, host: str, **engine_options):
+        engine_options.setdefault('poolclass', TimedAsyncQueuePool)
+        self._engine = create_async_engine(host, **engine_options)
+        self._instrument(self._engine)
         self._sessionmaker = async_sessionmaker(autocommit=False,
                                                 bind=self._engine)
 
+    @staticmethod
+    def _instrument(engine: AsyncEngine):
+        """Подключает замер времени SQL-запросов к событиям движка."""
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, 'before_cursor_execute',
+                     metrics.before_cursor_execute)
+        event.listen(sync_engine, 'after_cursor_execute',
+                     metrics.after_cursor_execute)
+        event.listen(sync_engine, 'handle_error', metrics.handle_error)
+
+    def pool_stats(self) -> dict:
+        """Статистика пула соединений: размер пула, выданные соединения,
+        соединения сверх пула и время ожидания свободного соединения."""
+        if self._engine is None:
+            raise Exception("DatabaseSessionManager is not initialized")
+        pool = self._engine.pool
+        stats = {
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': max(pool.overflow(), 0),
+        }
+        if isinstance(pool, TimedAsyncQueuePool):
+            stats.update(
+                checkouts=pool.checkouts,
+                wait_time_total=pool.wait_time,
+                wait_time_max=pool.max_wait_time,
+            )
+        return stats
+
     async def close(self):
         if self._engine is None:
             raise Exception("DatabaseSessionManager is not initialized")
@@ -68,6 +127,7 @@ class DatabaseSessionManager:
 
 
 sessionmanager = DatabaseSessionManager()
+metrics.register_pool_collector(sessionmanager)
 
 
 async def get_async_session():
@@ -1,15 +1,102 @@
-from sqlalchemy import DateTime, Integer, String
+from sqlalchemy import (DDL, Boolean, DateTime, Double, ForeignKey, Index,
+                        Integer, String, event, false, func, text)
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import mapped_column
+from sqlalchemy.orm import declared_attr, mapped_column
 
 from .db_engine import Base
 
 
 class Question(Base):
-    """Модель Алхимии к таблице question в БД."""
+    """Модель Алхимии к таблице question в БД: каталог вопросов,
+    полученных из внешнего API. Один вопрос каталога может входить
+    в любое количество викторин. Поле `random_key` - случайное число
+    из [0, 1), по индексу которого выбираются случайные вопросы. Поле
+    `normalized_answer` - правильный ответ, приведённый к виду для
+    проверки ответов участников (`business_layer.grading`). Поле `used`
+    отмечает вопросы, которые уже попали в викторину; частичный индекс
+    по неиспользованным вопросам позволяет считать запас банка вопросов
+    без просмотра каталога и истории викторин."""
+    __table_args__ = (
+        Index('ix_question_add_date_question_id', 'add_date', 'question_id'),
+        Index('ix_question_random_key', 'random_key'),
+        Index('ix_question_unused', 'question_id',
+              postgresql_where=text('NOT used')),
+    )
+
     question_id = mapped_column(Integer, primary_key=True)
     question = mapped_column(String(255), nullable=False)
     correct_answer = mapped_column(String(255), nullable=False)
-    answer = mapped_column(String(255), nullable=True)
-    quiz_id = mapped_column(UUID, nullable=False)
+    normalized_answer = mapped_column(String(255), nullable=False)
     add_date = mapped_column(DateTime, nullable=False)
+    random_key = mapped_column(Double, nullable=False,
+                               server_default=func.random())
+    used = mapped_column(Boolean, nullable=False, default=False,
+                         server_default=false())
+
+
+class Quiz(Base):
+    """Модель Алхимии к таблице quiz в БД. Поле `current_position` -
+    курсор викторины: порядковый номер первого вопроса без ответа.
+    Когда на все вопросы дан ответ, курсор равен `total`. Поля `answered`
+    и `correct` - счётчики принятых и засчитанных ответов, они
+    обновляются в транзакции записи ответа, поэтому результат викторины
+    читается одной строкой. Поле `user_id` - необязательный идентификатор
+    участника во внешней системе."""
+    __table_args__ = (
+        Index('ix_quiz_add_date_quiz_id', 'add_date', 'quiz_id'),
+        Index('ix_quiz_user_id', 'user_id'),
+    )
+
+    quiz_id = mapped_column(UUID, primary_key=True)
+    add_date = mapped_column(DateTime, nullable=False)
+    current_position = mapped_column(Integer, nullable=False, default=0)
+    total = mapped_column(Integer, nullable=False)
+    answered = mapped_column(Integer, nullable=False, default=0,
+                             server_default='0')
+    correct = mapped_column(Integer, nullable=False, default=0,
+                            server_default='0')
+    user_id = mapped_column(String(64), nullable=True)
+
+
+class QuizQuestion(Base):
+    """Модель Алхимии к таблице quiz_question в БД: вопрос каталога,
+    выданный в конкретной викторине, с его порядковым номером и ответом
+    участника.
+
+    Таблица секционирована по диапазонам `add_date` - даты создания
+    викторины, одинаковой у всех её вопросов. Ключ секционирования входит
+    в первичный ключ и уникальный индекс таблицы, но для ORM первичным
+    ключом остаётся пара (quiz_id, question_id). Месячные секции создаёт
+    и архивирует `business_layer.quiz_retention`, строки вне созданных
+    секций попадают в секцию по умолчанию."""
+    __tablename__ = 'quiz_question'
+    __table_args__ = (
+        Index('ix_quiz_question_quiz_id_position', 'quiz_id', 'position',
+              'add_date', unique=True),
+        {'postgresql_partition_by': 'RANGE (add_date)'},
+    )
+
+    quiz_id = mapped_column(
+        UUID,
+        ForeignKey('quiz.quiz_id', ondelete='CASCADE'),
+        primary_key=True)
+    question_id = mapped_column(
+        Integer,
+        ForeignKey('question.question_id'),
+        primary_key=True)
+    position = mapped_column(Integer, nullable=False)
+    answer = mapped_column(String(255), nullable=True)
+    add_date = mapped_column(DateTime, primary_key=True)
+
+    @declared_attr.directive
+    def __mapper_args__(cls):
+        return {'primary_key': [cls.__table__.c.quiz_id,
+                                cls.__table__.c.question_id]}
+
+
+event.listen(
+    QuizQuestion.__table__,
+    'after_create',
+    DDL('CREATE TABLE quiz_question_default '
+        'PARTITION OF quiz_question DEFAULT'),
+)
@@ -0,0 +1,142 @@
+"""Управление месячными секциями таблицы quiz_question.
+
+Секция месяца называется `quiz_question_pYYYYMM` и содержит вопросы
+викторин, созданных в этом месяце. Строки, для которых секции нет,
+попадают в секцию по умолчанию `quiz_question_default`. Устаревшие
+секции отсоединяются и переносятся в схему `archive` вместе с записями
+их викторин из таблицы quiz.
+"""
+from datetime import date, datetime
+from typing import NamedTuple
+
+from sqlalchemy import text
+
+from db_layer import db_engine
+
+PARENT_TABLE = 'quiz_question'
+DEFAULT_PARTITION = 'quiz_question_default'
+ARCHIVE_SCHEMA = 'archive'
+# Ключ блокировки, чтобы секции одновременно обслуживал один процесс.
+MAINTENANCE_LOCK_ID = 0x7175697a
+
+
+class Partition(NamedTuple):
+    """Месячная секция: имя и полуоткрытый интервал [lower, upper)."""
+    name: str
+    lower: date
+    upper: date
+
+
+def month_start(value: date | datetime) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_partition(month: date) -> Partition:
+    month = month_start(month)
+    return Partition(f'{PARENT_TABLE}_p{month:%Y%m}', month,
+                     add_months(month, 1))
+
+
+async def lock_maintenance(session: db_engine.AsyncSession) -> bool:
+    """Берёт блокировку обслуживания секций до конца транзакции.
+    Возвращает False, если секции уже обслуживает другой процесс."""
+    return await session.scalar(
+        text('SELECT pg_try_advisory_xact_lock(:lock_id)'),
+        {'lock_id': MAINTENANCE_LOCK_ID})
+
+
+async def get_partitions(
+    session: db_engine.AsyncSession,
+) -> list[Partition]:
+    """Возвращает месячные секции таблицы quiz_question по порядку."""
+    names = await session.scalars(
+        text('SELECT child.relname FROM pg_inherits '
+             'JOIN pg_class child ON child.oid = pg_inherits.inhrelid '
+             'WHERE pg_inherits.inhparent = CAST(:parent AS regclass) '
+             'AND child.relname <> :default'),
+        {'parent': PARENT_TABLE, 'default': DEFAULT_PARTITION})
+    return sorted(
+        month_partition(datetime.strptime(name[-6:], '%Y%m'))
+        for name in names)
+
+
+async def get_default_partition_months(
+    session: db_engine.AsyncSession,
+) -> list[date]:
+    """Возвращает месяцы, строки которых лежат в секции по умолчанию."""
+    months = await session.scalars(text(
+        "SELECT DISTINCT date_trunc('month', add_date) "
+        f'FROM {DEFAULT_PARTITION}'))
+    return [month_start(month) for month in months]
+
+
+async def create_partition(
+    session: db_engine.AsyncSession,
+    partition: Partition,
+) -> None:
+    """Создаёт секцию месяца. Строки этого месяца, уже попавшие в секцию
+    по умолчанию, переносятся в новую секцию до её присоединения."""
+    bounds = {'lower': partition.lower, 'upper': partition.upper}
+    in_range = 'add_date >= :lower AND add_date < :upper'
+    await session.execute(text(
+        f'CREATE TABLE {partition.name} '
+        f'(LIKE {PARENT_TABLE} INCLUDING DEFAULTS)'))
+    await session.execute(text(
+        f'INSERT INTO {partition.name} '
+        f'SELECT * FROM {DEFAULT_PARTITION} WHERE {in_range}'), bounds)
+    await session.execute(text(
+        f'DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}'), bounds)
+    await session.execute(text(
+        f'ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {partition.name} '
+        f"FOR VALUES FROM ('{partition.lower}') TO ('{partition.upper}')"))
+
+
+async def drop_partition_if_empty(
+    session: db_engine.AsyncSession,
+    partition: Partition,
+) -> bool:
+    """Удаляет секцию, если в ней нет строк. Возвращает True, если
+    секция удалена."""
+    has_rows = await session.scalar(text(
+        f'SELECT EXISTS (SELECT 1 FROM {partition.name})'))
+    if has_rows:
+        return False
+    await session.execute(text(f'DROP TABLE {partition.name}'))
+    return True
+
+
+async def archive_partition(
+    session: db_engine.AsyncSession,
+    partition: Partition,
+) -> None:
+    """Отсоединяет секцию и переносит её в схему archive вместе с
+    викторинами, вопросы которых в ней лежат. Внешние ключи архивной
+    секции удаляются, чтобы удаление викторины из таблицы quiz не
+    затрагивало архив."""
+    await session.execute(text(
+        f'CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}'))
+    await session.execute(text(
+        f'CREATE TABLE IF NOT EXISTS {ARCHIVE_SCHEMA}.quiz '
+        '(LIKE quiz INCLUDING DEFAULTS)'))
+    await session.execute(text(
+        f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION {partition.name}'))
+    foreign_keys = await session.scalars(
+        text('SELECT conname FROM pg_constraint '
+             "WHERE conrelid = CAST(:name AS regclass) AND contype = 'f'"),
+        {'name': partition.name})
+    for foreign_key in foreign_keys.all():
+        await session.execute(text(
+            f'ALTER TABLE {partition.name} '
+            f'DROP CONSTRAINT "{foreign_key}"'))
+    await session.execute(text(
+        f'ALTER TABLE {partition.name} SET SCHEMA {ARCHIVE_SCHEMA}'))
+    await session.execute(text(
+        f'WITH archived AS (DELETE FROM quiz WHERE quiz_id IN '
+        f'(SELECT quiz_id FROM {ARCHIVE_SCHEMA}.{partition.name}) '
+        'RETURNING *) '
+        f'INSERT INTO {ARCHIVE_SCHEMA}.quiz SELECT * FROM archived'))
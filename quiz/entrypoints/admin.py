@@ -0,0 +1,102 @@
+"""Роутеры для служебных эндпойнтов администратора."""
+import secrets
+from datetime import datetime
+from typing import Annotated, Literal
+
+from fastapi import (APIRouter, Depends, Header, HTTPException, Path, Query,
+                     Response, status)
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from business_layer import schemas
+from business_layer.question_export import (EXPORT_MEDIA_TYPES,
+                                            export_questions)
+from config import settings
+from profiling import profile_store
+
+
+async def verify_admin_token(
+    x_admin_token: Annotated[str | None, Header()] = None,
+) -> None:
+    """Пропускает запрос только с токеном администратора в заголовке
+    X-Admin-Token. Пока токен не задан в настройках, эндпойнты
+    администратора недоступны."""
+    if not settings.admin_token or not secrets.compare_digest(
+            (x_admin_token or '').encode(), settings.admin_token.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail='Доступ запрещён.')
+
+
+router = APIRouter(dependencies=[Depends(verify_admin_token)])
+
+
+@router.get(
+    path='/questions/export',
+    summary='Выгрузить каталог вопросов',
+    response_class=StreamingResponse,
+    responses={
+        200: {'content': {media_type: {}
+                          for media_type in EXPORT_MEDIA_TYPES.values()}},
+    },
+)
+async def export_question_catalog(
+    export_format: Annotated[
+        Literal['ndjson', 'csv'],
+        Query(alias='format', title='Формат выгрузки')] = 'ndjson',
+    date_from: Annotated[
+        datetime | None,
+        Query(title='Начало интервала add_date (включительно)')] = None,
+    date_to: Annotated[
+        datetime | None,
+        Query(title='Конец интервала add_date (не включительно)')] = None,
+) -> StreamingResponse:
+    return StreamingResponse(
+        export_questions(export_format, date_from, date_to),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={'Content-Disposition': (
+            f'attachment; filename="questions.{export_format}"')},
+    )
+
+
+@router.get(
+    path='/profiles',
+    summary='Получить список сохранённых профилей запросов',
+    response_model=list[schemas.ProfileInfo],
+)
+async def list_profiles() -> list[schemas.ProfileInfo]:
+    return [schemas.ProfileInfo.model_validate(item)
+            for item in profile_store.all()]
+
+
+@router.get(
+    path='/profiles/{profile_id}',
+    summary='Скачать профиль запроса',
+    response_class=Response,
+    responses={
+        200: {'content': {'application/octet-stream': {},
+                          'application/json': {}}},
+        404: {'model': schemas.NotFound},
+    },
+)
+async def download_profile(
+    profile_id: Annotated[int, Path(title='Номер профиля')],
+    profile_format: Annotated[
+        Literal['pstats', 'speedscope'],
+        Query(alias='format', title='Формат профиля')] = 'speedscope',
+) -> Response:
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Профиль не найден.')
+    filename = f'profile-{profile_id}'
+    if profile_format == 'pstats':
+        return Response(
+            content=profile.to_pstats(),
+            media_type='application/octet-stream',
+            headers={'Content-Disposition': (
+                f'attachment; filename="{filename}.pstats"')})
+    return JSONResponse(
+        content=profile.to_speedscope(),
+        headers={'Content-Disposition': (
+            f'attachment; filename="{filename}.speedscope.json"')})
@@ -0,0 +1,68 @@
+"""Роутеры для постраничного просмотра каталога вопросов и викторин.
+
+Страницы выдаются по курсору (keyset), поэтому время получения страницы
+не зависит от её номера. Списки содержат правильные ответы, поэтому
+доступны только администратору."""
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from business_layer import schemas
+from db_layer import db_engine as db
+from db_layer.crud import question_crud, quiz_crud
+from entrypoints.admin import verify_admin_token
+
+router = APIRouter(dependencies=[Depends(verify_admin_token)])
+
+PageLimit = Annotated[int, Query(ge=1, le=500, title='Размер страницы')]
+PageCursor = Annotated[
+    str | None,
+    Query(title='Курсор страницы из поля next_cursor предыдущей страницы'),
+]
+
+
+def invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=schemas.BadRequest().detail)
+
+
+@router.get(
+    path='/questions',
+    summary='Получить страницу каталога вопросов',
+    response_model=schemas.QuestionPage,
+    responses={400: {'model': schemas.BadRequest}},
+)
+async def list_questions(
+    session: Annotated[db.AsyncSession, Depends(db.get_async_session)],
+    limit: PageLimit = 50,
+    cursor: PageCursor = None,
+) -> schemas.QuestionPage:
+    try:
+        items, next_cursor = await question_crud.get_page(
+            limit, cursor, session)
+    except ValueError:
+        raise invalid_cursor()
+    return schemas.QuestionPage(
+        items=[schemas.Question.model_validate(item) for item in items],
+        next_cursor=next_cursor)
+
+
+@router.get(
+    path='/quizzes',
+    summary='Получить страницу списка викторин',
+    response_model=schemas.QuizPage,
+    responses={400: {'model': schemas.BadRequest}},
+)
+async def list_quizzes(
+    session: Annotated[db.AsyncSession, Depends(db.get_async_session)],
+    limit: PageLimit = 50,
+    cursor: PageCursor = None,
+) -> schemas.QuizPage:
+    try:
+        items, next_cursor = await quiz_crud.get_page(limit, cursor, session)
+    except ValueError:
+        raise invalid_cursor()
+    return schemas.QuizPage(
+        items=[schemas.QuizSummary.model_validate(item) for item in items],
+        next_cursor=next_cursor)
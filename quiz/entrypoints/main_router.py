@@ -1,7 +1,7 @@
 """Подключение всех роутеров к главному роутеру."""
 from fastapi import APIRouter
 
-from . import quiz
+from . import admin, listing, quiz
 
 main_router = APIRouter(prefix='/api/v1')
 
@@ -10,3 +10,13 @@ main_router.include_router(
     prefix='/quiz',
     tags=['Quiz'],
 )
+main_router.include_router(
+    router=admin.router,
+    prefix='/admin',
+    tags=['Admin'],
+)
+main_router.include_router(
+    router=listing.router,
+    prefix='/admin',
+    tags=['Listing'],
+)
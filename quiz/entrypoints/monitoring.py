@@ -0,0 +1,13 @@
+"""Роутер эндпойнта метрик Prometheus."""
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+
+import metrics
+
+router = APIRouter()
+
+
+@router.get(path='/metrics', include_in_schema=False)
+def get_metrics() -> Response:
+    return Response(content=metrics.collect_latest(),
+                    media_type=CONTENT_TYPE_LATEST)
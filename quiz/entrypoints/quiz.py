@@ -1,36 +1,92 @@
 """Роутеры для едпойнтов викторины."""
+import hashlib
 import logging
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Path, status
+from fastapi import (APIRouter, Depends, Header, HTTPException, Path,
+                     Response, status)
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
 
 from business_layer import schemas
-from business_layer.question_retrieval import get_and_save_questions
+from business_layer.http_client import QuestionAPIError
+from business_layer.question_retrieval import (get_and_save_questions,
+                                               wait_for_questions)
+from config import settings
 from db_layer import db_engine as db
-from db_layer.crud import question_crud
+from db_layer.cache import QuizState
+from db_layer.crud import question_crud, quiz_crud
 
 router = APIRouter()
 
 
+def quiz_response(
+    schema: type[BaseModel],
+    headers: dict | None = None,
+    **fields,
+) -> BaseModel | Response:
+    """Ответ эндпойнта викторины без полей со значением None. Данные
+    берутся из БД и кэша уже проверенными, поэтому при включённой
+    настройке `fast_json_responses` они сериализуются orjson сразу в
+    байты, минуя создание модели `schema` и её повторную проверку
+    FastAPI по `response_model`. Схема в OpenAPI от этого не меняется.
+    Значения передаются стандартных типов Python: типы драйвера БД
+    (например, UUID asyncpg) orjson не сериализует, поэтому вместо них
+    передаются проверенные значения из запроса."""
+    content = {name: value for name, value in fields.items()
+               if value is not None}
+    if settings.fast_json_responses:
+        return ORJSONResponse(content, headers=headers)
+    return schema(**content)
+
+
+def quiz_questions_etag(quiz_id: UUID, state: QuizState) -> str:
+    """Возвращает сильный ETag набора вопросов викторины. Набор вопросов
+    полностью сохранённой викторины не меняется, поэтому ETag считается
+    по кэшированному состоянию без сериализации ответа."""
+    digest = hashlib.blake2b(str(quiz_id).encode(), digest_size=16)
+    for question in state.questions:
+        digest.update(b'\0%d\0' % question.question_id)
+        digest.update(question.question.encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(etag: str, if_none_match: str | None) -> bool:
+    """Проверяет заголовок If-None-Match. Для него по RFC 9110
+    используется слабое сравнение, поэтому префикс W/ отбрасывается."""
+    if not if_none_match:
+        return False
+    candidates = [item.strip() for item in if_none_match.split(',')]
+    return any(item == '*' or item.removeprefix('W/') == etag
+               for item in candidates)
+
+
 @router.post(
     path='/',
     summary='Начать викторину',
     status_code=status.HTTP_200_OK,
     response_model=schemas.QuizResponseNoAnswer,
     response_model_exclude_none=True,
+    responses={503: {'model': schemas.ServiceUnavailable}},
 )
 async def start_quiz(
     input: schemas.InitiateQuiz,
     session: Annotated[db.AsyncSession, Depends(db.get_async_session)],
 ) -> schemas.QuizResponseNoAnswer:
     try:
-        questions = await get_and_save_questions(input.questions_num, session)
-        await session.refresh(questions[0])
-        return schemas.QuizResponseNoAnswer(
-            quiz_id=questions[0].quiz_id,
+        quiz_id, questions = await get_and_save_questions(
+            input.questions_num, session, input.user_id)
+        return quiz_response(
+            schemas.QuizResponseNoAnswer,
+            quiz_id=quiz_id,
             question_id=questions[0].question_id,
             question=questions[0].question)
+    except QuestionAPIError as e:
+        logging.error(e)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=schemas.ServiceUnavailable().detail)
     except Exception as e:
         logging.exception(e)
         raise HTTPException(
@@ -48,23 +104,27 @@ async def post_answer(
     input: schemas.QuizAnswer,
     session: Annotated[db.AsyncSession, Depends(db.get_async_session)],
 ) -> schemas.QuizResponseFull:
-    question = await question_crud.update_question(input, session)
-    if not question:
+    result = await question_crud.answer_question(input, session)
+    if not result:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=('Неправильный номер вопроса/номер викторины, '
                     'либо ответ на вопрос уже был дан')
         )
-    correct_answer = question.correct_answer
-    next_question = await question_crud.get_next_quiz_question(
-        quiz_id=input.quiz_id,
-        session=session)
+    next_question = (result.next_question_id, result.next_question)
+    if result.next_question_id is None:
+        state = await wait_for_questions(input.quiz_id, session)
+        question = state.next_question() if state else None
+        if question is not None:
+            next_question = (question.question_id, question.question)
     try:
-        return schemas.QuizResponseFull(
+        return quiz_response(
+            schemas.QuizResponseFull,
             quiz_id=input.quiz_id,
-            previous_question_correct_answer=correct_answer,
-            question_id=next_question.question_id if next_question else None,
-            question=next_question.question if next_question else None)
+            previous_question_correct_answer=result.correct_answer,
+            previous_question_correct=result.correct,
+            question_id=next_question[0],
+            question=next_question[1])
     except Exception as e:
         logging.exception(e)
         raise HTTPException(
@@ -72,6 +132,107 @@ async def post_answer(
             detail='Ошибка сервиса.')
 
 
+@router.post(
+    path='/answers',
+    summary='Отправить пакет ответов на вопросы',
+    response_model=schemas.QuizBatchResponse,
+    response_model_exclude_none=True,
+)
+async def post_answers(
+    input: schemas.QuizAnswerBatch,
+    session: Annotated[db.AsyncSession, Depends(db.get_async_session)],
+) -> schemas.QuizBatchResponse:
+    answered = await question_crud.answer_questions(input, session)
+    accepted = {row.question_id for row in answered}
+    rejected = []
+    for item in input.answers:
+        if item.question_id in accepted:
+            accepted.discard(item.question_id)
+        else:
+            rejected.append(item.question_id)
+    state = await wait_for_questions(input.quiz_id, session)
+    question = state.next_question() if state else None
+    return quiz_response(
+        schemas.QuizBatchResponse,
+        quiz_id=input.quiz_id,
+        answered=[
+            {'question_id': row.question_id,
+             'correct_answer': row.correct_answer,
+             'correct': row.correct}
+            for row in answered
+        ],
+        rejected=rejected,
+        question_id=question.question_id if question else None,
+        question=question.question if question else None,
+    )
+
+
+@router.get(
+    path='/{quiz_id}/questions',
+    summary='Получить все вопросы викторины',
+    response_model=schemas.QuizQuestions,
+    responses={
+        304: {'description': 'Вопросы не изменились (If-None-Match)'},
+        404: {'model': schemas.NotFound},
+    },
+)
+async def get_quiz_questions(
+    quiz_id: Annotated[UUID, Path(title='Номер (UUID) викторины')],
+    session: Annotated[db.AsyncSession, Depends(db.get_async_session)],
+    response: Response,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> schemas.QuizQuestions:
+    state = await quiz_crud.get_quiz_state(quiz_id, session)
+    if state is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Викторина не найдена.')
+    if state.is_complete:
+        etag = quiz_questions_etag(quiz_id, state)
+        headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+        if etag_matches(etag, if_none_match):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED,
+                            headers=headers)
+    else:
+        headers = {'Cache-Control': 'no-store'}
+    response.headers.update(headers)
+    return quiz_response(
+        schemas.QuizQuestions,
+        headers=headers,
+        quiz_id=quiz_id,
+        questions=[
+            {'question_id': question.question_id,
+             'question': question.question}
+            for question in state.questions
+        ],
+    )
+
+
+@router.get(
+    path='/{quiz_id}/result',
+    summary='Получить результат викторины',
+    response_model=schemas.QuizResult,
+    responses={404: {'model': schemas.NotFound}},
+)
+async def get_quiz_result(
+    quiz_id: Annotated[UUID, Path(title='Номер (UUID) викторины')],
+    session: Annotated[db.AsyncSession, Depends(db.get_async_session)],
+) -> schemas.QuizResult:
+    quiz = await quiz_crud.get(quiz_id, session)
+    if quiz is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Викторина не найдена.')
+    return quiz_response(
+        schemas.QuizResult,
+        quiz_id=quiz_id,
+        total=quiz.total,
+        answered=quiz.answered,
+        correct=quiz.correct,
+        finished=quiz.answered >= quiz.total,
+    )
+
+
 @router.get(
     path='/next_question/{quiz_id}',
     summary='Получить следующий вопрос',
@@ -79,18 +240,26 @@ async def post_answer(
     response_model_exclude_none=True,
     responses={
         404: {'model': schemas.NotFound},
+        503: {'model': schemas.QuizNotReady},
     },
 )
 async def get_next_question(
     quiz_id: Annotated[UUID, Path(title='Номер (UUID) викторины')],
     session: Annotated[db.AsyncSession, Depends(db.get_async_session)],
 ) -> schemas.QuizResponseNoAnswer:
-    question = await question_crud.get_next_quiz_question(quiz_id, session)
+    state = await wait_for_questions(quiz_id, session)
+    if state is not None and state.is_waiting():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=schemas.QuizNotReady().detail,
+            headers={'Retry-After': '1'})
+    question = state.next_question() if state else None
     if not question:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail='Вопрос не найден.')
-    return schemas.QuizResponseNoAnswer(
+    return quiz_response(
+        schemas.QuizResponseNoAnswer,
         quiz_id=quiz_id,
         question_id=question.question_id,
         question=question.question,
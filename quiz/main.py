@@ -1,26 +1,53 @@
+import asyncio
+import contextlib
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
+from business_layer.question_bank import run_question_bank_refiller
+from business_layer.question_retrieval import stop_quiz_fillers
+from business_layer.question_sources import question_source
+from business_layer.quiz_retention import run_quiz_retention
 from config import settings
+from db_layer.cache import quiz_state_cache
 from db_layer.db_engine import sessionmanager
+from entrypoints import monitoring
 from entrypoints.main_router import main_router
+from metrics import MetricsMiddleware
+from profiling import ProfilingMiddleware
 
 
 def init_app(init_db=True):
-    lifespan = None
-
     if init_db:
-        sessionmanager.init(settings.database_url)
-
-        @asynccontextmanager
-        async def lifespan(app: FastAPI):
-            yield
-            if sessionmanager._engine is not None:
-                await sessionmanager.close()
+        sessionmanager.init(settings.database_url,
+                            **settings.database_engine_options)
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await question_source.init()
+        background_tasks = []
+        if init_db:
+            background_tasks = [
+                asyncio.create_task(run_question_bank_refiller()),
+                asyncio.create_task(run_quiz_retention()),
+            ]
+        yield
+        for task in background_tasks:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        await stop_quiz_fillers()
+        await question_source.close()
+        await quiz_state_cache.close()
+        if init_db and sessionmanager._engine is not None:
+            await sessionmanager.close()
 
     app = FastAPI(title=settings.app_title, lifespan=lifespan)
     app.include_router(main_router)
+    app.include_router(monitoring.router)
+    if settings.profiling_enabled:
+        app.add_middleware(ProfilingMiddleware)
+    app.add_middleware(MetricsMiddleware)
     return app
 
 
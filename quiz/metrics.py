@@ -0,0 +1,151 @@
+"""Метрики Prometheus приложения.
+
+Метрики собираются в реестр по умолчанию и отдаются эндпойнтом
+`/metrics`. Задержки запросов к API считает ASGI-мидлварь, запросов к
+БД - события движка в `DatabaseSessionManager`, обращений к источнику
+вопросов - `get_questions`. Состояние пула соединений читается только в
+момент опроса метрик.
+
+Если задана переменная `PROMETHEUS_MULTIPROC_DIR` (её задаёт `server`
+при нескольких воркерах), счётчики и гистограммы суммируются по всем
+воркерам, а состояние пула отдаёт воркер, обработавший опрос.
+"""
+import os
+import time
+
+from prometheus_client import (REGISTRY, CollectorRegistry, Counter,
+                               Histogram, generate_latest, multiprocess)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+REQUEST_LATENCY = Histogram(
+    'quiz_http_request_duration_seconds',
+    'Время обработки запроса к API',
+    ['method', 'route', 'status'],
+)
+DB_QUERY_LATENCY = Histogram(
+    'quiz_db_query_duration_seconds',
+    'Время выполнения SQL-запроса',
+    ['operation'],
+    buckets=(.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5),
+)
+UPSTREAM_LATENCY = Histogram(
+    'quiz_upstream_request_duration_seconds',
+    'Время получения вопросов из внешнего API, включая повторы',
+)
+UPSTREAM_ERRORS = Counter(
+    'quiz_upstream_errors_total',
+    'Неудачные обращения к внешнему API с вопросами',
+)
+UPSTREAM_FETCH_ROUNDS = Histogram(
+    'quiz_upstream_fetch_rounds',
+    'Кол-во раундов запросов к внешнему API для набора уникальных '
+    'вопросов викторины',
+    buckets=(1, 2, 3, 4, 5, 7, 10),
+)
+UPSTREAM_DUPLICATES = Counter(
+    'quiz_upstream_duplicate_questions_total',
+    'Вопросы внешнего API, отброшенные как повторы',
+)
+UNMATCHED_ROUTE = '<unmatched>'
+
+
+class MetricsMiddleware:
+    """ASGI-мидлварь, которая измеряет время обработки HTTP-запросов.
+    Запрос учитывается по шаблону пути маршрута, чтобы число рядов
+    метрики не зависело от id в пути."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get('route')
+            REQUEST_LATENCY.labels(
+                scope['method'],
+                route.path if route is not None else UNMATCHED_ROUTE,
+                status,
+            ).observe(time.perf_counter() - started)
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context,
+                          executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context,
+                         executemany):
+    started = conn.info['query_started'].pop()
+    operation = statement.lstrip(' \n(').split(None, 1)[0].upper()
+    DB_QUERY_LATENCY.labels(operation).observe(time.perf_counter() - started)
+
+
+def handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('query_started'):
+        connection.info['query_started'].pop()
+
+
+class PoolCollector:
+    """Отдаёт состояние пула соединений `sessionmanager` при опросе
+    метрик."""
+
+    gauges = {
+        'size': 'Размер пула',
+        'checked_in': 'Свободные соединения',
+        'checked_out': 'Выданные соединения',
+        'overflow': 'Соединения сверх размера пула',
+        'wait_time_max': 'Наибольшее время ожидания соединения, сек.',
+    }
+    counters = {
+        'checkouts': 'Выдачи соединений из пула',
+        'wait_time_total': 'Суммарное время ожидания соединения, сек.',
+    }
+
+    def __init__(self, sessionmanager):
+        self.sessionmanager = sessionmanager
+
+    def collect(self):
+        if self.sessionmanager._engine is None:
+            return
+        for name, value in self.sessionmanager.pool_stats().items():
+            if name in self.gauges:
+                yield GaugeMetricFamily(f'quiz_db_pool_{name}',
+                                        self.gauges[name], value=value)
+            elif name in self.counters:
+                yield CounterMetricFamily(
+                    f'quiz_db_pool_{name.removesuffix("_total")}',
+                    self.counters[name], value=value)
+
+
+pool_collectors: list[PoolCollector] = []
+
+
+def register_pool_collector(sessionmanager) -> None:
+    collector = PoolCollector(sessionmanager)
+    pool_collectors.append(collector)
+    REGISTRY.register(collector)
+
+
+def collect_latest() -> bytes:
+    """Метрики в текстовом формате Prometheus."""
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return generate_latest()
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    for collector in pool_collectors:
+        registry.register(collector)
+    return generate_latest(registry)
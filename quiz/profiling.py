@@ -0,0 +1,237 @@
+"""Профилирование отдельных запросов к API по требованию.
+
+Мидлварь включается настройкой `profiling_enabled` и профилирует запрос
+через cProfile, если запрос подписан заголовком `X-Profile-Signature`
+или попал в выборку с долей `profiling_sample_rate`. Последние
+`profiling_buffer_size` профилей хранятся в памяти процесса и отдаются
+эндпойнтами администратора в формате pstats или speedscope.
+
+cProfile замеряет весь поток, поэтому в профиль попадают и задачи других
+запросов, выполнявшиеся в цикле событий одновременно с профилируемым.
+Одновременно профилируется только один запрос.
+"""
+import cProfile
+import hashlib
+import hmac
+import itertools
+import marshal
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import PurePath
+
+from config import settings
+
+SIGNATURE_HEADER = b'x-profile-signature'
+# Группы функций для сводки профиля: (имя, признак функции группы).
+SUMMARY_GROUPS = (
+    ('crud', lambda filename: PurePath(filename).parts[-2:] == (
+        'db_layer', 'crud.py')),
+    ('aiohttp', lambda filename: 'aiohttp' in PurePath(filename).parts),
+)
+EVENT_LOOP_MODULES = ('asyncio', 'selectors.py')
+
+
+def sign_profile_request(method: str, path: str, expires: int) -> str:
+    """Возвращает значение заголовка X-Profile-Signature, которое
+    включает профилирование запроса `method path` до времени `expires`
+    (UNIX time)."""
+    message = f'{expires}:{method.upper()}:{path}'.encode()
+    digest = hmac.new(settings.profiling_secret.encode(), message,
+                      hashlib.sha256).hexdigest()
+    return f'{expires}:{digest}'
+
+
+def is_signed(method: str, path: str, signature: str) -> bool:
+    """Проверяет подпись запроса. Подпись с посторонними символами, в
+    том числе не ASCII, считается неверной."""
+    if not settings.profiling_secret:
+        return False
+    expires, _, _ = signature.partition(':')
+    # str.isdigit() пропускает цифры вроде '²', которые не читает int().
+    if not (expires.isascii() and expires.isdigit()):
+        return False
+    if int(expires) < time.time():
+        return False
+    # compare_digest() не сравнивает строки с символами не ASCII.
+    return hmac.compare_digest(
+        signature.encode(),
+        sign_profile_request(method, path, int(expires)).encode())
+
+
+@dataclass
+class CapturedProfile:
+    """Профиль одного запроса: статистика cProfile и сводка по группам
+    функций."""
+    profile_id: int
+    method: str
+    path: str
+    status: int
+    started_at: datetime
+    duration: float
+    stats: dict = field(repr=False)
+    summary: dict = field(default_factory=dict)
+
+    def to_pstats(self) -> bytes:
+        """Содержимое файла, который читает `pstats.Stats`."""
+        return marshal.dumps(self.stats)
+
+    def to_speedscope(self) -> dict:
+        """Профиль в формате speedscope. cProfile не хранит стеки вызовов,
+        поэтому стек каждой функции восстанавливается по самому тяжёлому
+        вызывающему, а вес стека - собственное время функции."""
+        frames, frame_index = [], {}
+
+        def frame(function):
+            if function not in frame_index:
+                filename, line, name = function
+                frame_index[function] = len(frames)
+                frames.append({'name': name, 'file': filename,
+                               'line': line})
+            return frame_index[function]
+
+        samples, weights = [], []
+        for function, (_, _, tottime, _, callers) in self.stats.items():
+            if tottime <= 0:
+                continue
+            stack, current = [], function
+            while current is not None and current not in stack:
+                stack.append(current)
+                callers = self.stats.get(current, (0, 0, 0, 0, {}))[4]
+                current = max(callers, key=lambda item: callers[item][3],
+                              default=None)
+            samples.append([frame(item) for item in reversed(stack)])
+            weights.append(tottime)
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'shared': {'frames': frames},
+            'profiles': [{
+                'type': 'sampled',
+                'name': f'{self.method} {self.path}',
+                'unit': 'seconds',
+                'startValue': 0,
+                'endValue': sum(weights),
+                'samples': samples,
+                'weights': weights,
+            }],
+            'name': f'{self.method} {self.path} #{self.profile_id}',
+            'exporter': 'quiz',
+        }
+
+
+def summarize(stats: dict, duration: float) -> dict:
+    """Сводка профиля: время запроса, процессорное время, время в
+    CRUD-классах, в aiohttp и в цикле событий. Для групп берётся
+    накопленное время функций группы, которые вызваны не из той же
+    группы, чтобы вложенные вызовы не учитывались дважды."""
+    summary = {'duration_s': duration,
+               'cpu_s': sum(item[2] for item in stats.values())}
+    for group, matches in SUMMARY_GROUPS:
+        summary[f'{group}_s'] = sum(
+            cumtime
+            for function, (_, _, _, cumtime, callers) in stats.items()
+            if matches(function[0])
+            and not any(matches(caller[0]) for caller in callers))
+    summary['event_loop_s'] = sum(
+        tottime for function, (_, _, tottime, _, _) in stats.items()
+        if any(part in EVENT_LOOP_MODULES
+               for part in PurePath(function[0]).parts)
+        or 'select.epoll' in function[2])
+    return summary
+
+
+class ProfileStore:
+    """Кольцевой буфер последних профилей процесса."""
+
+    def __init__(self, size: int):
+        self._profiles: deque[CapturedProfile] = deque(maxlen=size)
+        self._ids = itertools.count(1)
+        self.active = False
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def add(self, profile: CapturedProfile) -> None:
+        self._profiles.append(profile)
+
+    def get(self, profile_id: int) -> CapturedProfile | None:
+        return next((item for item in self._profiles
+                     if item.profile_id == profile_id), None)
+
+    def all(self) -> list[CapturedProfile]:
+        return list(reversed(self._profiles))
+
+    def clear(self) -> None:
+        self._profiles.clear()
+
+
+profile_store = ProfileStore(settings.profiling_buffer_size)
+
+
+class ProfilingMiddleware:
+    """ASGI-мидлварь, которая профилирует выбранные запросы."""
+
+    def __init__(self, app, store: ProfileStore = profile_store):
+        self.app = app
+        self.store = store
+
+    def _should_profile(self, scope) -> bool:
+        if self.store.active:
+            return False
+        signature = dict(scope['headers']).get(SIGNATURE_HEADER)
+        if signature is not None:
+            return is_signed(scope['method'], scope['path'],
+                             signature.decode('latin-1'))
+        return random.random() < settings.profiling_sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        self.store.active = True
+        profiler = cProfile.Profile()
+        started_at = datetime.now()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            profiler.disable()
+            duration = time.perf_counter() - started
+            self.store.active = False
+            profiler.create_stats()
+            self.store.add(CapturedProfile(
+                profile_id=self.store.next_id(),
+                method=scope['method'],
+                path=scope['path'],
+                status=status,
+                started_at=started_at,
+                duration=duration,
+                stats=profiler.stats,
+                summary=summarize(profiler.stats, duration),
+            ))
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Подпись запроса для профилирования: значение '
+                    'заголовка X-Profile-Signature.')
+    parser.add_argument('method')
+    parser.add_argument('path')
+    parser.add_argument('--ttl', type=int, default=300,
+                        help='Срок действия подписи, сек.')
+    args = parser.parse_args()
+    print(sign_profile_request(args.method, args.path,
+                               int(time.time()) + args.ttl))
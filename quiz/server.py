@@ -0,0 +1,88 @@
+"""Запуск API в нескольких процессах uvicorn с uvloop и httptools.
+
+Пул соединений с БД создаётся в каждом воркере, поэтому размер пула
+уменьшается так, чтобы все воркеры вместе открывали не больше
+`db_max_connections - db_reserved_connections` соединений (запас
+остаётся для миграций, команд обслуживания и администрирования).
+`db_max_connections` должен совпадать с `max_connections` Postgres.
+
+По SIGTERM/SIGINT воркеры перестают принимать соединения и дожидаются
+завершения начатых запросов, но не дольше `server_graceful_timeout`
+секунд, после чего останавливают фоновые задачи и закрывают пул.
+
+При нескольких воркерах метрики Prometheus собираются в многопроцессном
+режиме: значения хранятся в папке `PROMETHEUS_MULTIPROC_DIR`, которая
+очищается при запуске. Кэш состояний викторин при этом должен быть
+общим (`quiz_cache_backend=redis`): с кэшем в памяти воркер не видит
+ответов, записанных другими воркерами, и отдаёт уже отвеченный вопрос.
+
+Запуск из папки `quiz`:
+
+    python -m server --workers 4
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+import uvicorn
+
+from config import settings
+
+MULTIPROC_DIR_ENV = 'PROMETHEUS_MULTIPROC_DIR'
+
+
+def split_pool(workers: int) -> tuple[int, int]:
+    """Возвращает `pool_size` и `max_overflow` пула одного воркера.
+    Размеры из настроек только уменьшаются: сначала за счёт соединений
+    сверх пула, затем за счёт самого пула."""
+    budget = settings.db_max_connections - settings.db_reserved_connections
+    per_worker = budget // workers
+    if per_worker < 1:
+        raise ValueError(
+            f'Соединений с БД ({budget}) не хватает на {workers} воркеров')
+    pool_size = min(settings.db_pool_size, per_worker)
+    max_overflow = min(settings.db_max_overflow, per_worker - pool_size)
+    return pool_size, max_overflow
+
+
+def configure_workers(workers: int) -> None:
+    """Задаёт размер пула воркеров и папку метрик. Воркеры запускаются
+    новыми процессами и читают настройки из переменных окружения.
+    Несколько воркеров с кэшем викторин в памяти процесса не
+    запускаются."""
+    if workers > 1 and settings.quiz_cache_backend != 'redis':
+        raise ValueError(
+            f'Для {workers} воркеров нужен общий кэш викторин: '
+            'quiz_cache_backend=redis')
+    pool_size, max_overflow = split_pool(workers)
+    settings.db_pool_size, settings.db_max_overflow = pool_size, max_overflow
+    os.environ['DB_POOL_SIZE'] = str(pool_size)
+    os.environ['DB_MAX_OVERFLOW'] = str(max_overflow)
+    if workers == 1:
+        return
+    path = os.environ.setdefault(
+        MULTIPROC_DIR_ENV, tempfile.mkdtemp(prefix='quiz-metrics-'))
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path)
+
+
+def run(workers: int) -> None:
+    configure_workers(workers)
+    uvicorn.run(
+        'main:app',
+        host=settings.server_host,
+        port=settings.server_port,
+        workers=workers,
+        loop=settings.server_loop,
+        http=settings.server_http,
+        timeout_graceful_shutdown=settings.server_graceful_timeout,
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int,
+                        default=settings.server_workers,
+                        help='Кол-во процессов uvicorn')
+    run(parser.parse_args().workers)
@@ -13,9 +13,13 @@ from pytest_postgresql import factories
 from pytest_postgresql.janitor import DatabaseJanitor
 
 from business_layer import schemas
+from business_layer.grading import normalize_answer
+from business_layer.http_client import question_api_client
+from business_layer.question_retrieval import upstream_duplicate_rate
 from config import settings
+from db_layer.cache import quiz_state_cache
 from db_layer.db_engine import get_async_session, sessionmanager
-from db_layer.models import Question
+from db_layer.models import Question, Quiz, QuizQuestion
 from main import init_app
 
 BASE_DIR = Path('.').absolute()
@@ -36,6 +40,24 @@ def client(app):
         yield client
 
 
+@pytest.fixture(autouse=True)
+def reset_duplicate_rate():
+    upstream_duplicate_rate.reset()
+
+
+@pytest.fixture
+def admin_headers(mocker):
+    mocker.patch.object(settings, 'admin_token', 'secret')
+    return {'X-Admin-Token': 'secret'}
+
+
+@pytest.fixture
+async def api_client():
+    question_api_client.init()
+    yield question_api_client
+    await question_api_client.close()
+
+
 test_db = factories.postgresql_noproc(
     host=settings.db_hostname,
     port=settings.db_port,
@@ -75,6 +97,7 @@ async def create_tables(connection_test):
     async with sessionmanager.connect() as connection:
         await sessionmanager.drop_all(connection)
         await sessionmanager.create_all(connection)
+    await quiz_state_cache.clear()
 
 
 @pytest.fixture(scope="function", autouse=True)
@@ -128,17 +151,75 @@ questions = [
 async def questions_in_db():
     async with sessionmanager.session() as session:
         created_questions = []
+        quizzes = {}
+        for question_data in questions:
+            quiz = quizzes.setdefault(
+                question_data['quiz_id'],
+                {'total': 0, 'current_position': None, 'answered': 0})
+            if (quiz['current_position'] is None
+                    and question_data.get('answer') is None):
+                quiz['current_position'] = quiz['total']
+            quiz['total'] += 1
+            quiz['answered'] += question_data.get('answer') is not None
+        add_date = datetime.now()
+        for quiz_id, quiz in quizzes.items():
+            current_position = quiz['current_position']
+            session.add(Quiz(
+                quiz_id=quiz_id,
+                add_date=add_date,
+                current_position=(quiz['total'] if current_position is None
+                                  else current_position),
+                total=quiz['total'],
+                answered=quiz['answered'],
+            ))
+        positions = dict.fromkeys(quizzes, 0)
         for question_data in questions:
             question_schema = schemas.Question(**question_data)
-            prepared_data = question_schema.dict()
-            question = Question(**prepared_data)
+            question = Question(
+                **question_schema.dict(),
+                normalized_answer=normalize_answer(
+                    question_schema.correct_answer),
+                used=True)
             session.add(question)
+            quiz_id = question_data['quiz_id']
+            session.add(QuizQuestion(
+                quiz_id=quiz_id,
+                question_id=question.question_id,
+                position=positions[quiz_id],
+                answer=question_data.get('answer'),
+                add_date=add_date,
+            ))
+            positions[quiz_id] += 1
             await session.commit()
             await session.refresh(question)
             created_questions.append(question.__dict__.copy())
         return created_questions
 
 
+catalog_questions = [
+    {
+        'question_id': 300 + number,
+        'question': f'Catalog question{number}',
+        'correct_answer': f'Catalog correct answer{number}',
+        'add_date': datetime.now(),
+    }
+    for number in range(10)
+]
+
+
+@pytest_asyncio.fixture(scope='function')
+async def questions_in_catalog():
+    async with sessionmanager.session() as session:
+        for question_data in catalog_questions:
+            question_schema = schemas.Question(**question_data)
+            session.add(Question(
+                **question_schema.dict(),
+                normalized_answer=normalize_answer(
+                    question_schema.correct_answer)))
+        await session.commit()
+        return catalog_questions
+
+
 class MockResponse:
     def __init__(self, questions_num):
         self.status = 200
@@ -0,0 +1,179 @@
+import time
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+
+from business_layer import schemas
+from db_layer.cache import (MemoryQuizStateCache, QuizState, QuizStateQuestion,
+                            RedisQuizStateCache, quiz_state_cache)
+from db_layer.crud import question_crud
+from tests.conftest import catalog_questions, questions
+
+
+def make_state(number=3):
+    return QuizState.from_questions([
+        QuizStateQuestion(item['question_id'], item['question'],
+                          item['correct_answer'])
+        for item in catalog_questions[:number]
+    ])
+
+
+@pytest.fixture
+def redis_server():
+    return fakeredis.FakeServer()
+
+
+def redis_cache(server):
+    """Кэш отдельного воркера, подключённый к общему серверу."""
+    return RedisQuizStateCache(fakeredis.aioredis.FakeRedis(server=server),
+                               ttl=60)
+
+
+def test_quiz_state_moves_cursor_like_database():
+    """Курсор состояния переходит к первому вопросу без ответа."""
+    state = make_state()
+    first, second, third = state.questions
+    state.mark_answered(second.question_id)
+    assert state.next_question() == first
+    state.mark_answered(first.question_id)
+    assert state.next_question() == third
+    state.mark_answered(third.question_id)
+    assert state.next_question() is None
+
+
+def test_quiz_state_waits_for_unsaved_questions():
+    """Состояние неполной викторины после ответа на все сохранённые
+    вопросы ждёт остальные вопросы, а не считается завершённым."""
+    state = QuizState.from_questions(make_state(2).questions, total=3)
+    assert not state.is_complete
+    state.mark_answered(*(item.question_id for item in state.questions))
+    assert state.next_question() is None
+    assert state.is_waiting()
+    assert not make_state(2).is_waiting()
+
+
+async def test_memory_cache_evicts_least_recently_used():
+    """При превышении размера из кэша вытесняется давно не читанная
+    запись."""
+    cache = MemoryQuizStateCache(max_size=2, ttl=60)
+    await cache.set('a', make_state())
+    await cache.set('b', make_state())
+    await cache.get('a')
+    await cache.set('c', make_state())
+    assert await cache.get('b') is None
+    assert await cache.get('a') is not None
+    assert await cache.get('c') is not None
+    assert cache.stats() == {'size': 2, 'hits': 3, 'misses': 1}
+
+
+async def test_memory_cache_expires_entries(mocker):
+    """Запись кэша устаревает по истечении TTL."""
+    cache = MemoryQuizStateCache(max_size=2, ttl=60)
+    await cache.set('a', make_state())
+    mocker.patch('db_layer.cache.time.monotonic',
+                 return_value=time.monotonic() + 61)
+    assert await cache.get('a') is None
+
+
+async def test_redis_cache_round_trips_state(redis_server):
+    """Состояние, записанное одним воркером, читается другим вместе с
+    ответами."""
+    writer, reader = redis_cache(redis_server), redis_cache(redis_server)
+    state = make_state()
+    await writer.set('a', state)
+    await writer.mark_answered('a', state.questions[0].question_id)
+    cached = await reader.get('a')
+    assert cached.questions == state.questions
+    assert cached.next_question() == state.questions[1]
+    await writer.invalidate('a')
+    assert await reader.get('a') is None
+    assert reader.stats() == {'hits': 1, 'misses': 1}
+
+
+async def test_redis_cache_keeps_answers_from_concurrent_load(redis_server):
+    """Ответ, записанный во время загрузки состояния другим воркером
+    из устаревших данных БД, не теряется."""
+    answering, loading = redis_cache(redis_server), redis_cache(redis_server)
+    stale_state = make_state()
+    await answering.mark_answered('a', stale_state.questions[0].question_id)
+    await loading.set('a', stale_state)
+    cached = await answering.get('a')
+    assert cached.next_question() == stale_state.questions[1]
+
+
+async def test_redis_cache_evicts_questions_with_answers(redis_server):
+    """Вопросы и ответы викторины хранятся одним ключом с TTL, поэтому
+    вытеснение не оставляет состояние без ответов, а ответы без вопросов
+    считаются промахом."""
+    cache = redis_cache(redis_server)
+    client = fakeredis.aioredis.FakeRedis(server=redis_server)
+    state = make_state()
+    await cache.mark_answered('a', state.questions[0].question_id)
+    assert await cache.get('a') is None
+    await cache.set('a', state)
+    await cache.mark_answered('a', state.questions[1].question_id)
+    assert await client.keys() == [b'quiz:a']
+    assert 0 < await client.ttl('quiz:a') <= 60
+    await client.delete('quiz:a')
+    assert await cache.get('a') is None
+
+
+async def test_answer_is_visible_to_other_worker(
+    questions_in_db,
+    test_session,
+    redis_server,
+    mocker,
+):
+    """Ответ, обработанный одним воркером, сразу виден другому при
+    получении следующего вопроса."""
+    first_worker, second_worker = (redis_cache(redis_server),
+                                   redis_cache(redis_server))
+    quiz_id = questions[0]['quiz_id']
+    mocker.patch('db_layer.crud.quiz_state_cache', first_worker)
+    question = await question_crud.get_next_quiz_question(
+        quiz_id, test_session)
+    assert question.question_id == questions[0]['question_id']
+
+    mocker.patch('db_layer.crud.quiz_state_cache', second_worker)
+    await question_crud.answer_question(
+        schemas.QuizAnswer(quiz_id=quiz_id,
+                           question_id=questions[0]['question_id'],
+                           answer='Input answer'),
+        test_session)
+
+    mocker.patch('db_layer.crud.quiz_state_cache', first_worker)
+    question = await question_crud.get_next_quiz_question(
+        quiz_id, test_session)
+    assert question.question_id == questions[1]['question_id']
+    assert first_worker.stats() == {'hits': 1, 'misses': 1}
+
+
+def test_next_question_is_served_from_cache(client, questions_in_db):
+    """Повторное получение следующего вопроса не обращается к БД,
+    а ответ на вопрос сразу отражается в кэше."""
+    quiz_id = str(questions[0]['quiz_id'])
+    client.get(f'/api/v1/quiz/next_question/{quiz_id}')
+    assert quiz_state_cache.stats()['misses'] == 1
+
+    response = client.get(f'/api/v1/quiz/next_question/{quiz_id}')
+    assert response.json()['question_id'] == questions[0]['question_id']
+    assert quiz_state_cache.stats()['hits'] == 1
+
+    client.post('/api/v1/quiz/answer', json={
+        'quiz_id': quiz_id,
+        'question_id': questions[0]['question_id'],
+        'answer': 'Input answer',
+    })
+    response = client.get(f'/api/v1/quiz/next_question/{quiz_id}')
+    assert response.json()['question_id'] == questions[1]['question_id']
+    assert quiz_state_cache.stats() == {'size': 1, 'hits': 2, 'misses': 1}
+
+
+def test_started_quiz_is_cached(client, questions_in_catalog):
+    """Состояние новой викторины кэшируется при её создании."""
+    response = client.post('/api/v1/quiz', json={'questions_num': 3})
+    quiz_id = response.json()['quiz_id']
+    response = client.get(f'/api/v1/quiz/next_question/{quiz_id}')
+    assert response.status_code == 200
+    assert quiz_state_cache.stats()['misses'] == 0
@@ -1,3 +1,6 @@
+from sqlalchemy import text
+
+from db_layer.db_engine import sessionmanager
 from tests.conftest import BASE_DIR
 
 
@@ -19,3 +22,16 @@ def test_check_migration_file_exist():
     assert len(files_in_version_dir) > 0, (
         'В папке `alembic.versions` не обнаружены файлы миграций'
     )
+
+
+async def test_pool_stats_counts_checkouts():
+    """Статистика пула учитывает выдачу соединений и время ожидания."""
+    before = sessionmanager.pool_stats()
+    async with sessionmanager.session() as session:
+        await session.execute(text('SELECT 1'))
+        assert sessionmanager.pool_stats()['checked_out'] >= 1
+    after = sessionmanager.pool_stats()
+    assert after['checkouts'] == before['checkouts'] + 1
+    assert after['wait_time_total'] >= before['wait_time_total']
+    assert set(after) >= {'size', 'checked_out', 'overflow',
+                          'wait_time_total', 'wait_time_max'}
@@ -1,4 +1,20 @@
-from db_layer.crud import question_crud
+import asyncio
+import time
+
+from sqlalchemy import event, update
+from sqlalchemy.pool import NullPool
+
+from business_layer import schemas
+from business_layer.http_client import QuestionAPIError
+from business_layer.question_retrieval import (fetch_unique_questions,
+                                               upstream_duplicate_rate,
+                                               wait_for_questions)
+from config import settings
+from db_layer.cache import quiz_state_cache
+from db_layer.crud import question_crud, quiz_crud
+from db_layer.db_engine import (DatabaseSessionManager, get_async_session,
+                                sessionmanager)
+from db_layer.models import Quiz, QuizQuestion
 from tests.conftest import MockResponse, questions
 
 
@@ -38,6 +54,84 @@ def test_quiz_get_question_uknown_quiz_id_returns_404(client, questions_in_db):
     assert response.status_code == 404, 'Неверный код ответа'
 
 
+def test_quiz_get_questions_returns_all_questions_with_etag(
+    client,
+    questions_in_db,
+):
+    """Эндпойнт для получения всех вопросов викторины возвращает вопросы
+    по порядку без правильных ответов и сильный ETag."""
+    quiz_id = str(questions[0]['quiz_id'])
+    response = client.get(f'/api/v1/quiz/{quiz_id}/questions')
+    assert response.status_code == 200, 'Неверный код ответа'
+    assert response.json() == {
+        'quiz_id': quiz_id,
+        'questions': [
+            {'question_id': item['question_id'],
+             'question': item['question']}
+            for item in questions[:2]
+        ],
+    }
+    etag = response.headers['ETag']
+    assert etag.startswith('"') and etag.endswith('"')
+
+
+def test_quiz_get_questions_honors_if_none_match(client, questions_in_db):
+    """При совпадении If-None-Match с ETag возвращается статус 304 без
+    тела; ETag не меняется после ответа на вопрос."""
+    quiz_id = str(questions[0]['quiz_id'])
+    url = f'/api/v1/quiz/{quiz_id}/questions'
+    etag = client.get(url).headers['ETag']
+    client.post('/api/v1/quiz/answer', json={
+        'quiz_id': quiz_id,
+        'question_id': questions[0]['question_id'],
+        'answer': 'Input answer',
+    })
+    for header in (etag, f'"other", W/{etag}', '*'):
+        response = client.get(url, headers={'If-None-Match': header})
+        assert response.status_code == 304, header
+        assert response.content == b''
+        assert response.headers['ETag'] == etag
+
+    response = client.get(url, headers={'If-None-Match': '"other"'})
+    assert response.status_code == 200, 'Неверный код ответа'
+
+    other_quiz_id = str(questions[2]['quiz_id'])
+    response = client.get(f'/api/v1/quiz/{other_quiz_id}/questions')
+    assert response.headers['ETag'] != etag
+
+
+def test_quiz_fast_responses_match_response_models(
+    client,
+    questions_in_db,
+    mocker,
+):
+    """Ответы, сериализованные orjson в обход `response_model`, совпадают
+    с ответами через модели Pydantic вместе с заголовками ETag."""
+    quiz_id = str(questions[0]['quiz_id'])
+    urls = (f'/api/v1/quiz/next_question/{quiz_id}',
+            f'/api/v1/quiz/{quiz_id}/questions')
+    for url in urls:
+        mocker.patch.object(settings, 'fast_json_responses', True)
+        fast = client.get(url)
+        mocker.patch.object(settings, 'fast_json_responses', False)
+        validated = client.get(url)
+        assert fast.status_code == validated.status_code == 200, url
+        assert fast.json() == validated.json(), url
+        assert fast.headers['content-type'] == 'application/json'
+        assert fast.headers.get('ETag') == validated.headers.get('ETag')
+
+
+def test_quiz_get_questions_unknown_quiz_id_returns_404(
+    client,
+    questions_in_db,
+):
+    """Эндпойнт для получения всех вопросов возвращает статус 404, если
+    номер викторины не найден."""
+    quiz_id = 'a038f779-2c66-4565-90e8-8507da656fa0'
+    response = client.get(f'/api/v1/quiz/{quiz_id}/questions')
+    assert response.status_code == 404, 'Неверный код ответа'
+
+
 def test_quiz_get_question_invalid_quiz_id_returns_422(
     client,
     questions_in_db
@@ -68,7 +162,8 @@ async def test_quiz_answer_post_saves_answer_and_returns_correct_data(
     expected_quiz_id = str(questions[1]['quiz_id'])
     expected_answer = questions[0]['correct_answer']
     expected_keys = sorted(['question_id', 'question', 'quiz_id',
-                            'previous_question_correct_answer'])
+                            'previous_question_correct_answer',
+                            'previous_question_correct'])
 
     response = client.post('/api/v1/quiz/answer', json=input_data)
     assert response.status_code == 200, 'Неверный код ответа'
@@ -79,9 +174,11 @@ async def test_quiz_answer_post_saves_answer_and_returns_correct_data(
     assert data['question'] == expected_question_text
     assert data['question_id'] == expected_question_id
     assert data['previous_question_correct_answer'] == expected_answer
+    assert data['previous_question_correct'] is False
     assert data['quiz_id'] == expected_quiz_id
 
-    saved_question = await question_crud.get(
+    saved_question = await quiz_crud.get_quiz_question(
+        questions[0]['quiz_id'],
         questions[0]['question_id'],
         test_session
     )
@@ -102,7 +199,8 @@ async def test_quiz_answer_post_last_question_returns_no_question(
     }
     expected_quiz_id = str(questions[2]['quiz_id'])
     expected_answer = questions[2]['correct_answer']
-    expected_keys = sorted(['quiz_id', 'previous_question_correct_answer'])
+    expected_keys = sorted(['quiz_id', 'previous_question_correct_answer',
+                            'previous_question_correct'])
 
     response = client.post('/api/v1/quiz/answer', json=input_data)
     assert response.status_code == 200, 'Неверный код ответа'
@@ -113,13 +211,60 @@ async def test_quiz_answer_post_last_question_returns_no_question(
     assert data['previous_question_correct_answer'] == expected_answer
     assert data['quiz_id'] == expected_quiz_id
 
-    saved_question = await question_crud.get(
+    saved_question = await quiz_crud.get_quiz_question(
+        questions[2]['quiz_id'],
         questions[2]['question_id'],
         test_session
     )
     assert saved_question.answer == input_data['answer']
 
 
+async def test_quiz_answer_post_grades_normalized_answer(
+    client,
+    questions_in_db,
+):
+    """Ответ засчитывается без учёта тегов, регистра, артиклей и одной
+    опечатки."""
+    input_data = {
+        'quiz_id': str(questions[0]['quiz_id']),
+        'question_id': questions[0]['question_id'],
+        'answer': '<b>The TEST correct answr0</b>',
+    }
+    response = client.post('/api/v1/quiz/answer', json=input_data)
+    assert response.status_code == 200, 'Неверный код ответа'
+    assert response.json()['previous_question_correct'] is True
+
+
+async def test_quiz_answer_post_out_of_order_keeps_question_order(
+    client,
+    questions_in_db,
+):
+    """Ответ на вопрос не по порядку не сдвигает курсор викторины:
+    следующим по-прежнему выдаётся первый вопрос без ответа, а после
+    ответа на него викторина считается завершённой."""
+    quiz_id = str(questions[0]['quiz_id'])
+    input_data = {
+        'quiz_id': quiz_id,
+        'question_id': questions[1]['question_id'],
+        'answer': 'Input answer',
+    }
+    response = client.post('/api/v1/quiz/answer', json=input_data)
+    assert response.status_code == 200, 'Неверный код ответа'
+    assert response.json()['question_id'] == questions[0]['question_id']
+
+    response = client.get(f'/api/v1/quiz/next_question/{quiz_id}')
+    assert response.status_code == 200, 'Неверный код ответа'
+    assert response.json()['question_id'] == questions[0]['question_id']
+
+    input_data['question_id'] = questions[0]['question_id']
+    response = client.post('/api/v1/quiz/answer', json=input_data)
+    assert response.status_code == 200, 'Неверный код ответа'
+    assert 'question_id' not in response.json()
+
+    response = client.get(f'/api/v1/quiz/next_question/{quiz_id}')
+    assert response.status_code == 404, 'Неверный код ответа'
+
+
 async def test_quiz_answer_post_repeatable_answer_post_not_allowed(
     client,
     questions_in_db,
@@ -138,7 +283,8 @@ async def test_quiz_answer_post_repeatable_answer_post_not_allowed(
     assert response.status_code == 400, 'Неверный код ответа'
     assert list(data.keys()) == ['detail'], input_data
 
-    saved_question = await question_crud.get(
+    saved_question = await quiz_crud.get_quiz_question(
+        questions[3]['quiz_id'],
         questions[3]['question_id'],
         test_session
     )
@@ -199,6 +345,110 @@ async def test_quiz_answer_post_unexisted_data_returns_400(
         assert list(data.keys()) == ['detail'], input_data
 
 
+async def test_quiz_answers_post_saves_answers_and_returns_next_question(
+    client,
+    questions_in_db,
+    test_session,
+):
+    """Эндпойнт для отправки пакета ответов сохраняет ответы в БД,
+    возвращает правильные ответы и следующий вопрос, а ответы на чужие,
+    уже отвеченные и повторённые в пакете вопросы отклоняет."""
+    quiz_id = str(questions[0]['quiz_id'])
+    input_data = {
+        'quiz_id': quiz_id,
+        'answers': [
+            {'question_id': questions[1]['question_id'], 'answer': 'First'},
+            {'question_id': questions[2]['question_id'], 'answer': 'Other'},
+            {'question_id': questions[1]['question_id'], 'answer': 'Again'},
+        ],
+    }
+    response = client.post('/api/v1/quiz/answers', json=input_data)
+    assert response.status_code == 200, 'Неверный код ответа'
+    data = response.json()
+    assert data['answered'] == [{
+        'question_id': questions[1]['question_id'],
+        'correct_answer': questions[1]['correct_answer'],
+        'correct': False,
+    }]
+    assert data['rejected'] == [questions[2]['question_id'],
+                                questions[1]['question_id']]
+    assert data['question_id'] == questions[0]['question_id']
+    saved_question = await quiz_crud.get_quiz_question(
+        questions[1]['quiz_id'], questions[1]['question_id'], test_session)
+    assert saved_question.answer == 'First'
+
+    input_data['answers'] = [
+        {'question_id': questions[0]['question_id'], 'answer': 'Second'},
+        {'question_id': questions[1]['question_id'], 'answer': 'Late'},
+    ]
+    response = client.post('/api/v1/quiz/answers', json=input_data)
+    data = response.json()
+    assert [item['question_id'] for item in data['answered']] == [
+        questions[0]['question_id']]
+    assert data['rejected'] == [questions[1]['question_id']]
+    assert 'question_id' not in data
+
+    response = client.get(f'/api/v1/quiz/next_question/{quiz_id}')
+    assert response.status_code == 404, 'Неверный код ответа'
+
+
+async def test_quiz_answers_post_moves_cursor_past_answered_batch(
+    client,
+    questions_in_db,
+):
+    """Пакет, в котором есть ответ на вопрос под курсором, сдвигает курсор
+    на первый вопрос без ответа, пропуская отвеченные в том же пакете."""
+    quiz_id = str(questions[0]['quiz_id'])
+    input_data = {
+        'quiz_id': quiz_id,
+        'answers': [
+            {'question_id': questions[1]['question_id'], 'answer': 'A'},
+            {'question_id': questions[0]['question_id'], 'answer': 'B'},
+        ],
+    }
+    response = client.post('/api/v1/quiz/answers', json=input_data)
+    data = response.json()
+    assert [item['question_id'] for item in data['answered']] == [
+        questions[0]['question_id'], questions[1]['question_id']]
+    assert 'question_id' not in data
+    await quiz_state_cache.clear()
+    response = client.get(f'/api/v1/quiz/next_question/{quiz_id}')
+    assert response.status_code == 404, 'Неверный код ответа'
+
+
+async def test_quiz_answers_post_grades_each_answer(
+    client,
+    questions_in_db,
+):
+    """В пакете ответов каждый принятый ответ проверяется отдельно."""
+    input_data = {
+        'quiz_id': str(questions[0]['quiz_id']),
+        'answers': [
+            {'question_id': questions[0]['question_id'],
+             'answer': 'test correct answer0'},
+            {'question_id': questions[1]['question_id'], 'answer': 'Wrong'},
+        ],
+    }
+    response = client.post('/api/v1/quiz/answers', json=input_data)
+    assert response.status_code == 200, 'Неверный код ответа'
+    assert [item['correct'] for item in response.json()['answered']] == [
+        True, False]
+
+
+async def test_quiz_answers_post_invalid_data_returns_422(
+    client,
+    questions_in_db,
+):
+    """При отправке пустого или слишком большого пакета ответов
+    возвращается статус 422."""
+    quiz_id = str(questions[0]['quiz_id'])
+    item = {'question_id': questions[0]['question_id'], 'answer': 'A'}
+    for answers in ([], [item] * 101):
+        response = client.post('/api/v1/quiz/answers',
+                               json={'quiz_id': quiz_id, 'answers': answers})
+        assert response.status_code == 422, len(answers)
+
+
 async def test_quiz_post_invalid_data_returns_422(
     client,
     test_session,
@@ -242,3 +492,445 @@ async def test_quiz_post_saves_questions_and_returns_correct_data(
     assert sorted(list(data.keys())) == expected_keys
     saved_questions = await question_crud.get_all(test_session)
     assert len(saved_questions) == 5
+
+
+async def test_quiz_post_takes_questions_from_catalog(
+    client,
+    test_session,
+    questions_in_catalog,
+    mocker,
+):
+    """При наличии вопросов в каталоге викторина формируется из каталога,
+    без обращения к внешнему API."""
+    input_data = {'questions_num': 5}
+    mocked_get = mocker.patch('aiohttp.ClientSession.get')
+    response = client.post('/api/v1/quiz', json=input_data)
+    assert response.status_code == 200
+    assert not mocked_get.called, 'Сервис обратился к внешнему API'
+    data = response.json()
+    catalog_ids = [item['question_id'] for item in questions_in_catalog]
+    assert data['question_id'] in catalog_ids
+    quiz_questions = await quiz_crud.get_quiz_questions(
+        data['quiz_id'], test_session)
+    assert len(quiz_questions) == 5
+    assert len({item.question_id for item in quiz_questions}) == 5
+    assert quiz_questions[0].question_id == data['question_id']
+    assert await question_crud.count(test_session) == 10
+
+
+async def test_quiz_post_reuses_catalog_questions_across_quizzes(
+    client,
+    test_session,
+    questions_in_catalog,
+    mocker,
+):
+    """Один и тот же вопрос каталога может входить в несколько викторин."""
+    input_data = {'questions_num': 10}
+    mocked_get = mocker.patch('aiohttp.ClientSession.get')
+    quiz_ids = set()
+    for _ in range(2):
+        response = client.post('/api/v1/quiz', json=input_data)
+        assert response.status_code == 200
+        quiz_ids.add(response.json()['quiz_id'])
+    assert len(quiz_ids) == 2
+    assert not mocked_get.called, 'Сервис обратился к внешнему API'
+    for quiz_id in quiz_ids:
+        quiz_questions = await quiz_crud.get_quiz_questions(
+            quiz_id, test_session)
+        assert len(quiz_questions) == 10
+
+
+def wait_until_materialized(client, quiz_id, timeout=5.0):
+    """Ждёт, пока фоновая задача сохранит все вопросы викторины: у полной
+    викторины у списка вопросов появляется ETag."""
+    deadline = time.monotonic() + timeout
+    while True:
+        response = client.get(f'/api/v1/quiz/{quiz_id}/questions')
+        if 'ETag' in response.headers or time.monotonic() > deadline:
+            return response
+        time.sleep(0.02)
+
+
+def upstream_items(*question_ids):
+    return [
+        {
+            'id': question_id,
+            'answer': f'Правильный ответ {question_id}',
+            'question': f'Вопрос {question_id}',
+        }
+        for question_id in question_ids
+    ]
+
+
+def slow_upstream(delay, *question_ids):
+    async def get_json(url):
+        await asyncio.sleep(delay)
+        return upstream_items(*question_ids)
+    return get_json
+
+
+async def test_quiz_post_does_not_repeat_questions_for_user(
+    client,
+    test_session,
+    questions_in_catalog,
+    mocker,
+):
+    """Вторая викторина участника составляется из вопросов каталога,
+    которых не было в его первой викторине; недостающие вопросы внешнего
+    API, которые участник уже видел, отбрасываются."""
+    input_data = {'questions_num': 5, 'user_id': 'player'}
+    mocked_get = mocker.patch('aiohttp.ClientSession.get')
+    quiz_ids = [client.post('/api/v1/quiz', json=input_data).json()[
+        'quiz_id'] for _ in range(2)]
+    assert not mocked_get.called, 'Сервис обратился к внешнему API'
+    first, second = [
+        {item.question_id for item in
+         await quiz_crud.get_quiz_questions(quiz_id, test_session)}
+        for quiz_id in quiz_ids]
+    assert len(first | second) == 10
+
+    mocker.patch(
+        'business_layer.http_client.question_api_client.get_json',
+        side_effect=[upstream_items(min(first), 501),
+                     upstream_items(502)])
+    input_data['questions_num'] = 2
+    response = client.post('/api/v1/quiz', json=input_data)
+    assert response.status_code == 200
+    quiz_questions = await quiz_crud.get_quiz_questions(
+        response.json()['quiz_id'], test_session)
+    assert {item.question_id for item in quiz_questions} == {501, 502}
+
+
+async def test_quiz_post_tops_up_from_api_when_catalog_is_short(
+    client,
+    test_session,
+    questions_in_catalog,
+    mocker,
+):
+    """Если в каталоге недостаточно вопросов, викторина создаётся из
+    вопросов каталога, а недостающие вопросы запрашиваются во внешнем API
+    в фоне, добавляются в каталог и в конец викторины."""
+    input_data = {'questions_num': 15}
+    resp = MockResponse(5)
+    mocker.patch('aiohttp.ClientSession.get', return_value=resp)
+    response = client.post('/api/v1/quiz', json=input_data)
+    assert response.status_code == 200
+    quiz_id = response.json()['quiz_id']
+    response = wait_until_materialized(client, quiz_id)
+    assert len(response.json()['questions']) == 15
+    quiz_questions = await quiz_crud.get_quiz_questions(quiz_id,
+                                                        test_session)
+    catalog_ids = {item['question_id'] for item in questions_in_catalog}
+    assert [item.position for item in quiz_questions] == list(range(15))
+    assert {item.question_id for item in quiz_questions[:10]} == catalog_ids
+    assert await question_crud.count(test_session) == 15
+
+
+async def test_quiz_post_fetches_first_batch_when_catalog_is_empty(
+    client,
+    test_session,
+    mocker,
+):
+    """Без каталога до ответа набирается только первая пачка вопросов,
+    остальные вопросы викторины набираются в фоне."""
+    mocker.patch.object(settings, 'quiz_first_batch_size', 2)
+    mocked_get_json = mocker.patch(
+        'business_layer.http_client.question_api_client.get_json',
+        side_effect=[upstream_items(1, 2),
+                     upstream_items(3, 4, 5, 6)])
+    response = client.post('/api/v1/quiz', json={'questions_num': 6})
+    assert response.status_code == 200
+    assert response.json()['question_id'] in (1, 2)
+    response = wait_until_materialized(client, response.json()['quiz_id'])
+    assert [item['question_id'] for item in response.json()['questions'][2:]
+            ] == [3, 4, 5, 6]
+    assert mocked_get_json.call_count == 2
+
+
+async def test_quiz_answers_wait_for_background_questions(
+    client,
+    questions_in_catalog,
+    mocker,
+):
+    """Пока остальные вопросы набираются, ETag не выдаётся, а ответ на
+    последний сохранённый вопрос дожидается следующего вопроса."""
+    mocker.patch(
+        'business_layer.http_client.question_api_client.get_json',
+        side_effect=slow_upstream(0.3, 1001, 1002, 1003, 1004, 1005))
+    response = client.post('/api/v1/quiz', json={'questions_num': 15})
+    quiz_id = response.json()['quiz_id']
+    response = client.get(f'/api/v1/quiz/{quiz_id}/questions')
+    assert 'ETag' not in response.headers
+    assert response.headers['Cache-Control'] == 'no-store'
+    saved_ids = [item['question_id']
+                 for item in response.json()['questions']]
+    assert len(saved_ids) == 10
+
+    response = client.post('/api/v1/quiz/answers', json={
+        'quiz_id': quiz_id,
+        'answers': [{'question_id': question_id, 'answer': 'Ответ'}
+                    for question_id in saved_ids],
+    })
+    assert response.status_code == 200, 'Неверный код ответа'
+    assert response.json()['question_id'] in range(1001, 1006)
+    assert 'ETag' in client.get(f'/api/v1/quiz/{quiz_id}/questions').headers
+
+
+async def test_quiz_next_question_returns_503_while_questions_load(
+    client,
+    questions_in_catalog,
+    mocker,
+):
+    """Если вопросы не набрались за `quiz_fill_wait` секунд, эндпойнт
+    следующего вопроса возвращает статус 503 с заголовком Retry-After."""
+    mocker.patch.object(settings, 'quiz_fill_wait', 0.05)
+    mocker.patch(
+        'business_layer.http_client.question_api_client.get_json',
+        side_effect=slow_upstream(1, 1001, 1002))
+    response = client.post('/api/v1/quiz', json={'questions_num': 12})
+    quiz_id = response.json()['quiz_id']
+    client.post('/api/v1/quiz/answers', json={
+        'quiz_id': quiz_id,
+        'answers': [{'question_id': item['question_id'], 'answer': 'Ответ'}
+                    for item in questions_in_catalog],
+    })
+    response = client.get(f'/api/v1/quiz/next_question/{quiz_id}')
+    assert response.status_code == 503, 'Неверный код ответа'
+    assert response.headers['Retry-After'] == '1'
+
+
+async def test_waiting_for_questions_releases_connection(
+    test_session,
+    questions_in_db,
+    mocker,
+):
+    """Пока вопросы набираются другим воркером, сессия ждёт их без
+    открытой транзакции."""
+    quiz_id = questions[3]['quiz_id']
+    await test_session.execute(
+        update(Quiz).where(Quiz.quiz_id == quiz_id).values(total=2))
+    await test_session.commit()
+    in_transaction = []
+
+    async def poll(delay):
+        in_transaction.append(test_session.in_transaction())
+
+    mocker.patch('business_layer.question_retrieval.asyncio.sleep', poll)
+    mocker.patch.object(settings, 'quiz_fill_wait', 0.05)
+    state = await wait_for_questions(quiz_id, test_session)
+    assert state.is_waiting()
+    assert in_transaction and not any(in_transaction)
+
+
+async def test_quiz_is_truncated_when_background_fetch_fails(
+    client,
+    test_session,
+    questions_in_catalog,
+    mocker,
+):
+    """Если недостающие вопросы набрать не удалось, викторина сокращается
+    до сохранённых вопросов и завершается после ответа на них."""
+    mocker.patch(
+        'business_layer.http_client.question_api_client.get_json',
+        side_effect=QuestionAPIError('Внешний API недоступен'))
+    response = client.post('/api/v1/quiz', json={'questions_num': 15})
+    assert response.status_code == 200
+    quiz_id = response.json()['quiz_id']
+    response = wait_until_materialized(client, quiz_id)
+    saved_ids = [item['question_id']
+                 for item in response.json()['questions']]
+    assert len(saved_ids) == 10
+
+    response = client.post('/api/v1/quiz/answers', json={
+        'quiz_id': quiz_id,
+        'answers': [{'question_id': question_id, 'answer': 'Ответ'}
+                    for question_id in saved_ids],
+    })
+    assert 'question_id' not in response.json()
+    response = client.get(f'/api/v1/quiz/next_question/{quiz_id}')
+    assert response.status_code == 404, 'Неверный код ответа'
+
+
+async def test_quiz_post_drops_upstream_duplicates(
+    client,
+    test_session,
+    mocker,
+):
+    """Повторы в ответах внешнего API отбрасываются, а недостающие
+    вопросы запрашиваются параллельными запросами."""
+    mocked_get_json = mocker.patch(
+        'business_layer.http_client.question_api_client.get_json',
+        side_effect=[
+            upstream_items(1, 1, 2, 2, 3),
+            upstream_items(3, 4),
+            upstream_items(4, 5),
+        ])
+    response = client.post('/api/v1/quiz', json={'questions_num': 5})
+    assert response.status_code == 200
+    assert mocked_get_json.call_count == 3
+    quiz_questions = await quiz_crud.get_quiz_questions(
+        response.json()['quiz_id'], test_session)
+    assert sorted(item.question_id for item in quiz_questions) == [
+        1, 2, 3, 4, 5]
+    assert await question_crud.count(test_session) == 5
+
+
+async def test_first_round_is_sized_from_past_duplicates(mocker):
+    """Первый раунд набора вопросов рассчитывается по доле повторов
+    прошлых наборов процесса, а не всегда одним запросом, и сам
+    обновляет эту оценку."""
+    mocker.patch.object(settings, 'quiz_api_duplicate_rate_weight', 1)
+    upstream_duplicate_rate.update(received=4, duplicates=2)
+    mocked_get_json = mocker.patch(
+        'business_layer.http_client.question_api_client.get_json',
+        side_effect=[upstream_items(5, 6, 7, 8),
+                     upstream_items(9, 10, 11, 12)])
+    questions = await fetch_unique_questions(4, set())
+    assert mocked_get_json.call_count == 2
+    assert [item.question_id for item in questions] == [5, 6, 7, 8]
+    assert upstream_duplicate_rate.value == 0
+
+
+async def test_quiz_post_gives_up_after_max_rounds(
+    client,
+    test_session,
+    mocker,
+):
+    """Если внешнее API возвращает только повторы, набор вопросов
+    прекращается после `quiz_api_max_rounds` раундов со статусом 503."""
+    mocker.patch.object(settings, 'quiz_api_max_rounds', 3)
+    mocker.patch.object(settings, 'quiz_api_max_parallel_requests', 2)
+    mocked_get_json = mocker.patch(
+        'business_layer.http_client.question_api_client.get_json',
+        return_value=upstream_items(7, 7, 7, 7, 7))
+    response = client.post('/api/v1/quiz', json={'questions_num': 5})
+    assert response.status_code == 503
+    assert mocked_get_json.call_count <= 1 + 2 + 2
+    assert await question_crud.count(test_session) == 0
+
+
+def test_quiz_result_counts_graded_answers(client, questions_in_db):
+    """Результат викторины учитывает принятые и засчитанные ответы на
+    отдельные вопросы и пакеты ответов, отклонённые ответы не
+    учитываются."""
+    quiz_id = str(questions[0]['quiz_id'])
+    response = client.get(f'/api/v1/quiz/{quiz_id}/result')
+    assert response.status_code == 200, 'Неверный код ответа'
+    assert response.json() == {'quiz_id': quiz_id, 'total': 2,
+                               'answered': 0, 'correct': 0,
+                               'finished': False}
+
+    client.post('/api/v1/quiz/answer', json={
+        'quiz_id': quiz_id,
+        'question_id': questions[0]['question_id'],
+        'answer': 'test correct answer0',
+    })
+    client.post('/api/v1/quiz/answers', json={
+        'quiz_id': quiz_id,
+        'answers': [
+            {'question_id': questions[0]['question_id'], 'answer': 'Again'},
+            {'question_id': questions[1]['question_id'], 'answer': 'Wrong'},
+            {'question_id': questions[2]['question_id'], 'answer': 'Other'},
+        ],
+    })
+    response = client.get(f'/api/v1/quiz/{quiz_id}/result')
+    assert response.json() == {'quiz_id': quiz_id, 'total': 2,
+                               'answered': 2, 'correct': 1,
+                               'finished': True}
+
+
+async def test_concurrent_answers_keep_quiz_cursor(
+    questions_in_db,
+    test_session,
+):
+    """Ответ, записанный, пока другая транзакция держит строку викторины
+    с ответом на следующий вопрос, сдвигает курсор с учётом этого
+    ответа."""
+    quiz_id = questions[0]['quiz_id']
+    async with sessionmanager.session() as other:
+        await other.execute(
+            update(QuizQuestion)
+            .where(QuizQuestion.quiz_id == quiz_id,
+                   QuizQuestion.question_id == questions[1]['question_id'])
+            .values(answer='Ответ'))
+        await other.execute(
+            update(Quiz)
+            .where(Quiz.quiz_id == quiz_id)
+            .values(answered=Quiz.answered + 1))
+        answer = asyncio.create_task(question_crud.answer_question(
+            schemas.QuizAnswer(quiz_id=quiz_id,
+                               question_id=questions[0]['question_id'],
+                               answer='Ответ'),
+            test_session))
+        await asyncio.sleep(0.2)
+        assert not answer.done()
+        await other.commit()
+    result = await answer
+    assert result.next_question_id is None
+    quiz = await quiz_crud.get(quiz_id, test_session)
+    assert (quiz.current_position, quiz.answered) == (2, 2)
+
+
+def test_quiz_result_on_asyncpg(app, client, questions_in_db):
+    """Результат викторины отдаётся и через asyncpg, используемый
+    приложением: его UUID не попадает в ответ."""
+    url = sessionmanager._engine.url.set(drivername='postgresql+asyncpg')
+    manager = DatabaseSessionManager()
+    manager.init(url.render_as_string(hide_password=False),
+                 poolclass=NullPool)
+
+    async def get_asyncpg_session():
+        async with manager.session() as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = get_asyncpg_session
+    quiz_id = str(questions[0]['quiz_id'])
+    response = client.get(f'/api/v1/quiz/{quiz_id}/result')
+    assert response.status_code == 200, 'Неверный код ответа'
+    assert response.json()['quiz_id'] == quiz_id
+
+
+async def test_update_question_updates_quiz_counters(
+    questions_in_db,
+    test_session,
+):
+    """Запись ответа через `update_question` тоже увеличивает счётчики
+    викторины и сдвигает курсор."""
+    quiz_id = questions[0]['quiz_id']
+    await question_crud.update_question(
+        schemas.QuizAnswer(quiz_id=quiz_id,
+                           question_id=questions[0]['question_id'],
+                           answer='Test correct answer0'),
+        test_session)
+    quiz = await quiz_crud.get(quiz_id, test_session)
+    await test_session.refresh(quiz)
+    assert (quiz.answered, quiz.correct, quiz.current_position) == (1, 1, 1)
+
+
+def test_quiz_result_is_read_from_quiz_row(client, questions_in_db):
+    """Результат викторины читается одним запросом к строке викторины,
+    без подсчёта её вопросов."""
+    quiz_id = str(questions[3]['quiz_id'])
+    statements = []
+
+    def collect(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = sessionmanager._engine.sync_engine
+    event.listen(engine, 'before_cursor_execute', collect)
+    try:
+        response = client.get(f'/api/v1/quiz/{quiz_id}/result')
+    finally:
+        event.remove(engine, 'before_cursor_execute', collect)
+    assert response.status_code == 200, 'Неверный код ответа'
+    assert response.json()['answered'] == 1
+    queries = [item for item in statements if 'quiz' in item]
+    assert len(queries) == 1
+    assert 'quiz_question' not in queries[0]
+
+
+def test_quiz_result_for_unknown_quiz_returns_404(client):
+    """Для неизвестной викторины результат не найден."""
+    response = client.get(
+        '/api/v1/quiz/a038f339-2c66-4565-90e8-8507da656fa9/result')
+    assert response.status_code == 404, 'Неверный код ответа'
@@ -0,0 +1,76 @@
+import random
+from datetime import datetime
+
+import pytest
+
+from business_layer import schemas
+from business_layer.grading import (grade_answer, grade_answers,
+                                    normalize_answer, within_edit_distance)
+from config import settings
+from db_layer.crud import question_crud
+from db_layer.models import Question
+
+
+def edit_distance(first, second):
+    previous = list(range(len(second) + 1))
+    for row, char in enumerate(first, 1):
+        current = [row]
+        for column, other in enumerate(second, 1):
+            current.append(min(previous[column - 1] + (char != other),
+                               previous[column] + 1, current[-1] + 1))
+        previous = current
+    return previous[-1]
+
+
+@pytest.mark.parametrize('answer, expected', [
+    ('<i>The Beatles</i>', 'beatles'),
+    ('(the) Beatles', 'beatles'),
+    ('A Tale of Two Cities', 'tale of two cities'),
+    ("Mozart&#39;s  Requiem", 'mozarts requiem'),
+    ('Café', 'cafe'),
+    ('Ёлка', 'елка'),
+    ('The', 'the'),
+    ('<br/>', ''),
+])
+def test_normalize_answer(answer, expected):
+    """Нормализация убирает теги, сущности HTML, регистр, диакритику,
+    знаки препинания и артикли."""
+    assert normalize_answer(answer) == expected
+
+
+def test_within_edit_distance_matches_full_distance():
+    """Проверка в полосе совпадает с полным расчётом расстояния."""
+    generator = random.Random(0)
+    for _ in range(2000):
+        first, second = (
+            ''.join(generator.choice('abc')
+                    for _ in range(generator.randint(0, 8)))
+            for _ in range(2))
+        limit = generator.randint(0, 3)
+        assert within_edit_distance(first, second, limit) == (
+            edit_distance(first, second) <= limit), (first, second, limit)
+
+
+def test_grade_answer_tolerates_typos_in_long_answers(mocker):
+    """Опечатка допускается только в достаточно длинных ответах и
+    отключается нулевым расстоянием."""
+    mocker.patch.multiple(settings, grading_max_edit_distance=1,
+                          grading_fuzzy_min_length=5)
+    assert grade_answer('<b>THE Beatles</b>', 'beatles')
+    assert grade_answer('Beatls', 'beatles')
+    assert not grade_answer('Betls', 'beatles')
+    assert not grade_answer('1946', '1945')
+    assert not grade_answer('', 'beatles')
+    assert grade_answers([('Beatls', 'beatles'), ('Stones', 'beatles')]) == [
+        True, False]
+    mocker.patch.object(settings, 'grading_max_edit_distance', 0)
+    assert not grade_answer('Beatls', 'beatles')
+
+
+async def test_create_all_stores_normalized_answer(test_session):
+    """Правильный ответ нормализуется при сохранении вопроса в каталог."""
+    await question_crud.create_all([schemas.Question(
+        question_id=1, question='Q', correct_answer='<i>The</i> Beatles',
+        add_date=datetime.now())], test_session)
+    question = await test_session.get(Question, 1)
+    assert question.normalized_answer == 'beatles'
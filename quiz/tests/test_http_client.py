@@ -0,0 +1,52 @@
+import aiohttp
+import pytest
+
+from business_layer.http_client import QuestionAPIError
+from config import settings
+from tests.conftest import MockResponse
+
+
+@pytest.fixture(autouse=True)
+def no_retry_delay(mocker):
+    mocker.patch.object(settings, 'quiz_api_retry_backoff', 0)
+
+
+async def test_get_json_retries_transient_errors(api_client, mocker):
+    """Сетевые ошибки повторяются, после чего возвращается ответ."""
+    mocked_get = mocker.patch(
+        'aiohttp.ClientSession.get',
+        side_effect=[aiohttp.ClientConnectionError(), MockResponse(3)])
+    data = await api_client.get_json(settings.quiz_api_url.format(3))
+    assert len(data) == 3
+    assert mocked_get.call_count == 2
+
+
+async def test_get_json_raises_after_retries(api_client, mocker):
+    """После исчерпания повторов выбрасывается QuestionAPIError."""
+    mocked_get = mocker.patch(
+        'aiohttp.ClientSession.get',
+        side_effect=aiohttp.ClientConnectionError())
+    with pytest.raises(QuestionAPIError):
+        await api_client.get_json(settings.quiz_api_url.format(3))
+    assert mocked_get.call_count == settings.quiz_api_retries + 1
+
+
+async def test_get_json_does_not_retry_client_errors(api_client, mocker):
+    """Ответ 4xx не повторяется."""
+    resp = MockResponse(3)
+    resp.status = 404
+    mocked_get = mocker.patch('aiohttp.ClientSession.get', return_value=resp)
+    with pytest.raises(QuestionAPIError):
+        await api_client.get_json(settings.quiz_api_url.format(3))
+    assert mocked_get.call_count == 1
+
+
+def test_quiz_post_returns_503_when_api_is_down(client, mocker):
+    """Если внешнее API недоступно, а каталог пуст, эндпойнт старта
+    викторины возвращает статус 503."""
+    mocker.patch(
+        'aiohttp.ClientSession.get',
+        side_effect=aiohttp.ClientConnectionError())
+    response = client.post('/api/v1/quiz', json={'questions_num': 5})
+    assert response.status_code == 503
+    assert list(response.json().keys()) == ['detail']
@@ -0,0 +1,111 @@
+import base64
+import json
+from datetime import datetime
+
+import pytest
+
+from db_layer.crud import decode_page_cursor, encode_page_cursor
+from db_layer.models import Question
+from tests.conftest import questions
+
+
+@pytest.fixture
+async def questions_with_same_date(test_session):
+    """Вопросы каталога с одинаковой датой добавления, вставленные не по
+    порядку id."""
+    add_date = datetime(2024, 1, 1)
+    question_ids = [7, 3, 9, 1, 5]
+    test_session.add_all(
+        Question(question_id=question_id, question=f'Q{question_id}',
+                 correct_answer=f'A{question_id}',
+                 normalized_answer=f'a{question_id}', add_date=add_date)
+        for question_id in question_ids)
+    await test_session.commit()
+    return sorted(question_ids)
+
+
+def collect_pages(client, url, headers, limit):
+    items, cursor, pages = [], None, 0
+    while True:
+        params = {'limit': limit}
+        if cursor:
+            params['cursor'] = cursor
+        response = client.get(url, headers=headers, params=params)
+        assert response.status_code == 200, 'Неверный код ответа'
+        data = response.json()
+        assert len(data['items']) <= limit
+        items.extend(data['items'])
+        pages += 1
+        cursor = data.get('next_cursor')
+        if cursor is None:
+            return items, pages
+
+
+def test_page_cursor_round_trips():
+    """Курсор страницы раскодируется в исходный ключ, а неверный курсор
+    вызывает ValueError."""
+    add_date = datetime(2024, 1, 1, 12, 30, 15, 123456)
+    assert decode_page_cursor(encode_page_cursor(add_date, 42)) == (
+        add_date, '42')
+    with pytest.raises(ValueError):
+        decode_page_cursor('not a cursor')
+
+
+def test_list_questions_pages_through_catalog(
+    client,
+    questions_in_db,
+    questions_with_same_date,
+    admin_headers,
+):
+    """Постраничный обход каталога возвращает каждый вопрос ровно один
+    раз в порядке (add_date, question_id), в том числе при одинаковой
+    дате добавления."""
+    items, pages = collect_pages(client, '/api/v1/admin/questions',
+                                 admin_headers, limit=2)
+    expected_ids = questions_with_same_date + [
+        item['question_id'] for item in questions]
+    assert [item['question_id'] for item in items] == expected_ids
+    assert pages == 5
+    assert items[0]['correct_answer'] == 'A1'
+
+
+def test_list_quizzes_pages_through_quizzes(
+    client,
+    questions_in_db,
+    admin_headers,
+):
+    """Постраничный обход викторин возвращает каждую викторину один
+    раз вместе с курсором и количеством вопросов."""
+    items, pages = collect_pages(client, '/api/v1/admin/quizzes',
+                                 admin_headers, limit=2)
+    assert pages == 2
+    assert sorted(item['quiz_id'] for item in items) == sorted(
+        {str(item['quiz_id']) for item in questions})
+    totals = {item['quiz_id']: item['total'] for item in items}
+    assert totals[str(questions[0]['quiz_id'])] == 2
+
+
+def raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def test_list_with_invalid_cursor_returns_400(client, admin_headers):
+    """При неверном курсоре, в том числе с ключом - числом или списком
+    JSON, возвращается статус 400."""
+    bad_key = encode_page_cursor(datetime(2024, 1, 1), 'not-uuid')
+    number_key = raw_cursor(['2024-01-01T00:00:00', 42])
+    list_key = raw_cursor(['2024-01-01T00:00:00', [1, 2]])
+    for url, cursor in (('/api/v1/admin/questions', 'garbage'),
+                        ('/api/v1/admin/questions', list_key),
+                        ('/api/v1/admin/quizzes', bad_key),
+                        ('/api/v1/admin/quizzes', number_key),
+                        ('/api/v1/admin/quizzes', list_key)):
+        response = client.get(url, headers=admin_headers,
+                              params={'cursor': cursor})
+        assert response.status_code == 400, (url, cursor)
+
+
+def test_list_requires_admin_token(client):
+    """Без токена администратора списки недоступны."""
+    response = client.get('/api/v1/admin/questions')
+    assert response.status_code == 403, 'Неверный код ответа'
@@ -0,0 +1,72 @@
+from prometheus_client import REGISTRY
+
+from business_layer.http_client import QuestionAPIError
+from business_layer.question_retrieval import (fetch_unique_questions,
+                                               get_questions)
+from tests.conftest import questions
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_metrics_report_route_latency(client, questions_in_db):
+    """Время обработки запроса учитывается по шаблону пути маршрута."""
+    route = '/api/v1/quiz/next_question/{quiz_id}'
+    labels = {'method': 'GET', 'route': route, 'status': '200'}
+    before = sample('quiz_http_request_duration_seconds_count', **labels)
+    client.get(f'/api/v1/quiz/next_question/{questions[0]["quiz_id"]}')
+
+    response = client.get('/metrics')
+    assert response.status_code == 200, 'Неверный код ответа'
+    assert f'route="{route}"' in response.text
+    assert sample('quiz_http_request_duration_seconds_count',
+                  **labels) == before + 1
+
+
+def test_metrics_report_db_queries_and_pool(client, questions_in_db):
+    """Запросы к БД замеряются по типу запроса, а состояние пула
+    отдаётся при опросе метрик."""
+    before = sample('quiz_db_query_duration_seconds_count',
+                    operation='SELECT')
+    client.get(f'/api/v1/quiz/next_question/{questions[0]["quiz_id"]}')
+    assert sample('quiz_db_query_duration_seconds_count',
+                  operation='SELECT') > before
+
+    response = client.get('/metrics')
+    assert 'quiz_db_pool_checked_out' in response.text
+    assert 'quiz_db_pool_checkouts_total' in response.text
+
+
+async def test_metrics_report_upstream_latency_and_errors(mocker):
+    """Обращения к внешнему API замеряются, ошибки считаются."""
+    mocker.patch(
+        'business_layer.http_client.question_api_client.get_json',
+        side_effect=QuestionAPIError('Нет ответа'))
+    requests = sample('quiz_upstream_request_duration_seconds_count')
+    errors = sample('quiz_upstream_errors_total')
+    try:
+        await get_questions(1)
+    except QuestionAPIError:
+        pass
+    assert sample('quiz_upstream_request_duration_seconds_count') == (
+        requests + 1)
+    assert sample('quiz_upstream_errors_total') == errors + 1
+
+
+async def test_metrics_report_fetch_rounds_and_duplicates(mocker):
+    """Для набора уникальных вопросов учитываются раунды запросов к
+    внешнему API и отброшенные повторы."""
+    mocker.patch(
+        'business_layer.http_client.question_api_client.get_json',
+        side_effect=[
+            [{'id': 1, 'question': 'Q1', 'answer': 'A1'},
+             {'id': 1, 'question': 'Q1', 'answer': 'A1'}],
+            [{'id': 2, 'question': 'Q2', 'answer': 'A2'}],
+        ])
+    rounds = sample('quiz_upstream_fetch_rounds_sum')
+    duplicates = sample('quiz_upstream_duplicate_questions_total')
+    await fetch_unique_questions(2, set())
+    assert sample('quiz_upstream_fetch_rounds_sum') == rounds + 2
+    assert sample('quiz_upstream_duplicate_questions_total') == (
+        duplicates + 1)
@@ -0,0 +1,120 @@
+import json
+import pstats
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from config import settings
+from main import init_app
+from profiling import profile_store, sign_profile_request
+from tests.conftest import questions
+
+
+@pytest.fixture
+def profiled_client(mocker):
+    mocker.patch.multiple(settings, profiling_enabled=True,
+                          profiling_secret='secret', admin_token='admin')
+    profile_store.clear()
+    with TestClient(init_app(init_db=False)) as client:
+        yield client
+    profile_store.clear()
+
+
+def next_question_path():
+    return f'/api/v1/quiz/next_question/{questions[0]["quiz_id"]}'
+
+
+def test_signed_request_is_profiled(profiled_client, questions_in_db):
+    """Запрос с верной подписью профилируется, запрос без подписи, с
+    чужой или просроченной подписью - нет."""
+    path = next_question_path()
+    expires = int(time.time()) + 60
+    for headers in (
+        {},
+        {'X-Profile-Signature': sign_profile_request('GET', '/other',
+                                                     expires)},
+        {'X-Profile-Signature': sign_profile_request('GET', path,
+                                                     int(time.time()) - 1)},
+    ):
+        profiled_client.get(path, headers=headers)
+    assert profile_store.all() == []
+
+    response = profiled_client.get(path, headers={
+        'X-Profile-Signature': sign_profile_request('GET', path, expires)})
+    assert response.status_code == 200, 'Неверный код ответа'
+    [profile] = profile_store.all()
+    assert (profile.method, profile.path, profile.status) == ('GET', path,
+                                                              200)
+    assert profile.summary['crud_s'] > 0
+    assert set(profile.summary) == {'duration_s', 'cpu_s', 'crud_s',
+                                    'aiohttp_s', 'event_loop_s'}
+
+
+def test_malformed_signature_is_not_profiled(profiled_client,
+                                             questions_in_db):
+    """Запрос с испорченной подписью обрабатывается как неподписанный."""
+    path = next_question_path()
+    expires = int(time.time()) + 60
+    signature = sign_profile_request('GET', path, expires)
+    for value in ('garbage', '²:abc', f'{expires}:{"é" * 64}',
+                  signature[:-1] + 'é'):
+        response = profiled_client.get(path, headers={
+            'X-Profile-Signature': value.encode('latin-1')})
+        assert response.status_code == 200, 'Неверный код ответа'
+    assert profile_store.all() == []
+
+
+def test_sampled_requests_fill_ring_buffer(
+    profiled_client,
+    questions_in_db,
+    mocker,
+):
+    """При доле выборки 1 профилируется каждый запрос, а буфер хранит
+    только последние профили."""
+    mocker.patch.object(settings, 'profiling_sample_rate', 1.0)
+    maxlen = profile_store._profiles.maxlen
+    for _ in range(maxlen + 2):
+        profiled_client.get(next_question_path())
+    profiles = profile_store.all()
+    assert len(profiles) == maxlen
+    assert profiles[0].profile_id > profiles[-1].profile_id
+
+
+def test_admin_downloads_profiles(
+    profiled_client,
+    questions_in_db,
+    mocker,
+    tmp_path,
+):
+    """Эндпойнты администратора отдают список профилей и файлы профиля
+    в форматах pstats и speedscope."""
+    mocker.patch.object(settings, 'profiling_sample_rate', 1.0)
+    profiled_client.get(next_question_path())
+    mocker.patch.object(settings, 'profiling_sample_rate', 0.0)
+    headers = {'X-Admin-Token': 'admin'}
+
+    response = profiled_client.get('/api/v1/admin/profiles',
+                                   headers=headers)
+    [profile] = response.json()
+    profile_id = profile['profile_id']
+    assert profile['path'] == next_question_path()
+
+    response = profiled_client.get(
+        f'/api/v1/admin/profiles/{profile_id}',
+        headers=headers, params={'format': 'pstats'})
+    path = tmp_path / 'profile.pstats'
+    path.write_bytes(response.content)
+    assert pstats.Stats(str(path)).total_tt > 0
+
+    response = profiled_client.get(f'/api/v1/admin/profiles/{profile_id}',
+                                   headers=headers)
+    speedscope = json.loads(response.content)
+    [sampled] = speedscope['profiles']
+    assert len(sampled['samples']) == len(sampled['weights']) > 0
+    frames = speedscope['shared']['frames']
+    assert any(frame['file'].endswith('crud.py') for frame in frames)
+
+    response = profiled_client.get('/api/v1/admin/profiles/999',
+                                   headers=headers)
+    assert response.status_code == 404, 'Неверный код ответа'
@@ -0,0 +1,101 @@
+from uuid import uuid4
+
+from business_layer.question_bank import refill_question_bank
+from config import settings
+from db_layer.crud import question_crud, quiz_crud
+from tests.conftest import MockResponse
+
+
+async def test_refill_fills_bank_below_low_water_mark(
+    test_session,
+    api_client,
+    mocker,
+):
+    """Каталог вопросов, опустевший ниже нижней границы, пополняется."""
+    mocker.patch.object(settings, 'question_bank_size', 20)
+    mocker.patch.object(settings, 'question_bank_low_water_mark', 5)
+    mocker.patch('aiohttp.ClientSession.get', return_value=MockResponse(20))
+    added = await refill_question_bank(test_session)
+    stored = await question_crud.count(test_session)
+    assert added == stored
+    assert 0 < stored <= 20
+
+
+async def test_refill_skips_bank_above_low_water_mark(
+    test_session,
+    questions_in_catalog,
+    mocker,
+):
+    """Каталог вопросов выше нижней границы не пополняется."""
+    mocker.patch.object(settings, 'question_bank_low_water_mark', 5)
+    mocked_get = mocker.patch('aiohttp.ClientSession.get')
+    added = await refill_question_bank(test_session)
+    assert added == 0
+    assert not mocked_get.called
+
+
+async def test_refill_counts_only_unused_questions(
+    test_session,
+    questions_in_catalog,
+    api_client,
+    mocker,
+):
+    """Вопросы, уже выданные в викторинах, не считаются запасом банка:
+    каталог пополняется, хотя его размер выше нижней границы."""
+    mocker.patch.object(settings, 'question_bank_size', 20)
+    mocker.patch.object(settings, 'question_bank_low_water_mark', 5)
+    await quiz_crud.create(
+        uuid4(), [item['question_id'] for item in questions_in_catalog[:8]],
+        test_session)
+    assert await question_crud.count_unused(test_session) == 2
+    mocker.patch('aiohttp.ClientSession.get', return_value=MockResponse(18))
+    added = await refill_question_bank(test_session)
+    assert added > 0
+    assert await question_crud.count_unused(test_session) == 2 + added
+
+
+async def test_quiz_questions_are_marked_used(
+    test_session,
+    questions_in_catalog,
+):
+    """Вопросы, добавленные в викторину при создании и позже, отмечаются
+    в каталоге как использованные."""
+    catalog_ids = [item['question_id'] for item in questions_in_catalog]
+    quiz_id = uuid4()
+    await quiz_crud.create(quiz_id, catalog_ids[:3], test_session, total=5)
+    await quiz_crud.add_questions(quiz_id, catalog_ids[3:5], test_session)
+    assert await question_crud.count_unused(test_session) == len(
+        catalog_ids) - 5
+
+
+async def test_sample_returns_distinct_catalog_questions(
+    test_session,
+    questions_in_catalog,
+):
+    """Выборка по случайному ключу возвращает разные вопросы каталога
+    и продолжается с начала индекса, если после случайной точки
+    вопросов не хватает."""
+    catalog_ids = {item['question_id'] for item in questions_in_catalog}
+    for _ in range(5):
+        sampled = await question_crud.sample(10, test_session)
+        assert {item.question_id for item in sampled} == catalog_ids
+
+
+async def test_sample_skips_questions_seen_by_user(
+    test_session,
+    questions_in_catalog,
+):
+    """Вопросы прошлых викторин участника в выборку не попадают,
+    вопросы викторин других участников - попадают."""
+    seen_ids = [item['question_id'] for item in questions_in_catalog[:6]]
+    await quiz_crud.create(uuid4(), seen_ids[:3], test_session,
+                           user_id='player')
+    await quiz_crud.create(uuid4(), seen_ids[3:], test_session,
+                           user_id='player')
+    await quiz_crud.create(uuid4(), seen_ids, test_session,
+                           user_id='other')
+    sampled = await question_crud.sample(10, test_session, 'player')
+    assert sorted(item.question_id for item in sampled) == [
+        item['question_id'] for item in questions_in_catalog[6:]]
+    assert await quiz_crud.get_seen_question_ids(
+        'player', test_session) == set(seen_ids)
@@ -0,0 +1,109 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from config import settings
+from db_layer.crud import question_crud
+from db_layer.models import Question
+from tests.conftest import catalog_questions
+
+EXPORT_URL = '/api/v1/admin/questions/export'
+
+
+@pytest.fixture(autouse=True)
+def small_export_chunks(mocker):
+    mocker.patch.object(settings, 'export_chunk_size', 3)
+
+
+async def test_stream_chunks_reads_catalog_in_fixed_size_chunks(
+    questions_in_catalog,
+    test_session,
+):
+    """Вопросы каталога читаются пачками заданного размера."""
+    async with test_session.begin():
+        chunks = [chunk async for chunk in
+                  question_crud.stream_chunks(test_session, 4)]
+    assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+    assert [row.question_id for chunk in chunks for row in chunk] == [
+        item['question_id'] for item in catalog_questions]
+
+
+async def test_stream_chunks_follows_add_date_index(test_session):
+    """Вопросы читаются в порядке индекса (add_date, question_id), а не
+    по номеру вопроса."""
+    add_date = datetime.now()
+    test_session.add_all([
+        Question(question_id=question_id, question=f'Question {question_id}',
+                 correct_answer='Answer', normalized_answer='answer',
+                 add_date=add_date - timedelta(days=days))
+        for question_id, days in ((1, 0), (2, 2), (3, 1), (4, 2))])
+    await test_session.commit()
+    async with test_session.begin():
+        chunks = [chunk async for chunk in
+                  question_crud.stream_chunks(test_session, 3)]
+    assert [row.question_id for chunk in chunks for row in chunk] == [
+        2, 4, 3, 1]
+
+
+def test_export_requires_admin_token(client, mocker):
+    """Без токена администратора выгрузка недоступна, в том числе пока
+    токен не задан в настройках."""
+    response = client.get(EXPORT_URL, headers={'X-Admin-Token': ''})
+    assert response.status_code == 403, 'Неверный код ответа'
+    mocker.patch.object(settings, 'admin_token', 'secret')
+    response = client.get(EXPORT_URL, headers={'X-Admin-Token': 'wrong'})
+    assert response.status_code == 403, 'Неверный код ответа'
+
+
+def test_export_ndjson_returns_whole_catalog(
+    client,
+    questions_in_catalog,
+    admin_headers,
+):
+    """Выгрузка в NDJSON содержит все вопросы каталога по строке на
+    вопрос."""
+    response = client.get(EXPORT_URL, headers=admin_headers)
+    assert response.status_code == 200, 'Неверный код ответа'
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line['question_id'] for line in lines] == [
+        item['question_id'] for item in catalog_questions]
+    assert lines[0]['correct_answer'] == catalog_questions[0][
+        'correct_answer']
+
+
+def test_export_csv_filters_by_add_date(
+    client,
+    questions_in_catalog,
+    admin_headers,
+):
+    """Выгрузка в CSV начинается с заголовка и учитывает интервал
+    `add_date`."""
+    date_from = catalog_questions[0]['add_date']
+    date_to = catalog_questions[-1]['add_date']
+    response = client.get(EXPORT_URL, headers=admin_headers, params={
+        'format': 'csv',
+        'date_from': date_from.isoformat(),
+        'date_to': date_to.isoformat(),
+    })
+    assert response.status_code == 200, 'Неверный код ответа'
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    expected = [item['question_id'] for item in catalog_questions
+                if date_from <= item['add_date'] < date_to]
+    assert [int(row['question_id']) for row in rows] == expected
+
+
+def test_export_csv_of_empty_range_has_header_only(
+    client,
+    questions_in_catalog,
+    admin_headers,
+):
+    """Выгрузка пустого интервала в CSV состоит только из заголовка."""
+    date_from = datetime.now() + timedelta(days=1)
+    response = client.get(EXPORT_URL, headers=admin_headers, params={
+        'format': 'csv', 'date_from': date_from.isoformat()})
+    assert response.text == (
+        'question_id,question,correct_answer,add_date\n')
@@ -0,0 +1,97 @@
+import json
+
+import pytest
+from sqlalchemy import func, select
+
+from business_layer.question_import import import_questions, read_rows
+from db_layer.db_engine import DatabaseSessionManager, sessionmanager
+from db_layer.models import Question
+from tests.conftest import catalog_questions
+
+
+def dump_rows():
+    return [
+        {'question_id': 1, 'question': 'Q1', 'correct_answer': 'A1',
+         'add_date': '2024-01-01T10:00:00'},
+        {'question_id': 0, 'question': 'Invalid id', 'correct_answer': 'A'},
+        {'question_id': 2, 'question': 'Q2', 'correct_answer': 'A2'},
+        {'question_id': 1, 'question': 'Repeated', 'correct_answer': 'A1'},
+        {'question_id': catalog_questions[0]['question_id'],
+         'question': 'Conflicting', 'correct_answer': 'A'},
+    ]
+
+
+@pytest.fixture
+def jsonl_dump(tmp_path):
+    path = tmp_path / 'questions.jsonl'
+    lines = [json.dumps(row) for row in dump_rows()]
+    path.write_text('\n'.join(lines + ['{broken json']) + '\n')
+    return path
+
+
+async def count_questions(session):
+    return await session.scalar(select(func.count()).select_from(Question))
+
+
+async def test_import_loads_valid_rows_and_skips_conflicts(
+    questions_in_catalog,
+    jsonl_dump,
+    test_session,
+):
+    """Загрузка добавляет в каталог новые вопросы, отклоняет невалидные
+    строки и пропускает повторы и уже имеющиеся вопросы."""
+    report = await import_questions(read_rows(jsonl_dump), test_session,
+                                    batch_size=2)
+    assert (report.read, report.rejected, report.imported,
+            report.skipped) == (6, 2, 2, 2)
+    assert report.rows_per_second > 0
+    assert await count_questions(test_session) == len(catalog_questions) + 2
+    question = await test_session.get(Question, 1)
+    assert question.question == 'Q1'
+    assert question.normalized_answer == 'a1'
+    question = await test_session.get(Question,
+                                      catalog_questions[0]['question_id'])
+    assert question.question == catalog_questions[0]['question']
+
+
+async def test_import_rejects_rows_that_are_not_objects(tmp_path,
+                                                        test_session):
+    """Строки JSONL с массивом, строкой, числом или null отклоняются, не
+    прерывая загрузку."""
+    path = tmp_path / 'questions.jsonl'
+    path.write_text('[1, 2]\n"x"\n3\nnull\n'
+                    '{"question_id": 7, "question": "Q7", '
+                    '"correct_answer": "A7"}\n')
+    report = await import_questions(read_rows(path), test_session,
+                                    batch_size=2)
+    assert (report.read, report.rejected, report.imported) == (5, 4, 1)
+    assert await count_questions(test_session) == 1
+
+
+async def test_import_reads_exported_csv(tmp_path, test_session):
+    """Загрузка принимает CSV в формате выгрузки каталога."""
+    path = tmp_path / 'questions.csv'
+    path.write_text(
+        'question_id,question,correct_answer,add_date\n'
+        '5,"Question, with comma",Answer,2024-01-01T10:00:00\n'
+        '6,Question,Answer,\n')
+    report = await import_questions(read_rows(path), test_session)
+    assert report.imported == 2
+    question = await test_session.get(Question, 5)
+    assert question.question == 'Question, with comma'
+
+
+async def test_import_uses_copy_of_asyncpg(jsonl_dump, test_session):
+    """Загрузка через asyncpg, используемый приложением, даёт тот же
+    результат."""
+    url = sessionmanager._engine.url.set(drivername='postgresql+asyncpg')
+    manager = DatabaseSessionManager()
+    manager.init(url.render_as_string(hide_password=False))
+    try:
+        async with manager.session() as session:
+            report = await import_questions(read_rows(jsonl_dump), session,
+                                            batch_size=2)
+    finally:
+        await manager.close()
+    assert report.imported == 3
+    assert await count_questions(test_session) == 3
@@ -0,0 +1,107 @@
+import json
+import os
+
+import pytest
+
+from business_layer.question_sources import (JSONLQuestionSource,
+                                             create_question_source)
+from config import settings
+from db_layer.crud import question_crud
+
+
+def write_dump(path, number, start=1):
+    lines = [
+        json.dumps({'question_id': question_id,
+                    'question': f'Вопрос {question_id}',
+                    'correct_answer': f'Ответ {question_id}',
+                    'add_date': '2024-01-01T00:00:00'})
+        for question_id in range(start, start + number)
+    ]
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+
+@pytest.fixture
+async def dump_source(tmp_path):
+    path = tmp_path / 'questions.jsonl'
+    write_dump(path, 20)
+    source = JSONLQuestionSource(str(path))
+    await source.init()
+    yield source
+    await source.close()
+
+
+async def test_jsonl_source_samples_distinct_questions(dump_source):
+    """Источник JSONL возвращает запрошенное кол-во разных вопросов."""
+    assert dump_source.lines == 20
+    questions = await dump_source.get_questions(5)
+    assert len({question.question_id for question in questions}) == 5
+    for question in questions:
+        assert question.correct_answer == f'Ответ {question.question_id}'
+    assert len(await dump_source.get_questions(50)) == 20
+
+
+async def test_jsonl_source_reuses_and_rebuilds_index(
+    dump_source,
+    mocker,
+):
+    """Сохранённый индекс используется повторно, пока файл не изменился,
+    и перестраивается после изменения файла."""
+    build_index = mocker.spy(JSONLQuestionSource, 'build_index')
+    path = dump_source.path
+    await dump_source.close()
+    await dump_source.init()
+    assert build_index.call_count == 0
+
+    with open(path, 'a', encoding='utf-8') as file:
+        file.write(json.dumps({'id': 100, 'question': 'Вопрос 100',
+                               'answer': 'Ответ 100'}) + '\n')
+    os.utime(path, ns=(0, 0))
+    await dump_source.close()
+    await dump_source.init()
+    assert build_index.call_count == 1
+    assert dump_source.lines == 21
+    assert dump_source.parse(dump_source.read_line(20)).question_id == 100
+
+
+async def test_jsonl_source_skips_blank_and_invalid_lines(tmp_path):
+    """Пустые строки не попадают в индекс, неверные строки
+    пропускаются при выборке."""
+    path = tmp_path / 'questions.jsonl'
+    path.write_text(
+        '{"id": 1, "question": "Вопрос", "answer": "Ответ"}\n'
+        '\n'
+        '{"id": 2, "question": "Без ответа"}\n'
+        'not json\n'
+        '{"id": 3, "question": "Вопрос", "answer": "Ответ"}',
+        encoding='utf-8')
+    source = JSONLQuestionSource(str(path))
+    await source.init()
+    try:
+        assert source.lines == 4
+        questions = await source.get_questions(4)
+        assert sorted(item.question_id for item in questions) == [1, 3]
+    finally:
+        await source.close()
+
+
+def test_unknown_question_source_is_rejected(mocker):
+    """Неизвестный источник вопросов в настройках - ошибка запуска."""
+    mocker.patch.object(settings, 'question_source', 'ftp')
+    with pytest.raises(ValueError):
+        create_question_source()
+
+
+async def test_quiz_is_created_from_local_dump(
+    client,
+    test_session,
+    dump_source,
+    mocker,
+):
+    """С источником JSONL викторина создаётся без обращения к сети."""
+    mocker.patch('business_layer.question_retrieval.question_source',
+                 dump_source)
+    mocked_get = mocker.patch('aiohttp.ClientSession.get')
+    response = client.post('/api/v1/quiz', json={'questions_num': 5})
+    assert response.status_code == 200, 'Неверный код ответа'
+    assert not mocked_get.called, 'Сервис обратился к внешнему API'
+    assert await question_crud.count(test_session) == 5
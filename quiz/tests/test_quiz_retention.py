@@ -0,0 +1,162 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event, func, select, text
+
+from business_layer import schemas
+from business_layer.quiz_retention import maintain_partitions
+from config import settings
+from db_layer.crud import question_crud, quiz_crud
+from db_layer.db_engine import sessionmanager
+from db_layer.models import Quiz, QuizQuestion
+from db_layer.partitions import (DEFAULT_PARTITION, add_months,
+                                 month_partition, month_start)
+from tests.conftest import questions
+
+
+@pytest.fixture(autouse=True)
+async def drop_archive(create_tables):
+    """Архив, оставшийся от предыдущего теста, удаляется до начала
+    теста."""
+    async with sessionmanager.connect() as connection:
+        await connection.execute(text('DROP SCHEMA IF EXISTS archive CASCADE'))
+
+
+async def maintain(now):
+    async with sessionmanager.session() as session:
+        return await maintain_partitions(session, now)
+
+
+async def rows_by_partition(session):
+    rows = await session.execute(
+        select(text('tableoid::regclass::text'), func.count())
+        .select_from(QuizQuestion)
+        .group_by(text('1')))
+    return dict(rows.all())
+
+
+def read_partitions(plan: dict) -> set[str]:
+    """Секции quiz_question, которые узлы плана EXPLAIN ANALYZE
+    действительно читали."""
+    partitions = set()
+    if (plan.get('Actual Loops')
+            and plan.get('Relation Name', '').startswith('quiz_question_')):
+        partitions.add(plan['Relation Name'])
+    for child in plan.get('Plans', []):
+        partitions |= read_partitions(child)
+    return partitions
+
+
+def test_month_partition_bounds():
+    """Секция месяца покрывает полуоткрытый интервал с первого числа
+    месяца до первого числа следующего месяца."""
+    partition = month_partition(datetime(2024, 12, 15, 10, 30))
+    assert partition.name == 'quiz_question_p202412'
+    assert (partition.lower, partition.upper) == (
+        datetime(2024, 12, 1).date(), datetime(2025, 1, 1).date())
+
+
+async def test_maintenance_creates_partitions_and_moves_default_rows(
+    questions_in_db,
+    test_session,
+):
+    """Обслуживание создаёт секции текущего и следующих месяцев и
+    переносит в них строки из секции по умолчанию."""
+    now = datetime.now()
+    report = await maintain(now)
+    current = month_start(now)
+    assert report.created == [
+        month_partition(add_months(current, number)).name
+        for number in range(settings.quiz_partition_months_ahead + 1)]
+    assert await rows_by_partition(test_session) == {
+        month_partition(current).name: len(questions)}
+    assert (await maintain(now)).created == []
+
+
+async def test_maintenance_archives_old_quizzes(
+    client,
+    questions_in_db,
+    test_session,
+):
+    """Секции старше срока хранения переносятся в архив вместе с
+    викторинами, пустые секции удаляются."""
+    await maintain(datetime.now())
+    later = datetime.now() + timedelta(days=settings.quiz_retention_days + 100)
+    report = await maintain(later)
+    assert report.archived == [month_partition(datetime.now()).name]
+    assert report.dropped
+
+    assert await rows_by_partition(test_session) == {}
+    assert await test_session.scalar(
+        select(func.count()).select_from(Quiz)) == 0
+    archived = await test_session.scalar(text(
+        f'SELECT count(*) FROM archive.{report.archived[0]}'))
+    assert archived == len(questions)
+    archived_quizzes = await test_session.scalar(
+        text('SELECT count(*) FROM archive.quiz'))
+    assert archived_quizzes == len({item['quiz_id'] for item in questions})
+
+    quiz_id = str(questions[0]['quiz_id'])
+    response = client.get(f'/api/v1/quiz/{quiz_id}/questions')
+    assert response.status_code == 404, 'Неверный код ответа'
+    default_rows = await test_session.scalar(
+        text(f'SELECT count(*) FROM {DEFAULT_PARTITION}'))
+    assert default_rows == 0
+
+
+async def test_quiz_queries_read_only_quiz_partition(
+    questions_in_db,
+    test_session,
+):
+    """Запросы к вопросам одной викторины читают только секцию её даты
+    создания, остальные секции отбрасываются при выполнении."""
+    now = datetime.now()
+    await maintain(now)
+    quiz_id = questions[0]['quiz_id']
+    other_date = datetime.combine(add_months(month_start(now), 1),
+                                  datetime.min.time())
+    other_id = uuid4()
+    test_session.add(Quiz(quiz_id=other_id, add_date=other_date,
+                          current_position=0, total=1))
+    test_session.add(QuizQuestion(quiz_id=other_id,
+                                  question_id=questions[0]['question_id'],
+                                  position=0, add_date=other_date))
+    await test_session.commit()
+    statements = []
+
+    def collect(conn, cursor, statement, parameters, context, executemany):
+        if (not executemany and 'quiz_question' in statement
+                and not statement.startswith('INSERT')):
+            statements.append((statement, parameters))
+
+    engine = sessionmanager._engine.sync_engine
+    event.listen(engine, 'before_cursor_execute', collect)
+    try:
+        async with sessionmanager.session() as session:
+            await quiz_crud.add_questions(
+                quiz_id, [questions[2]['question_id'],
+                          questions[3]['question_id']], session)
+            await quiz_crud.get_quiz_state(quiz_id, session)
+            for question, answer in (
+                (questions[0], question_crud.update_question),
+                (questions[1], question_crud.answer_question),
+            ):
+                await answer(schemas.QuizAnswer(
+                    quiz_id=quiz_id, question_id=question['question_id'],
+                    answer='Ответ'), session)
+            await question_crud.answer_questions(schemas.QuizAnswerBatch(
+                quiz_id=quiz_id, answers=[{
+                    'question_id': questions[2]['question_id'],
+                    'answer': 'Ответ'}]), session)
+            await quiz_crud.truncate(quiz_id, session)
+    finally:
+        event.remove(engine, 'before_cursor_execute', collect)
+    assert len(statements) >= 6
+    async with sessionmanager.connect() as connection:
+        for statement, parameters in statements:
+            result = await connection.exec_driver_sql(
+                f'EXPLAIN (ANALYZE, FORMAT JSON) {statement}', parameters)
+            partitions = read_partitions(result.scalar()[0]['Plan'])
+            assert partitions <= {month_partition(now).name}, statement
+        await connection.rollback()
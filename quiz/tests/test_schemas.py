@@ -10,15 +10,12 @@ valid_question_data = [
         'question_id': 123,
         'question': 'T' * 255,
         'correct_answer': 'r' * 255,
-        'answer': 'd' * 255,
-        'quiz_id': UUID('a038f779-2c66-4565-90e8-8507da656fa1'),
         'add_date': datetime.now(),
     },
     {
         'question_id': 1,
         'question': '',
         'correct_answer': '',
-        'quiz_id': UUID('a038f779-2c66-4565-90e8-8507da656fa1'),
         'add_date': datetime.now(),
     },
 ]
@@ -27,79 +24,45 @@ invalid_question_data = [
         'question_id': 0,
         'question': 'T' * 255,
         'correct_answer': 'r' * 255,
-        'quiz_id': UUID('a038f779-2c66-4565-90e8-8507da656fa1'),
         'add_date': datetime.now(),
     },
     {
         'question_id': 1,
         'question': 'T' * 256,
         'correct_answer': 'r' * 255,
-        'quiz_id': UUID('a038f779-2c66-4565-90e8-8507da656fa1'),
-        'add_date': datetime.now(),
-    },
-    {
-        'question_id': 1,
-        'question': 'T' * 255,
-        'correct_answer': 'r' * 256,
-        'quiz_id': UUID('a038f779-2c66-4565-90e8-8507da656fa1'),
         'add_date': datetime.now(),
     },
     {
         'question_id': 1,
         'question': 'T' * 255,
         'correct_answer': 'r' * 256,
-        'quiz_id': 'ddd',
         'add_date': datetime.now(),
     },
     {
         'question_id': 1,
         'question': 'T' * 255,
         'correct_answer': 'r' * 255,
-        'quiz_id': UUID('a038f779-2c66-4565-90e8-8507da656fa1'),
         'add_date': 'ddd',
     },
-    {
-        'question_id': 123,
-        'question': 'T' * 255,
-        'correct_answer': 'r' * 255,
-        'answer': 'd' * 256,
-        'quiz_id': UUID('a038f779-2c66-4565-90e8-8507da656fa1'),
-        'add_date': datetime.now(),
-    },
     {
         'question': 'T' * 255,
         'correct_answer': 'r' * 255,
-        'answer': 'd' * 255,
-        'quiz_id': UUID('a038f779-2c66-4565-90e8-8507da656fa1'),
         'add_date': datetime.now(),
     },
     {
         'question_id': 123,
         'correct_answer': 'r' * 255,
-        'answer': 'd' * 255,
-        'quiz_id': UUID('a038f779-2c66-4565-90e8-8507da656fa1'),
-        'add_date': datetime.now(),
-    },
-    {
-        'question_id': 123,
-        'question': 'T' * 255,
-        'answer': 'd' * 255,
-        'quiz_id': UUID('a038f779-2c66-4565-90e8-8507da656fa1'),
         'add_date': datetime.now(),
     },
     {
         'question_id': 123,
         'question': 'T' * 255,
-        'correct_answer': 'r' * 255,
-        'answer': 'd' * 255,
         'add_date': datetime.now(),
     },
     {
         'question_id': 123,
         'question': 'T' * 255,
         'correct_answer': 'r' * 255,
-        'answer': 'd' * 255,
-        'quiz_id': UUID('a038f779-2c66-4565-90e8-8507da656fa1'),
     },
     {},
 ]
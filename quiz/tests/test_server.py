@@ -0,0 +1,88 @@
+import pytest
+
+import metrics
+import server
+from config import settings
+
+
+@pytest.fixture
+def connection_budget(mocker, monkeypatch):
+    mocker.patch.multiple(settings, db_max_connections=50,
+                          db_reserved_connections=10, db_pool_size=5,
+                          db_max_overflow=5, quiz_cache_backend='redis')
+    monkeypatch.delenv('PROMETHEUS_MULTIPROC_DIR', raising=False)
+    monkeypatch.setenv('DB_POOL_SIZE', '5')
+    monkeypatch.setenv('DB_MAX_OVERFLOW', '5')
+
+
+@pytest.mark.parametrize('workers, expected', [
+    (1, (5, 5)),
+    (4, (5, 5)),
+    (6, (5, 1)),
+    (8, (5, 0)),
+    (16, (2, 0)),
+])
+def test_split_pool_fits_connection_budget(
+    connection_budget,
+    workers,
+    expected,
+):
+    """Пулы всех воркеров вместе не превышают бюджет соединений с БД."""
+    pool_size, max_overflow = server.split_pool(workers)
+    assert (pool_size, max_overflow) == expected
+    assert workers * (pool_size + max_overflow) <= 40
+
+
+def test_split_pool_rejects_too_many_workers(connection_budget):
+    """Запуск воркеров без единого соединения с БД запрещён."""
+    with pytest.raises(ValueError):
+        server.split_pool(41)
+
+
+def test_run_starts_workers_with_split_pool(
+    connection_budget,
+    mocker,
+    monkeypatch,
+    tmp_path,
+):
+    """Воркеры получают размер пула через окружение, метрики пишутся
+    в очищенную папку многопроцессного режима."""
+    monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', str(tmp_path))
+    (tmp_path / 'counter_1.db').write_bytes(b'stale')
+    uvicorn_run = mocker.patch('server.uvicorn.run')
+    server.run(8)
+
+    assert server.os.environ['DB_POOL_SIZE'] == '5'
+    assert server.os.environ['DB_MAX_OVERFLOW'] == '0'
+    assert list(tmp_path.iterdir()) == []
+    kwargs = uvicorn_run.call_args.kwargs
+    assert uvicorn_run.call_args.args == ('main:app',)
+    assert kwargs['workers'] == 8
+    assert kwargs['loop'] == 'uvloop'
+    assert kwargs['http'] == 'httptools'
+    assert kwargs['timeout_graceful_shutdown'] == (
+        settings.server_graceful_timeout)
+
+
+def test_run_rejects_workers_with_memory_cache(connection_budget, mocker):
+    """Несколько воркеров с кэшем викторин в памяти не запускаются, один
+    воркер - запускается."""
+    mocker.patch.object(settings, 'quiz_cache_backend', 'memory')
+    uvicorn_run = mocker.patch('server.uvicorn.run')
+    with pytest.raises(ValueError):
+        server.run(2)
+    assert not uvicorn_run.called
+    server.run(1)
+    assert uvicorn_run.called
+
+
+def test_metrics_are_collected_across_workers(
+    client,
+    questions_in_db,
+    monkeypatch,
+    tmp_path,
+):
+    """В многопроцессном режиме метрики читаются из папки воркеров,
+    а состояние пула отдаёт текущий воркер."""
+    monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', str(tmp_path))
+    assert b'quiz_db_pool_checked_out' in metrics.collect_latest()